@@ -0,0 +1,465 @@
+"""Benchmark suite: registration, collection and setup time, and peak memory, over synthetic factory graphs.
+
+Every scenario generates a test module with ``registrations`` factory graphs. A graph is a chain of ``depth``
+factories linked by ``SubFactory`` declarations, whose root factory has ``fanout`` ``RelatedFactory`` declarations
+and ``postgen`` ``post_generation`` declarations. Every factory has ``width`` plain declarations, and every factory of
+the graph is registered. Each of the ``tests`` tests requests the root model fixture of one of the graphs. With
+``attribute_args``, the tests also request all the attribute fixtures of the root model fixture, so that the setup
+time is mostly spent calling the generated fixture functions. With ``override``, every test overrides an attribute of
+its root model fixture: by parametrizing its attribute fixture, or with the ``factory`` marker when the factories are
+registered without attribute fixtures (``plain``). With ``roots``, every test requests the root model fixtures of
+several graphs. With ``requested``, the tests only request the first graphs, e.g. to measure the lazy registration of
+the factories the tests don't use. With ``batch``, every test creates ``batch`` instances of its root factory with
+its batch fixture instead, or by calling its factory fixture in a loop with ``batch_loop``.
+
+With ``persist``, the factories insert their instances into a sqlite database (in memory, or on disk with
+``on_disk``), one row at a time, committed right away. The batches are inserted with a single ``executemany``. With
+``deferred_flush``, the tests have the ``factoryboy_deferred_flush`` marker instead: ``SQLiteFlush`` inserts the rows
+with one ``executemany`` per table, and they're committed once by ``pytest_factoryboy_done``.
+
+Each round runs a pytest session in a fresh subprocess, which measures:
+
+* registration: wall time of the ``register`` calls of the module;
+* collection: wall time of the collection (including the import of the module, thus the registration);
+* setup: median wall time of the setup and call of a test (the deferred post-generation declarations are evaluated, and
+  the deferred flush persists the instances, right before the test is called);
+* peak memory: peak size of the memory blocks allocated during the session (after the plugins are loaded), traced
+  by ``tracemalloc`` in a separate round, so that the tracing doesn't slow down the timed rounds.
+
+The best of the rounds is kept. The results are printed, and can be written to a JSON file to be compared with
+the results of another commit.
+
+Usage::
+
+    python benchmarks/bench_suite.py [--scenario deep ...] [--rounds 3] [--output after.json] [--compare before.json]
+    python benchmarks/bench_suite.py --width 20 --depth 4 --fanout 2 --registrations 50 --tests 1000 [--lazy]
+    python benchmarks/bench_suite.py --width 20 --attribute-args
+    python benchmarks/bench_suite.py --width 50 --depth 1 --fanout 0 --registrations 1 --override [--plain]
+    python benchmarks/bench_suite.py --fanout 0 --registrations 50 --roots 50 --tests 50 --persist [--deferred-flush] [--on-disk]
+    python benchmarks/bench_suite.py --depth 1 --fanout 0 --registrations 1 --tests 20 --persist --batch 1000 [--batch-loop]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import dataclasses
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from importlib.metadata import version
+from pathlib import Path
+
+import pytest
+
+HEADER = """
+import time
+import tracemalloc
+
+import factory
+import pytest
+
+from pytest_factoryboy import register
+
+
+class Model:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+"""
+
+PERSIST_HEADER = """
+import sqlite3
+from pathlib import Path
+
+from pytest_factoryboy.flush import SQLiteFlush
+
+DATABASE = {database}
+if DATABASE != ":memory:":
+    Path(DATABASE).unlink(missing_ok=True)
+CONNECTION = sqlite3.connect(DATABASE)
+
+
+def get_row(fields):
+    columns = [f"{{name}}_id" if isinstance(value, Model) else name for name, value in fields.items()]
+    values = [value.id if isinstance(value, Model) else value for value in fields.values()]
+    return columns, values
+
+
+class SQLiteFactory(factory.Factory):
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def _create(cls, model_class, **kwargs):
+        instance = model_class(**kwargs)
+        columns, values = get_row(kwargs)
+        with CONNECTION:
+            cursor = CONNECTION.execute(
+                f"INSERT INTO {{model_class.__name__}} ({{', '.join(columns)}}) VALUES ({{', '.join('?' * len(values))}})",
+                values,
+            )
+        instance.id = cursor.lastrowid
+        return instance
+
+    @classmethod
+    def create_batch(cls, size, **kwargs):
+        instances = cls.build_batch(size, **kwargs)
+        table = cls._meta.model.__name__
+        (next_id,) = CONNECTION.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {{table}}").fetchone()
+        rows = []
+        for instance_id, instance in enumerate(instances, next_id):
+            instance.id = instance_id
+            columns, values = get_row(vars(instance))
+            rows.append(values)
+        with CONNECTION:
+            CONNECTION.executemany(
+                f"INSERT INTO {{table}} ({{', '.join(columns)}}) VALUES ({{', '.join('?' * len(columns))}})", rows
+            )
+        return instances
+
+
+class Flush(SQLiteFlush):
+    def pytest_factoryboy_done(self, request):
+        CONNECTION.commit()
+"""
+
+DEFERRED_FLUSH_FOOTER = """
+
+pytestmark = pytest.mark.factoryboy_deferred_flush
+
+
+@pytest.fixture(scope="session", autouse=True)
+def flush(request):
+    plugin = Flush(CONNECTION, {factory._meta.model: factory._meta.model.__name__ for factory in FACTORIES})
+    request.config.pluginmanager.register(plugin)
+    yield
+    request.config.pluginmanager.unregister(plugin)
+"""
+
+POSTGEN_TEMPLATE = """
+    @factory.post_generation
+    def tags_{i}(obj, create, extracted, **kwargs):
+        obj.tags_{i} = extracted or []
+"""
+
+FACTORY_TEMPLATE = """
+
+class {name}Factory({base}):
+    class Meta:
+        model = type("{name}", (Model,), {{}})
+
+{declarations}
+"""
+
+#: Metrics of a round, "lower is better" for all of them.
+METRICS = ("registration_s", "collection_s", "setup_median_us")
+
+
+@dataclass(frozen=True)
+class Scenario:
+    #: Number of plain declarations per factory.
+    width: int = 5
+    #: Length of the SubFactory chain of a graph.
+    depth: int = 2
+    #: Number of RelatedFactory declarations of the root factory of a graph.
+    fanout: int = 1
+    #: Number of post_generation declarations of the root factory of a graph.
+    postgen: int = 0
+    #: Number of factory graphs registered.
+    registrations: int = 10
+    tests: int = 500
+    #: Register the factories with ``_lazy=True``.
+    lazy: bool = False
+    #: The tests request all the attribute fixtures of the root model fixture.
+    attribute_args: bool = False
+    #: Every test overrides an attribute of its root model fixture.
+    override: bool = False
+    #: Register the factories with ``_attr_fixtures=False``.
+    plain: bool = False
+    #: Number of root model fixtures requested by every test, of distinct graphs.
+    roots: int = 1
+    #: Number of graphs requested by the tests (all of them with 0).
+    requested: int = 0
+    #: Number of instances of the root factory created by every test, with its batch fixture (``_batch_size``).
+    batch: int = 0
+    #: The tests create the instances of the batch by calling the factory fixture in a loop instead.
+    batch_loop: bool = False
+    #: The factories insert their instances into a sqlite database.
+    persist: bool = False
+    #: The sqlite database is a file, instead of being in memory.
+    on_disk: bool = False
+    #: The instances are persisted in bulk with the deferred flush.
+    deferred_flush: bool = False
+
+
+SCENARIOS = {
+    "baseline": Scenario(),
+    "model-fixture": Scenario(width=20, fanout=0, postgen=1, registrations=1, tests=2000),
+    "collection-related": Scenario(width=1, depth=1, fanout=5, registrations=3, roots=3, tests=3000),
+    "wide": Scenario(width=50),
+    "deep": Scenario(depth=8),
+    "fanout": Scenario(fanout=8),
+    "registrations": Scenario(registrations=200),
+    "registrations-lazy": Scenario(registrations=200, lazy=True),
+    "registrations-unused": Scenario(registrations=200, requested=5),
+    "registrations-unused-lazy": Scenario(registrations=200, requested=5, lazy=True),
+    "attribute-fixtures": Scenario(width=20, attribute_args=True),
+    "wide-override": Scenario(width=50, depth=1, fanout=0, registrations=1, tests=2000, override=True),
+    "wide-override-plain": Scenario(
+        width=50, depth=1, fanout=0, registrations=1, tests=2000, override=True, plain=True
+    ),
+    "persist": Scenario(fanout=0, registrations=50, roots=50, tests=50, persist=True),
+    "persist-deferred": Scenario(fanout=0, registrations=50, roots=50, tests=50, persist=True, deferred_flush=True),
+    "persist-disk": Scenario(fanout=0, registrations=50, roots=50, tests=50, persist=True, on_disk=True),
+    "persist-disk-deferred": Scenario(
+        fanout=0, registrations=50, roots=50, tests=50, persist=True, on_disk=True, deferred_flush=True
+    ),
+    "batch": Scenario(width=2, depth=1, fanout=0, registrations=1, tests=20, persist=True, batch=1000),
+    "batch-loop": Scenario(
+        width=2, depth=1, fanout=0, registrations=1, tests=20, persist=True, batch=1000, batch_loop=True
+    ),
+    "batch-disk": Scenario(
+        width=2, depth=1, fanout=0, registrations=1, tests=20, persist=True, on_disk=True, batch=1000
+    ),
+    "batch-loop-disk": Scenario(
+        width=2, depth=1, fanout=0, registrations=1, tests=20, persist=True, on_disk=True, batch=1000, batch_loop=True
+    ),
+}
+
+
+def build_module(scenario: Scenario) -> str:
+    parts = [HEADER]
+    base = "factory.Factory"
+    if scenario.persist:
+        database = "str(Path(__file__).with_suffix('.sqlite3'))" if scenario.on_disk else '":memory:"'
+        parts.append(PERSIST_HEADER.format(database=database))
+        base = "SQLiteFactory"
+    registrations = []
+    tables = []
+    attrs = [f"    attr_{i} = {i}" for i in range(scenario.width)]
+    columns = [f"attr_{i}" for i in range(scenario.width)]
+    for graph in range(scenario.registrations):
+        # Leaves and deeper factories first, so that the declarations can refer to the classes.
+        for leaf in range(scenario.fanout):
+            name = f"Leaf{graph}x{leaf}"
+            declarations = "\n".join([*attrs, "    parent = None"])
+            parts.append(FACTORY_TEMPLATE.format(name=name, base=base, declarations=declarations))
+            registrations.append(name)
+            tables.append((name, [*columns, "parent_id"]))
+        for level in reversed(range(scenario.depth)):
+            name = f"Node{graph}x{level}"
+            declarations = list(attrs)
+            table_columns = list(columns)
+            if level < scenario.depth - 1:
+                declarations.append(f"    child = factory.SubFactory(Node{graph}x{level + 1}Factory)")
+                table_columns.append("child_id")
+            if level == 0:
+                declarations.extend(
+                    f'    leaf_{leaf} = factory.RelatedFactory(Leaf{graph}x{leaf}Factory, factory_related_name="parent")'
+                    for leaf in range(scenario.fanout)
+                )
+                declarations.extend(POSTGEN_TEMPLATE.format(i=i) for i in range(scenario.postgen))
+            parts.append(
+                FACTORY_TEMPLATE.format(name=name, base=base, declarations="\n".join(declarations) or "    pass")
+            )
+            registrations.append(name)
+            tables.append((name, table_columns))
+
+    if scenario.persist:
+        parts.append(f"\n\nFACTORIES = [{', '.join(f'{name}Factory' for name in registrations)}]\n")
+        parts.extend(
+            f'CONNECTION.execute("CREATE TABLE {name} ({", ".join(["id INTEGER PRIMARY KEY", *table_columns])})")\n'
+            for name, table_columns in tables
+        )
+        if scenario.deferred_flush:
+            parts.append(DEFERRED_FLUSH_FOOTER)
+    parts.append("\n\n_start = time.perf_counter()\n")
+    options = "".join([", _lazy=True" if scenario.lazy else "", ", _attr_fixtures=False" if scenario.plain else ""])
+    # Only the root factories have a batch fixture.
+    batch_options = f", _batch_size={scenario.batch}" if scenario.batch else ""
+    parts.extend(
+        f"register({name}Factory{options}{batch_options if name.startswith('Node') and name.endswith('x0') else ''})\n"
+        for name in registrations
+    )
+    parts.append("REGISTRATION_TIME = time.perf_counter() - _start\n")
+    requested = scenario.requested or scenario.registrations
+    for i in range(scenario.tests):
+        root = f"node{i % requested}x0"
+        arguments = [f"node{(i + offset) % requested}x0" for offset in range(scenario.roots)]
+        if scenario.attribute_args:
+            arguments.extend(f"{root}__attr_{attr}" for attr in range(scenario.width))
+        body = "pass"
+        if scenario.batch and scenario.batch_loop:
+            arguments = [f"{root}_factory"]
+            body = f"[{root}_factory() for _ in range({scenario.batch})]"
+        elif scenario.batch:
+            arguments = [f"{root}_batch"]
+        marker = ""
+        if scenario.override and scenario.plain:
+            marker = f'@pytest.mark.factory("{root}", attr_0={i})\n'
+        elif scenario.override:
+            marker = f'@pytest.mark.parametrize("{root}__attr_0", [{i}])\n'
+        parts.append(f"\n\n{marker}def test_{i}({', '.join(arguments)}):\n    {body}\n")
+    return "".join(parts)
+
+
+class Recorder:
+    """Record the registration, collection and setup times, or the peak memory of the session."""
+
+    def __init__(self, trace_memory: bool = False) -> None:
+        self.trace_memory = trace_memory
+        self.collection_start = 0.0
+        self.collection = 0.0
+        self.registration = 0.0
+        self.setup: list[float] = []
+        self.peak_memory = 0
+
+    def pytest_sessionstart(self) -> None:
+        if self.trace_memory:
+            tracemalloc.start()
+
+    def pytest_sessionfinish(self) -> None:
+        if self.trace_memory:
+            _, self.peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_collection(self) -> None:
+        self.collection_start = time.perf_counter()
+
+    def pytest_collection_finish(self, session: pytest.Session) -> None:
+        self.collection = time.perf_counter() - self.collection_start
+        modules = {item.module for item in session.items if isinstance(item, pytest.Function)}
+        self.registration = sum(module.REGISTRATION_TIME for module in modules)
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        if report.when == "setup":
+            self.setup.append(report.duration)
+        elif report.when == "call":
+            self.setup[-1] += report.duration
+
+
+def run_child(path: Path, trace_memory: bool) -> None:
+    """Run the pytest session of a round and print its metrics as JSON."""
+    recorder = Recorder(trace_memory)
+    with contextlib.redirect_stdout(io.StringIO()):
+        exit_code = pytest.main(
+            [str(path), "-q", "-p", "no:cacheprovider", "-p", "pytest_factoryboy.plugin", "-o", "addopts="],
+            plugins=[recorder],
+        )
+    assert exit_code == 0, f"Benchmark session failed with exit code {exit_code}"
+    if trace_memory:
+        metrics = {"peak_memory_kib": recorder.peak_memory / 1024}
+    else:
+        metrics = {
+            "registration_s": recorder.registration,
+            "collection_s": recorder.collection,
+            "setup_median_us": statistics.median(recorder.setup) * 1e6,
+        }
+    print(json.dumps(metrics))
+
+
+def run_round(path: Path, trace_memory: bool = False) -> dict[str, float]:
+    command = [sys.executable, __file__, "--child", str(path)]
+    if trace_memory:
+        command.append("--trace-memory")
+    # Only the pytest-factoryboy plugin is loaded, the other installed plugins would skew the results.
+    env = {**os.environ, "PYTEST_DISABLE_PLUGIN_AUTOLOAD": "1"}
+    output = subprocess.run(command, check=True, capture_output=True, text=True, env=env).stdout
+    return json.loads(output)
+
+
+def run_scenario(scenario: Scenario, rounds: int, tmp: Path, name: str) -> dict[str, object]:
+    path = tmp / f"test_{name}.py"
+    path.write_text(build_module(scenario))
+    results = [run_round(path) for _ in range(rounds)]
+    return {
+        "name": name,
+        "params": dataclasses.asdict(scenario),
+        **{metric: min(result[metric] for result in results) for metric in METRICS},
+        **run_round(path, trace_memory=True),
+    }
+
+
+def get_metadata() -> dict[str, object]:
+    commit = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).parent, capture_output=True, text=True
+    ).stdout.strip()
+    return {
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pytest": version("pytest"),
+        "factory_boy": version("factory_boy"),
+        "pytest_factoryboy": version("pytest-factoryboy"),
+    }
+
+
+def print_results(results: list[dict[str, object]], baseline: dict[str, dict[str, object]]) -> None:
+    print(f"{'scenario':<28}{'metric':<18}{'value':>14}{'before':>14}{'change':>10}")
+    for result in results:
+        before = baseline.get(str(result["name"]), {})
+        for metric in (*METRICS, "peak_memory_kib"):
+            value = float(result[metric])  # type: ignore[arg-type]
+            line = f"{result['name']:<28}{metric:<18}{value:>14.4f}"
+            if metric in before:
+                previous = float(before[metric])  # type: ignore[arg-type]
+                change = f"{(value - previous) / previous * 100:+.1f}%" if previous else "n/a"
+                line += f"{previous:>14.4f}{change:>10}"
+            print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Scenario (default: all).")
+    for field in dataclasses.fields(Scenario):
+        option = f"--{field.name.replace('_', '-')}"
+        if field.type == "bool":
+            parser.add_argument(option, dest=field.name, action="store_true", default=None)
+        else:
+            parser.add_argument(
+                option, dest=field.name, type=int, help="Run a custom scenario, based on the baseline one."
+            )
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="Write the results to a JSON file.")
+    parser.add_argument("--compare", type=Path, help="JSON file of previous results to compare with.")
+    parser.add_argument("--child", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--trace-memory", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        run_child(args.child, args.trace_memory)
+        return
+
+    overrides = {
+        field.name: getattr(args, field.name)
+        for field in dataclasses.fields(Scenario)
+        if getattr(args, field.name) is not None
+    }
+    if overrides:
+        scenarios = {"custom": dataclasses.replace(SCENARIOS["baseline"], **overrides)}
+    else:
+        scenarios = {name: SCENARIOS[name] for name in args.scenario or SCENARIOS}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [run_scenario(scenario, args.rounds, Path(tmp), name) for name, scenario in scenarios.items()]
+
+    baseline = {}
+    if args.compare is not None:
+        baseline = {result["name"]: result for result in json.loads(args.compare.read_text())["scenarios"]}
+    print_results(results, baseline)
+
+    if args.output is not None:
+        args.output.write_text(json.dumps({"metadata": get_metadata(), "scenarios": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,31 @@
 """pytest-factoryboy public API."""
 
-from .fixture import LazyFixture, named_model, register
+from __future__ import annotations
 
-__all__ = ("register", "named_model", "LazyFixture")
+from typing import TYPE_CHECKING
+
+from .registry import invalidate_factory_cache
+
+if TYPE_CHECKING:
+    from .fixture import LazyFixture, named_model, register
+
+__all__ = ("register", "named_model", "LazyFixture", "invalidate_factory_cache")
+
+#: Names imported from the ``fixture`` module on access, which imports factory_boy. The pytest plugin imports this
+#: package, so factory_boy is not imported by the pytest invocations that don't register any factory.
+_LAZY_NAMES = frozenset({"register", "named_model", "LazyFixture"})
+
+
+def __getattr__(name: str) -> object:
+    # The names are not cached in the package: the fixture module may be imported again (e.g. by each in-process
+    # pytester run, which restores ``sys.modules``), and the other modules import the names from the current one.
+    # ``from .fixture import`` looks the module up in ``sys.modules``, unlike ``from . import fixture``.
+    if name in _LAZY_NAMES:
+        from .fixture import LazyFixture, named_model, register
+
+        return {"register": register, "named_model": named_model, "LazyFixture": LazyFixture}[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_LAZY_NAMES})
@@ -0,0 +1,288 @@
+"""Model fixtures of the async factories.
+
+A factory is async when its ``_create`` method, its ``_after_postgeneration`` method or one of its post-generation
+functions is a coroutine function (see ``is_async_factory``). Its model fixture is a coroutine function, set up by
+pytest-asyncio. The model fixture creates the sub-factories and the related factories itself rather than through
+their model fixtures (which can't be awaited by the fixtures set up synchronously): the independent ones are created
+concurrently, with ``asyncio.gather``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import time
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, TypeVar, cast
+
+from factory.builder import BuildStep, DeclarationSet, StepBuilder, parse_declarations
+from factory.declarations import RelatedFactory, RelatedFactoryList, SubFactory
+from factory.enums import CREATE_STRATEGY
+
+from .compat import getfixturedefs
+from .fixture import (
+    BuildPlan,
+    DeferredFunction,
+    PostGenerationContext,
+    evaluate,
+    evaluate_overrides,
+    evaluate_pre_declarations,
+    finalize_scoped,
+    get_factory_plan,
+    get_factoryboy_request,
+    get_stripped_factory,
+    make_deferred_postgen,
+    make_postgen_context,
+)
+from .profiling import profiled
+from .registry import SEPARATOR
+from .reporting import get_usage
+
+if TYPE_CHECKING:
+    from _pytest.fixtures import SubRequest
+    from factory.base import Factory
+
+T = TypeVar("T")
+
+
+@profiled("model", get_factory=lambda kwargs: kwargs["plan"].factory_class)
+async def async_model_fixture(request: SubRequest, factory_name: str, plan: BuildPlan) -> object:
+    """Async model fixture implementation.
+
+    The post-generation declarations are deferred like the ones of the model fixtures, and evaluated before the
+    fixture returns (see ``Request.evaluate_async``).
+    """
+    factoryboy_request = get_factoryboy_request(request)
+
+    fixture_name = plan.model_name
+    factory_class, plan = get_factory_plan(request, factory_name, plan)
+
+    kwargs = evaluate_pre_declarations(request, plan)
+    post_overrides = evaluate_overrides(request, plan, kwargs)
+
+    strategy = factoryboy_request.get_strategy(request, default=factory_class._meta.strategy)  # type: ignore[attr-defined]
+
+    hook = request.config.hook
+    cached = hook.pytest_factoryboy_before_create(
+        request=request, factory_class=factory_class, fixture_name=fixture_name, kwargs=kwargs, strategy=strategy
+    )
+    if cached is not None:
+        return cached
+
+    # The sub-factories and related factories are created by the async model fixture: it can't be deferred.
+    factoryboy_request.defer_creation(request, strategy, deferrable=False)
+
+    start = time.perf_counter()
+    if not plan.attr_fixtures:
+        instance = await generate_async(factory_class, strategy, {**kwargs, **post_overrides})
+    else:
+        instance = await instantiate_async(factory_class, strategy, kwargs)
+    elapsed = time.perf_counter() - start
+
+    usage = get_usage(request)
+    if usage is not None:
+        usage.add_instances(fixture_name, factory_class, 1, elapsed)
+    hook.pytest_factoryboy_after_create(
+        request=request,
+        factory_class=factory_class,
+        fixture_name=fixture_name,
+        kwargs=kwargs,
+        instance=instance,
+        elapsed=elapsed,
+    )
+
+    request._fixturedef.cached_result = (instance, 0, None)
+    request._fixture_defs[fixture_name] = request._fixturedef
+
+    step = BuildStep(
+        builder=StepBuilder(factory_class._meta, kwargs, strategy), sequence=factory_class._meta.next_sequence()
+    )
+    deferred: list[DeferredFunction[object, object]] = []
+    for post in plan.post_declarations:
+        context = make_postgen_context(request, post, post_overrides)
+        function: DeferredFunction[object, object]
+        if post.is_related:
+            function = DeferredFunction(
+                name=SEPARATOR.join((fixture_name, post.attr)),
+                factory=factory_class,
+                is_related=True,
+                function=functools.partial(
+                    create_related,
+                    declaration=cast(RelatedFactory, post.declaration),
+                    instance=instance,
+                    strategy=strategy,
+                    context=context,
+                ),
+                strategy=strategy,
+            )
+        else:
+            function = make_deferred_postgen(
+                step, factory_class, fixture_name, instance, post.attr, post.declaration, context, strategy
+            )
+        function.awaitable = True
+        deferred.append(function)
+    factoryboy_request.defer(deferred)
+
+    await factoryboy_request.evaluate_async(request)
+    if fixture_name in factoryboy_request.results:
+        # The other deferred functions are waiting for a fixture being set up: the ones of this fixture are all
+        # evaluated (they're never blocked), it can't return before calling the async `_after_postgeneration`.
+        await factoryboy_request.after_postgeneration_async(request, models=[fixture_name])
+    finalize_scoped(request, factoryboy_request)
+    return instance
+
+
+def async_subfactory_fixture(
+    request: SubRequest,
+    declaration: SubFactory,
+    model_name: str,
+    attributes: tuple[tuple[str, str, bool], ...],
+) -> object:
+    """SubFactory fixture implementation of the async factories.
+
+    When the test requests the model fixture of the sub-factory, the sub-factory is that instance, like with the other
+    factories. Otherwise, the async model fixture creates it from the declaration (see ``instantiate_async``), with
+    the attribute fixtures of the sub-factory model that are overridden or parametrized for the test.
+
+    :param declaration: SubFactory declaration.
+    :param model_name: Model fixture name of the sub-factory.
+    :param attributes: ``(attr, argname, is_subfactory)`` triples of the declarations of the sub-factory.
+    """
+    if request.scope == "function" and model_name in request.fixturenames:
+        return request.getfixturevalue(model_name)
+
+    fixturemanager = request._fixturemanager
+    callspec = getattr(request._pyfuncitem, "callspec", None)
+    overrides = {}
+    for attr, argname, is_subfactory in attributes:
+        fixturedefs = getfixturedefs(fixturemanager, argname, request.node)
+        if not fixturedefs:
+            # The factory of the sub-factory isn't registered.
+            continue
+        if (callspec is not None and argname in callspec.params) or not getattr(
+            fixturedefs[-1].func, "_factoryboy_generated", False
+        ):
+            overrides[attr] = evaluate(request, request.getfixturevalue(argname))
+        elif is_subfactory:
+            # The nested sub-factory may have overridden attributes itself.
+            value = request.getfixturevalue(argname)
+            if value is not declaration.get_factory()._meta.declarations[attr]:
+                overrides[attr] = value
+    if not overrides:
+        return declaration
+    return SubFactory(declaration.get_factory(), **declaration.unroll_context(None, None, overrides))
+
+
+async def generate_async(factory_class: type[Factory[T]], strategy: str, kwargs: Mapping[str, object]) -> T:
+    """Generate an instance of the factory, awaiting its async methods and post-generation functions.
+
+    The sub-factories are created concurrently before the instance, then the post-generation declarations are
+    evaluated in the factory_boy order: consecutive related factories are created concurrently.
+
+    :param factory_class: Factory class.
+    :param strategy: factory_boy strategy, also used for the sub-factories and the related factories.
+    :param kwargs: Factory keyword arguments, including the post-generation declarations and their context.
+    """
+    meta = factory_class._meta
+    instance = await instantiate_async(factory_class, strategy, kwargs)
+    _, post = parse_declarations(kwargs, base_pre=meta.pre_declarations, base_post=meta.post_declarations)
+    step = BuildStep(builder=StepBuilder(meta, kwargs, strategy), sequence=meta.next_sequence())
+
+    results: dict[str, object] = {}
+    related: list[str] = []
+
+    async def create_pending_related() -> None:
+        values = await asyncio.gather(*(evaluate_post(name) for name in related))
+        results.update(zip(related, values))
+        related.clear()
+
+    async def evaluate_post(name: str) -> object:
+        declaration = post[name]
+        if isinstance(declaration.declaration, RelatedFactory):
+            # Created by `create_related` rather than by factory_boy, which would create the factory synchronously.
+            context = declaration.declaration.unroll_context(instance, step, declaration.context)
+            postgen_context = PostGenerationContext(
+                value_provided="" in context,
+                value=context.get(""),
+                extra={key: value for key, value in context.items() if key != ""},
+            )
+            return await create_related(None, declaration.declaration, instance, strategy, postgen_context)
+        result = declaration.declaration.evaluate_post(instance=instance, step=step, overrides=declaration.context)
+        return await result if inspect.isawaitable(result) else result
+
+    for name in post.sorted():
+        if isinstance(post[name].declaration, RelatedFactory):
+            related.append(name)
+            # Reserve the slot of the result, so that the results are in the declaration order.
+            results[name] = None
+            continue
+        await create_pending_related()
+        results[name] = await evaluate_post(name)
+    await create_pending_related()
+
+    result = factory_class._after_postgeneration(instance, create=strategy == CREATE_STRATEGY, results=results)
+    if inspect.isawaitable(result):
+        await result
+    return instance
+
+
+async def instantiate_async(factory_class: type[Factory[T]], strategy: str, kwargs: Mapping[str, object]) -> T:
+    """Instantiate the factory without its post-generation declarations, creating its sub-factories first.
+
+    The sub-factories that aren't overridden by a value are created concurrently (see ``generate_async``).
+    """
+    meta = factory_class._meta
+    pre, post = parse_declarations(kwargs, base_pre=meta.pre_declarations, base_post=meta.post_declarations)
+    subfactories = [name for name in pre if isinstance(pre[name].declaration, SubFactory)]
+    values = await asyncio.gather(
+        *(
+            generate_async(
+                pre[name].declaration.get_factory(),
+                strategy,
+                pre[name].declaration.unroll_context(None, None, pre[name].context),
+            )
+            for name in subfactories
+        )
+    )
+
+    skipped = {*subfactories, *post}
+    generate_kwargs = {key: value for key, value in kwargs.items() if DeclarationSet.split(key)[0] not in skipped}
+    generate_kwargs.update(zip(subfactories, values))
+    # The stripped factory doesn't invoke `_after_postgeneration`, it's awaited once the post-generation declarations
+    # are evaluated.
+    instance: Any = get_stripped_factory(factory_class).generate(strategy, **generate_kwargs)
+    if inspect.isawaitable(instance):
+        instance = await instance
+    return cast(T, instance)
+
+
+async def create_related(
+    request: SubRequest | None,
+    declaration: RelatedFactory,
+    instance: object,
+    strategy: str,
+    context: PostGenerationContext,
+) -> object:
+    """Create the related factory of the instance (see ``RelatedFactory.call``).
+
+    :param request: Request of the model fixture, when called as a deferred function.
+    :param declaration: Related factory declaration.
+    :param instance: Instance the related factory refers to.
+    :param strategy: Strategy used to create the instance, inherited by the related factory.
+    :param context: Post-generation context of the declaration.
+    """
+    if context.value_provided:
+        if not isinstance(context.value, RelatedFactory):
+            return context.value
+        # The related factory fixture is not overridden, its value is the declaration itself.
+        declaration = context.value
+    kwargs = {**declaration.defaults, **context.extra}
+    if declaration.name:
+        kwargs[declaration.name] = instance
+
+    factory_class = declaration.get_factory()
+    if isinstance(declaration, RelatedFactoryList):
+        size = declaration.size if isinstance(declaration.size, int) else declaration.size()
+        return list(await asyncio.gather(*(generate_async(factory_class, strategy, kwargs) for _ in range(size))))
+    return await generate_async(factory_class, strategy, kwargs)
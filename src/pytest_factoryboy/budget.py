@@ -0,0 +1,139 @@
+"""Object-creation budgets of the tests (``factoryboy_budget`` marker)."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields, replace
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    from _pytest.config import Config
+    from _pytest.nodes import Item
+
+    from .reporting import ItemUsage
+
+ACTIONS = frozenset({"fail", "warn"})
+
+
+class BudgetExceededWarning(UserWarning):
+    """Issued when a test exceeds its factoryboy budget, with the ``warn`` action."""
+
+
+@dataclass(frozen=True)
+class Budget:
+    """Maximum number of model instances and time spent creating them for a test."""
+
+    max_instances: int | None = None
+    max_seconds: float | None = None
+    #: What to do when the budget is exceeded: "fail" the test or "warn".
+    action: str = "fail"
+
+    @classmethod
+    def from_config(cls, config: Config) -> Budget:
+        """Get the default budget of the tests, from the ini options."""
+        budget = cls(
+            max_instances=parse_option(config, "factoryboy_max_instances", int),  # type: ignore[arg-type]
+            max_seconds=parse_option(config, "factoryboy_max_seconds", float),
+            action=config.getini("factoryboy_budget_action") or "fail",
+        )
+        budget.validate()
+        return budget
+
+    @classmethod
+    def from_item(cls, item: Item, default: Budget) -> Budget | None:
+        """Get the budget of the test item, from its ``factoryboy_budget`` marker and the default budget.
+
+        :raises pytest.UsageError: If the marker arguments are invalid.
+        """
+        budget = default
+        marker = item.get_closest_marker("factoryboy_budget")
+        if marker is not None:
+            names = [field.name for field in fields(cls)]
+            if marker.args:
+                raise pytest.UsageError(
+                    f"factoryboy_budget only accepts keyword arguments ({', '.join(names)}), got {marker.args!r}."
+                )
+            unknown = sorted(set(marker.kwargs).difference(names))
+            if unknown:
+                raise pytest.UsageError(
+                    f"Unknown factoryboy_budget arguments: {', '.join(unknown)}. Use {', '.join(names)}."
+                )
+            budget = replace(default, **marker.kwargs)
+            budget.validate()
+        if budget.max_instances is None and budget.max_seconds is None:
+            return None
+        return budget
+
+    def validate(self) -> None:
+        """Check the types and values of the limits, and the action.
+
+        :raises pytest.UsageError: If the budget is invalid.
+        """
+        max_instances = self.max_instances
+        if max_instances is not None and (
+            not isinstance(max_instances, int) or isinstance(max_instances, bool) or max_instances < 0
+        ):
+            raise pytest.UsageError(
+                f"max_instances of the factoryboy budget must be a non-negative integer, got {max_instances!r}."
+            )
+        max_seconds = self.max_seconds
+        if max_seconds is not None and (
+            not isinstance(max_seconds, (int, float)) or isinstance(max_seconds, bool) or max_seconds < 0
+        ):
+            raise pytest.UsageError(
+                f"max_seconds of the factoryboy budget must be a non-negative number, got {max_seconds!r}."
+            )
+        if self.action not in ACTIONS:
+            raise pytest.UsageError(f"Unknown factoryboy budget action {self.action!r}, use 'fail' or 'warn'.")
+
+    def check(self, usage: ItemUsage) -> str | None:
+        """Check the usage against the budget.
+
+        :return: The description of the exceeded budget, with the breakdown per fixture and per factory. ``None`` if
+            the usage is within the budget.
+        """
+        exceeded = []
+        if self.max_instances is not None and usage.total_instances > self.max_instances:
+            exceeded.append(f"{usage.total_instances} instances created (max {self.max_instances})")
+        if self.max_seconds is not None and usage.total_time > self.max_seconds:
+            exceeded.append(f"{usage.total_time:.3f}s spent creating instances (max {self.max_seconds}s)")
+        if not exceeded:
+            return None
+
+        lines = [f"factoryboy budget exceeded: {', '.join(exceeded)}.", "Instances per model fixture:"]
+        lines.extend(
+            f"  {fixture}: {count}"
+            for fixture, count in sorted(usage.fixtures.items(), key=lambda item: item[1], reverse=True)
+        )
+        lines.append("Instances per factory:")
+        lines.extend(
+            f"  {factory_class.__name__}: {factory_usage.count} ({factory_usage.time:.3f}s)"
+            for factory_class, factory_usage in sorted(
+                usage.instances.items(), key=lambda item: item[1].count, reverse=True
+            )
+        )
+        lines.append(
+            f"Deferred functions: {usage.related.count} related factories ({usage.related.time:.3f}s), "
+            f"{usage.postgen.count} post-generation declarations ({usage.postgen.time:.3f}s)."
+        )
+        return "\n".join(lines)
+
+
+def parse_option(config: Config, name: str, type_: type[int] | type[float]) -> int | float | None:
+    """Parse a numeric ini option.
+
+    :raises pytest.UsageError: If the option isn't a number of the given type.
+    """
+    value = config.getini(name)
+    if not value:
+        return None
+    try:
+        return type_(value)
+    except ValueError:
+        expected = "an integer" if type_ is int else "a number"
+        raise pytest.UsageError(f"{name} must be {expected}, got {value!r}.") from None
+
+
+budget_key = pytest.StashKey[Budget]()
+default_budget_key = pytest.StashKey[Budget]()
@@ -2,22 +2,20 @@ from __future__ import annotations
 
 from collections.abc import Sequence
 from importlib.metadata import version
+from inspect import signature
+from typing import TYPE_CHECKING, Any, Callable
 
 from _pytest.fixtures import FixtureDef, FixtureManager
 from _pytest.nodes import Node
 from packaging.version import parse as parse_version
 from typing_extensions import TypeAlias
 
-pytest_version = parse_version(version("pytest"))
+if TYPE_CHECKING:
+    from .fixturegen import ScopeName
 
-__all__ = ("PostGenerationContext", "getfixturedefs", "PytestFixtureT")
+pytest_version = parse_version(version("pytest"))
 
-try:
-    from factory.declarations import PostGenerationContext
-except ImportError:  # factory_boy < 3.2.0
-    from factory.builder import (  # type: ignore[attr-defined, no-redef]
-        PostGenerationContext,
-    )
+__all__ = ("getfixturedefs", "register_fixture", "PytestFixtureT")
 
 if pytest_version.release >= (8, 1):
 
@@ -34,6 +32,40 @@ else:
         return fixturemanager.getfixturedefs(fixturename, node.nodeid)  # type: ignore[arg-type]
 
 
+if pytest_version.release >= (8, 1):
+    # pytest >= 9.1 scopes the fixtures by node, and deprecates the visibility by node id.
+    _register_fixture_by_node = "node" in signature(FixtureManager._register_fixture).parameters
+
+    def register_fixture(
+        fixturemanager: FixtureManager,
+        name: str,
+        func: Callable[..., object],
+        scope: ScopeName,
+        visible_as: FixtureDef[object],
+    ) -> None:
+        """Register a fixture, visible from the same nodes as another fixture definition."""
+        if _register_fixture_by_node:
+            node = getattr(visible_as, "node", None) or fixturemanager.session
+            fixturemanager._register_fixture(name=name, func=func, node=node, scope=scope)
+        else:
+            fixturemanager._register_fixture(name=name, func=func, nodeid=visible_as.baseid, scope=scope)
+
+else:
+
+    def register_fixture(
+        fixturemanager: FixtureManager,
+        name: str,
+        func: Callable[..., object],
+        scope: ScopeName,
+        visible_as: FixtureDef[object],
+    ) -> None:
+        """Register a fixture, visible from the same nodes as another fixture definition."""
+        args: tuple[Any, ...] = (fixturemanager, visible_as.baseid, name, func, scope, None, False, None)
+        kwargs: dict[str, Any] = {"_ispytest": True} if pytest_version.release >= (8, 0) else {}
+        fixturedef = FixtureDef(*args, **kwargs)
+        fixturemanager._arg2fixturedefs.setdefault(name, []).append(fixturedef)
+
+
 if pytest_version.release >= (8, 4):
     from _pytest.fixtures import FixtureFunctionDefinition
 
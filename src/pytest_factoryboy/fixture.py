@@ -2,18 +2,16 @@
 
 from __future__ import annotations
 
-import contextlib
 import functools
+import inspect
 import sys
+import time
 import warnings
-from collections.abc import Collection, Iterable, Iterator, Mapping
+from collections.abc import Collection, Iterable, Mapping
 from dataclasses import dataclass
 from inspect import signature
-from types import MethodType
-from typing import TYPE_CHECKING, Callable, Generic, TypeVar, cast, overload
+from typing import TYPE_CHECKING, Any, Callable, Generic, TypeVar, cast, overload
 
-import factory
-import factory.enums
 import inflection
 from factory.base import Factory
 from factory.builder import BuildStep, DeclarationSet, StepBuilder
@@ -25,14 +23,43 @@ from factory.declarations import (
     RelatedFactory,
     SubFactory,
 )
+from factory.enums import BUILD_STRATEGY, CREATE_STRATEGY
 from typing_extensions import ParamSpec
 
-from .compat import PostGenerationContext
-from .fixturegen import create_fixture
+# Re-exported (``as``) for the async model fixtures, so that the compatibility import lives in a single place.
+try:
+    from factory.declarations import PostGenerationContext as PostGenerationContext
+except ImportError:  # factory_boy < 3.2.0
+    from factory.builder import (  # type: ignore[attr-defined, no-redef]
+        PostGenerationContext as PostGenerationContext,
+    )
+
+from .fixturegen import SCOPES, ScopeName, create_fixture
+from .profiling import get_profiler, profiled
+from .registry import (
+    SEPARATOR,
+    STRATEGIES,
+    STRIPPED_FACTORY_ATTR,
+    async_factories,
+    attribute_values,
+    direct_attributes_key,
+    factory_attributes,
+    factory_deps,
+    factory_names,
+    invalidate_factory_cache,
+    lazy_declarations,
+    model_names,
+    model_plans,
+    plain_factories,
+    related_fixtures,
+    stripped_factories,
+)
+from .reporting import get_usage
 
 if TYPE_CHECKING:
     from _pytest.fixtures import SubRequest
 
+    from .flush import UnitOfWork
     from .plugin import Request as FactoryboyRequest
 
 T = TypeVar("T")
@@ -40,7 +67,6 @@ U = TypeVar("U")
 T_co = TypeVar("T_co", covariant=True)
 P = ParamSpec("P")
 
-SEPARATOR = "__"
 WARN_FOR_MODEL_TYPES = frozenset({dict, list, set, tuple, frozenset})
 
 
@@ -50,11 +76,175 @@ class DeferredFunction(Generic[T, U]):
     factory: type[Factory[T]]
     is_related: bool
     function: Callable[[SubRequest], U]
+    #: factory_boy strategy used to create the model instance the function belongs to.
+    strategy: str = CREATE_STRATEGY
+    #: Model instance the function belongs to, when it isn't the value of the model fixture (e.g. batch items).
+    instance: T | None = None
+    #: The function returns an awaitable (async model fixtures), it's evaluated by ``Request.evaluate_async``.
+    awaitable: bool = False
+    #: The function is evaluated in the calling thread even with an executor, like the related factories (e.g. the
+    #: related factories of the batch instances, which are post-generation functions calling the factory directly).
+    main_thread: bool = False
+
+    @property
+    def threaded(self) -> bool:
+        """Whether the function can be submitted to the executor of the deferred post-generation declarations."""
+        return not (self.is_related or self.main_thread or self.awaitable)
 
     def __call__(self, request: SubRequest) -> U:
         return self.function(request)
 
 
+@dataclass(frozen=True)
+class PostDeclarationPlan:
+    """Precomputed lookup data for a single post-generation declaration of a model fixture."""
+
+    attr: str
+    argname: str
+    declaration: PostGenerationDeclaration
+    is_related: bool
+    #: ``(key, argname, default)`` triples for the declaration context (e.g. ``author__register_user__password``).
+    #: When ``argname`` is ``None``, the fixture is not a dependency of the model fixture and ``default`` is used.
+    context: tuple[tuple[str, str | None, object], ...]
+
+
+@dataclass(frozen=True)
+class BuildPlan:
+    """Immutable plan describing how to build the instance of a model fixture.
+
+    Compiled once per (factory, model name) at registration time, so that ``model_fixture`` doesn't need to
+    assemble fixture names or inspect the factory declarations on every invocation.
+    """
+
+    factory_class: type[Factory[object]]
+    model_name: str
+    #: ``(attr, argname)`` pairs of the pre-declarations whose fixtures are dependencies of the model fixture.
+    pre_declarations: tuple[tuple[str, str], ...]
+    #: Post-generation declarations, in the order factory_boy would evaluate them.
+    post_declarations: tuple[PostDeclarationPlan, ...]
+    #: factory_boy strategy explicitly requested at registration, if any.
+    strategy: str | None = None
+    #: Attribute fixtures of the pre-declarations that are not dependencies of the model fixture. The plugin adds
+    #: them to the test closure, and the model fixture uses their declaration directly when they're not overridden.
+    attributes: frozenset[str] = frozenset()
+    #: The model fixture has attribute fixtures. Otherwise, factory_boy evaluates all the declarations of the factory
+    #: (including the sub-factories and the post-generation declarations).
+    attr_fixtures: bool = True
+    #: ``(attr, value)`` pairs of the attributes overridden at registration, when there are no attribute fixtures.
+    overrides: tuple[tuple[str, object], ...] = ()
+    #: Attributes of the post-generation declarations and of their context (e.g. ``register_user__password``), that
+    #: the ``factory`` marker overrides can't pass to the factory class without post-generation declarations.
+    post_attributes: frozenset[str] = frozenset()
+
+    @classmethod
+    def compile(
+        cls,
+        factory_class: type[Factory[T]],
+        model_name: str,
+        argnames: Collection[str],
+        strategy: str | None = None,
+        attributes: Collection[str] = (),
+        attr_fixtures: bool = True,
+        overrides: Mapping[str, object] | None = None,
+    ) -> BuildPlan:
+        """Compile the build plan.
+
+        :param factory_class: Factory class.
+        :param model_name: Model fixture name.
+        :param argnames: Dependencies of the model fixture.
+        :param strategy: factory_boy strategy requested at registration.
+        :param attributes: Attribute fixtures of the pre-declarations that are not dependencies of the model fixture.
+        :param attr_fixtures: The model fixture has attribute fixtures.
+        :param overrides: Attributes overridden at registration, when there are no attribute fixtures.
+        """
+        if not attr_fixtures:
+            return cls(
+                factory_class=cast("type[Factory[object]]", factory_class),
+                model_name=model_name,
+                pre_declarations=(),
+                post_declarations=(),
+                strategy=strategy,
+                attr_fixtures=False,
+                overrides=tuple((overrides or {}).items()),
+            )
+
+        attributes = frozenset(attributes)
+        argnames = frozenset(argnames).union(attributes)
+        prefix = "".join((model_name, SEPARATOR))
+
+        pre_declarations = []
+        for attr in factory_class._meta.pre_declarations:
+            argname = "".join((prefix, attr))
+            if argname in argnames:
+                pre_declarations.append((attr, argname))
+
+        post_declarations = []
+        post_attributes = []
+        post = factory_class._meta.post_declarations
+        for attr in post.sorted():
+            argname = "".join((prefix, attr))
+            post_attributes.append(attr)
+            context = []
+            for key, default in post.contexts[attr].items():
+                if key == "":
+                    continue
+                post_attributes.append(SEPARATOR.join((attr, key)))
+                post_attr = SEPARATOR.join((argname, key))
+                context.append((key, post_attr if post_attr in argnames else None, default))
+            declaration = post.declarations[attr]
+            post_declarations.append(
+                PostDeclarationPlan(
+                    attr=attr,
+                    argname=argname,
+                    declaration=declaration,
+                    is_related=isinstance(declaration, RelatedFactory),
+                    context=tuple(context),
+                )
+            )
+
+        return cls(
+            factory_class=cast("type[Factory[object]]", factory_class),
+            model_name=model_name,
+            pre_declarations=tuple(pre_declarations),
+            post_declarations=tuple(post_declarations),
+            strategy=strategy,
+            attributes=attributes,
+            post_attributes=frozenset(post_attributes),
+        )
+
+
+@dataclass(frozen=True)
+class DeclarationFixture:
+    """Fixture of a factory declaration (e.g. ``book__title``), created at registration or on demand."""
+
+    name: str
+    function: Callable[..., object]
+    dependencies: tuple[str, ...]
+    scope: ScopeName = "function"
+    #: The fixture returns the value of a plain declaration, that the model fixtures can use directly.
+    direct: bool = False
+    value: object = None
+
+    def create(self) -> Callable[..., object]:
+        """Create the pytest fixture, to be injected into the caller's namespace."""
+        fixture, _ = self.make()
+        return fixture
+
+    def materialize(self) -> Callable[..., object]:
+        """Create the fixture function, to be registered in the fixture manager."""
+        _, fn = self.make()
+        return fn
+
+    def make(self) -> tuple[Callable[..., object], Callable[..., object]]:
+        fixture, fn = create_fixture(
+            name=self.name, function=self.function, dependencies=self.dependencies, scope=self.scope
+        )
+        mark_generated(fn)
+        if self.direct:
+            attribute_values[fn] = self.value
+        return fixture, fn
+
+
 class Box(Generic[T_co]):
     """Simple box class, used to hold a value.
 
@@ -81,6 +271,11 @@ def register(
     _name: str | None = ...,
     *,
     _caller_locals: Box[dict[str, object]] | None = ...,
+    _strategy: str | None = ...,
+    _batch_size: int | None = ...,
+    _scope: ScopeName = ...,
+    _lazy: bool = ...,
+    _attr_fixtures: bool = ...,
     **kwargs: object,
 ) -> type[Factory[T]]: ...
 
@@ -93,6 +288,11 @@ def register(
     _name: str | None = ...,
     *,
     _caller_locals: Box[dict[str, object]] | None = ...,
+    _strategy: str | None = ...,
+    _batch_size: int | None = ...,
+    _scope: ScopeName = ...,
+    _lazy: bool = ...,
+    _attr_fixtures: bool = ...,
     **kwargs: object,
 ) -> Callable[[type[Factory[T]]], type[Factory[T]]]: ...
 
@@ -102,6 +302,11 @@ def register(
     _name: str | None = None,
     *,
     _caller_locals: Box[dict[str, object]] | None = None,
+    _strategy: str | None = None,
+    _batch_size: int | None = None,
+    _scope: ScopeName = "function",
+    _lazy: bool = False,
+    _attr_fixtures: bool = True,
     **kwargs: object,
 ) -> type[Factory[T]] | Callable[[type[Factory[T]]], type[Factory[T]]]:
     r"""Register fixtures for the factory class.
@@ -109,6 +314,19 @@ def register(
     :param factory_class: Factory class to register.
     :param _name: Name of the model fixture. By default, is lowercase-underscored model name.
     :param _caller_locals: Dictionary where to inject the generated fixtures. Defaults to the caller's locals().
+    :param _strategy: factory_boy strategy (``"build"`` or ``"create"``) of the model fixture and of its sub-factory
+        and related factory fixtures. By default, it is inherited from the model fixture requiring it, or it's the
+        strategy of the factory.
+    :param _batch_size: When given, also register the ``<model>_batch`` fixture: a list of instances generated by
+        the factory batch method. This is the default value of the ``<model>_batch__size`` fixture.
+    :param _scope: Scope of the generated fixtures (``"function"`` by default). The model fixtures with a broader
+        scope evaluate their post-generation declarations before being returned, and can't depend on fixtures
+        with a narrower scope (e.g. the model fixtures of their sub-factories).
+    :param _lazy: Only create the model and factory fixtures. The attribute fixtures (e.g. ``book__title``) are
+        created when a collected test requires them, which makes the registration of many factories cheaper.
+    :param _attr_fixtures: Generate the attribute fixtures (e.g. ``book__title``). Without them, the attributes can
+        only be overridden with the ``factory`` marker, and factory_boy evaluates all the declarations of the
+        factory, including the sub-factories and the post-generation declarations, as it would outside pytest.
     :param \**kwargs: Optional keyword arguments that override factory attributes.
     """
     if _caller_locals is None:
@@ -117,12 +335,26 @@ def register(
     if factory_class is None:
 
         def register_(factory_class: type[Factory[T]]) -> type[Factory[T]]:
-            return register(factory_class, _name=_name, _caller_locals=_caller_locals, **kwargs)
+            return register(
+                factory_class,
+                _name=_name,
+                _caller_locals=_caller_locals,
+                _strategy=_strategy,
+                _batch_size=_batch_size,
+                _scope=_scope,
+                _lazy=_lazy,
+                _attr_fixtures=_attr_fixtures,
+                **kwargs,
+            )
 
         return register_
 
     assert not factory_class._meta.abstract, "Can't register abstract factories."
     assert factory_class._meta.model is not None, "Factory model class is not specified."
+    assert _strategy is None or _strategy in STRATEGIES, f"Unknown strategy {_strategy!r}, use 'build' or 'create'."
+    assert _batch_size is None or _batch_size >= 0, "Batch size can't be negative."
+    assert _scope in SCOPES, f"Unknown scope {_scope!r}, use one of: {', '.join(SCOPES)}."
+    assert _batch_size is None or not is_async_factory(factory_class), "Async factories don't support batch fixtures."
 
     factory_name = get_factory_name(factory_class)
     model_name = get_model_name(factory_class) if _name is None else _name
@@ -141,6 +373,11 @@ def register(
             factory_name=factory_name,
             overrides=kwargs,
             caller_locals=_caller_locals,
+            strategy=_strategy,
+            batch_size=_batch_size,
+            scope=_scope,
+            lazy=_lazy,
+            attr_fixtures=_attr_fixtures,
         )
     )
     for name, fixture in fixture_defs.items():
@@ -155,22 +392,45 @@ def generate_fixtures(
     factory_name: str,
     overrides: Mapping[str, object],
     caller_locals: Box[Mapping[str, object]],
+    strategy: str | None = None,
+    batch_size: int | None = None,
+    scope: ScopeName = "function",
+    lazy: bool = False,
+    attr_fixtures: bool = True,
 ) -> Iterable[tuple[str, Callable[..., object]]]:
-    """Generate all the FixtureDefs for the given factory class."""
+    """Generate all the FixtureDefs for the given factory class.
+
+    With ``lazy``, the declaration fixtures are not generated, but attached to the model fixture function, to be
+    created on demand (see ``lazy_declarations``). Without ``attr_fixtures``, they are not generated at all.
+    """
+    if not attr_fixtures and model_name == get_model_name(factory_class):
+        plain_factories.add(factory_class)
+    if is_async_factory(factory_class):
+        from .asyncfixture import async_model_fixture
+
+        model_function: Callable[..., object] = async_model_fixture
+    else:
+        model_function = model_fixture
 
     related: list[str] = []
-    for attr, value in factory_class._meta.declarations.items():
+    attributes: list[str] = []
+    declarations: dict[str, DeclarationFixture] = {}
+    for attr, value in factory_class._meta.declarations.items() if attr_fixtures else ():
         value = overrides.get(attr, value)
         attr_name = SEPARATOR.join((model_name, attr))
-        yield (
-            attr_name,
-            make_declaration_fixturedef(
-                attr_name=attr_name,
-                value=value,
-                factory_class=factory_class,
-                related=related,
-            ),
+        declaration = make_declaration_fixture(
+            attr_name=attr_name,
+            value=value,
+            factory_class=factory_class,
+            related=related,
+            scope=scope,
         )
+        if declaration.direct:
+            attributes.append(attr_name)
+        if lazy:
+            declarations[attr_name] = declaration
+        else:
+            yield attr_name, declaration.create()
 
     if factory_name not in caller_locals.value:
         yield (
@@ -178,35 +438,92 @@ def generate_fixtures(
             create_fixture_with_related(
                 name=factory_name,
                 function=functools.partial(factory_fixture, factory_class=factory_class),
+                scope=scope,
             ),
         )
 
-    deps = get_deps(factory_class, model_name=model_name)
+    # The attribute fixtures of the plain declarations are related fixtures rather than dependencies: they are only
+    # set up when they're overridden or parametrized (see ``direct_attributes_key``).
+    if attr_fixtures:
+        deps = [dep for dep in get_deps(factory_class, model_name=model_name) if dep not in attributes]
+    else:
+        # The lazy fixtures overriding the attributes at registration are in the closure of the model fixture.
+        deps = [arg for value in overrides.values() if isinstance(value, LazyFixture) for arg in value.args]
+    plan = BuildPlan.compile(
+        factory_class,
+        model_name,
+        deps,
+        strategy=strategy,
+        attributes=attributes,
+        attr_fixtures=attr_fixtures,
+        overrides=overrides,
+    )
     yield (
         model_name,
         create_fixture_with_related(
             name=model_name,
-            function=functools.partial(model_fixture, factory_name=factory_name),
+            function=functools.partial(model_function, factory_name=factory_name, plan=plan),
             dependencies=deps,
-            related=related,
+            related=[*related, *attributes],
+            plan=plan,
+            scope=scope,
+            lazy=declarations,
         ),
     )
 
+    if batch_size is not None:
+        batch_name = "".join((model_name, "_batch"))
+        size_name = SEPARATOR.join((batch_name, "size"))
+        yield (
+            size_name,
+            create_fixture_with_related(
+                name=size_name, function=functools.partial(attr_fixture, value=batch_size), scope=scope
+            ),
+        )
+        yield (
+            batch_name,
+            create_fixture_with_related(
+                name=batch_name,
+                function=functools.partial(batch_fixture, factory_name=factory_name, plan=plan, name=batch_name),
+                dependencies=[*deps, size_name],
+                related=attributes,
+                plan=plan,
+                scope=scope,
+            ),
+        )
+
 
 def create_fixture_with_related(
     name: str,
     function: Callable[P, T],
     dependencies: Collection[str] | None = None,
     related: Collection[str] | None = None,
+    plan: BuildPlan | None = None,
+    scope: ScopeName = "function",
+    lazy: Mapping[str, DeclarationFixture] | None = None,
 ) -> Callable[P, T]:
+    fixture, fn = create_fixture(name=name, function=function, dependencies=dependencies, scope=scope)
+    mark_generated(fn, related=related, plan=plan)
+    if lazy:
+        lazy_declarations[fn] = dict(lazy)
+    return fixture
+
+
+def mark_generated(
+    fn: Callable[..., object], related: Collection[str] | None = None, plan: BuildPlan | None = None
+) -> None:
+    """Register the related fixtures and the build plan of a generated fixture function."""
     if related is None:
         related = []
-    fixture, fn = create_fixture(name=name, function=function, dependencies=dependencies)
-
     # We have to set the `_factoryboy_related` attribute to the original function, since
     # FixtureDef.func will provide that one later when we discover the related fixtures.
     fn._factoryboy_related = related  # type: ignore[attr-defined]
-    return fixture
+    if related:
+        related_fixtures[fn] = tuple(dict.fromkeys(related))
+    if plan is not None:
+        model_plans[fn] = plan
+    # Allows the plugin to tell which test items use pytest-factoryboy fixtures at all.
+    fn._factoryboy_generated = True  # type: ignore[attr-defined]
 
 
 def make_declaration_fixturedef(
@@ -214,11 +531,58 @@ def make_declaration_fixturedef(
     value: object,
     factory_class: type[Factory[T]],
     related: list[str],
+    scope: ScopeName = "function",
 ) -> Callable[[SubRequest], object]:
     """Create the FixtureDef for a factory declaration."""
+    return make_declaration_fixture(
+        attr_name=attr_name, value=value, factory_class=factory_class, related=related, scope=scope
+    ).create()
+
+
+def make_declaration_fixture(
+    attr_name: str,
+    value: object,
+    factory_class: type[Factory[T]],
+    related: list[str],
+    scope: ScopeName = "function",
+) -> DeclarationFixture:
+    """Make the fixture of a factory declaration, adding its related fixtures (if any) to ``related``."""
+    if isinstance(value, SubFactory) and is_async_factory(factory_class):
+        from .asyncfixture import async_subfactory_fixture
+
+        # The async model fixtures create their sub-factories themselves (see ``async_model_fixture``), the fixture
+        # provides the declaration, with the attribute fixtures of the sub-factory model overridden for the test.
+        model_factory_class = value.get_factory()
+        model_name = get_model_name(model_factory_class)
+        declarations = model_factory_class._meta.declarations
+        attributes = []
+        for dep in get_deps(model_factory_class, factory_class):
+            attr = dep[len(model_name) + len(SEPARATOR) :]
+            attributes.append((attr, dep, isinstance(declarations[attr], SubFactory)))
+        return DeclarationFixture(
+            name=attr_name,
+            function=functools.partial(
+                async_subfactory_fixture, declaration=value, model_name=model_name, attributes=tuple(attributes)
+            ),
+            dependencies=(),
+            scope=scope,
+        )
+
+    if isinstance(value, RelatedFactory) and is_async_factory(factory_class):
+        # The async model fixtures create their related factories themselves (see ``async_model_fixture``), the
+        # fixture only provides the declaration.
+        return DeclarationFixture(
+            name=attr_name, function=functools.partial(attr_fixture, value=value), dependencies=(), scope=scope
+        )
+
     if isinstance(value, (SubFactory, RelatedFactory)):
         subfactory_class: type[Factory[object]] = value.get_factory()
-        subfactory_deps = get_deps(subfactory_class, factory_class)
+        subfactory_deps = get_deps(subfactory_class, factory_class) if subfactory_class not in plain_factories else []
+        if scope == "function":
+            # The attribute fixtures of the plain declarations are related fixtures of the sub-factory model fixture.
+            prefix = "".join((get_model_name(subfactory_class), SEPARATOR))
+            direct = get_direct_attributes(subfactory_class)
+            subfactory_deps = [dep for dep in subfactory_deps if dep[len(prefix) :] not in direct]
 
         args = list(subfactory_deps)
         if isinstance(value, RelatedFactory):
@@ -231,10 +595,11 @@ def make_declaration_fixturedef(
         if isinstance(value, SubFactory):
             args.append(inflection.underscore(subfactory_class._meta.model.__name__))
 
-        return create_fixture_with_related(
+        return DeclarationFixture(
             name=attr_name,
             function=functools.partial(subfactory_fixture, factory_class=subfactory_class),
-            dependencies=args,
+            dependencies=tuple(args),
+            scope=scope,
         )
 
     deps: list[str]  # makes mypy happy
@@ -251,13 +616,60 @@ def make_declaration_fixturedef(
         value = value
         deps = []
 
-    return create_fixture_with_related(
+    return DeclarationFixture(
         name=attr_name,
         function=functools.partial(attr_fixture, value=value),
-        dependencies=deps,
+        dependencies=tuple(deps),
+        scope=scope,
+        direct=scope == "function" and is_direct(value),
+        value=value,
     )
 
 
+def is_direct(value: object) -> bool:
+    """Check if a declaration is plain, i.e. its attribute fixture returns it as is, without dependencies."""
+    return not isinstance(value, (SubFactory, PostGenerationDeclaration, LazyFixture))
+
+
+def get_direct_attributes(factory_class: type[Factory[T]]) -> frozenset[str]:
+    """Get the attributes of the plain declarations of the factory class (see ``is_direct``)."""
+    attributes = factory_attributes.get(factory_class)
+    if attributes is None:
+        attributes = factory_attributes[factory_class] = frozenset(
+            attr for attr, value in factory_class._meta.declarations.items() if is_direct(value)
+        )
+    return attributes
+
+
+def is_async_factory(factory_class: type[Factory[T]]) -> bool:
+    """Check if the factory creates its instances asynchronously.
+
+    That's the case when its ``_create`` method, its ``_after_postgeneration`` method or one of its post-generation
+    functions is a coroutine function, or when one of its sub-factories or related factories is async.
+    """
+    is_async = async_factories.get(factory_class)
+    if is_async is None:
+        is_async = async_factories[factory_class] = reaches_async_factory(factory_class, set())
+    return is_async
+
+
+def reaches_async_factory(factory_class: type[Factory[T]], visited: set[type[Factory[Any]]]) -> bool:
+    """Check if the factory, or one of the factories it creates (transitively), is async."""
+    visited.add(factory_class)
+    if inspect.iscoroutinefunction(factory_class._create) or inspect.iscoroutinefunction(
+        factory_class._after_postgeneration
+    ):
+        return True
+    for value in factory_class._meta.declarations.values():
+        if isinstance(value, PostGeneration) and inspect.iscoroutinefunction(value.function):
+            return True
+        if isinstance(value, (SubFactory, RelatedFactory)):
+            subfactory_class: type[Factory[object]] = value.get_factory()
+            if subfactory_class not in visited and reaches_async_factory(subfactory_class, visited):
+                return True
+    return False
+
+
 def inject_into_caller(name: str, function: Callable[..., object], locals_: Box[dict[str, object]]) -> None:
     """Inject a function into the caller's locals, making sure that the function will work also within classes."""
     # We need to check if the caller frame is a class, since in that case the first argument is the class itself.
@@ -279,13 +691,20 @@ def inject_into_caller(name: str, function: Callable[..., object], locals_: Box[
 
 def get_model_name(factory_class: type[Factory[T]]) -> str:
     """Get model fixture name by factory."""
+    model_name = model_names.get(factory_class)
+    if model_name is not None:
+        return model_name
+
     model_cls = factory_class._meta.model
 
     if isinstance(model_cls, str):
         return model_cls
 
     model_name = inflection.underscore(model_cls.__name__)
-    if model_cls in WARN_FOR_MODEL_TYPES:
+    if model_cls not in WARN_FOR_MODEL_TYPES:
+        model_names[factory_class] = model_name
+    else:
+        # Not cached, so that the warning is issued every time the name is needed.
         warnings.warn(
             f"Using a {model_cls} as model type for {factory_class} is discouraged by pytest-factoryboy, "
             f"as it assumes that the model name is {model_name!r} when using it as SubFactory or RelatedFactory, "
@@ -299,7 +718,10 @@ def get_model_name(factory_class: type[Factory[T]]) -> str:
 
 def get_factory_name(factory_class: type[Factory[T]]) -> str:
     """Get factory fixture name by factory."""
-    return inflection.underscore(factory_class.__name__)
+    factory_name = factory_names.get(factory_class)
+    if factory_name is None:
+        factory_name = factory_names[factory_class] = inflection.underscore(factory_class.__name__)
+    return factory_name
 
 
 def get_deps(
@@ -309,11 +731,26 @@ def get_deps(
 ) -> list[str]:
     """Get factory dependencies.
 
+    The dependencies are cached per factory class, model name and parent model name.
+
     :return: List of the fixture argument names for dependency injection.
     """
     model_name = get_model_name(factory_class) if model_name is None else model_name
     parent_model_name = get_model_name(parent_factory_class) if parent_factory_class is not None else None
 
+    cache = factory_deps.get(factory_class)
+    if cache is None:
+        cache = factory_deps[factory_class] = {}
+    key = (model_name, parent_model_name)
+    deps = cache.get(key)
+    if deps is None:
+        deps = cache[key] = compute_deps(factory_class, model_name, parent_model_name)
+    return list(deps)
+
+
+def compute_deps(factory_class: type[Factory[T]], model_name: str, parent_model_name: str | None) -> tuple[str, ...]:
+    """Compute the fixture argument names of the factory declarations, skipping the ones referring to the parent."""
+
     def is_dep(value: object) -> bool:
         if isinstance(value, RelatedFactory):
             return False
@@ -327,9 +764,9 @@ def get_deps(
 
         return True
 
-    return [
+    return tuple(
         SEPARATOR.join((model_name, attr)) for attr, value in factory_class._meta.declarations.items() if is_dep(value)
-    ]
+    )
 
 
 def evaluate(request: SubRequest, value: LazyFixture[T] | T) -> T:
@@ -342,37 +779,31 @@ def noop(*args: object, **kwargs: object) -> None:
     pass
 
 
-@contextlib.contextmanager
-def disable_method(method: MethodType) -> Iterator[None]:
-    """Disable a method."""
-    klass = method.__self__
-    method_name = method.__name__
-    old_method = getattr(klass, method_name)
-    setattr(klass, method_name, noop)
-    try:
-        yield
-    finally:
-        setattr(klass, method.__name__, old_method)
-
+def get_stripped_factory(factory_class: type[Factory[T]]) -> type[Factory[T]]:
+    """Get the subclass of the factory without post-generation declarations.
 
-def model_fixture(request: SubRequest, factory_name: str) -> object:
-    """Model fixture implementation."""
-    factoryboy_request: FactoryboyRequest = request.getfixturevalue("factoryboy_request")
-
-    # Try to evaluate as much post-generation dependencies as possible
-    factoryboy_request.evaluate(request)
+    The subclass is created once per factory class and then reused, so that factory_boy's metaclass machinery
+    doesn't run on every model fixture invocation.
+    The sequence counter is shared with the original factory, since the model is the same.
 
-    assert request.fixturename  # NOTE: satisfy mypy
-    fixture_name = request.fixturename
-    prefix = "".join((fixture_name, SEPARATOR))
+    The subclass is stored in the namespace of the factory class itself rather than in a weak-keyed mapping:
+    the subclass holds a reference to its base, so such a mapping would never release its entries.
+    Subclasses of the factory don't inherit the cached subclass, since only the class ``__dict__`` is looked up.
 
-    factory_class: type[Factory[object]] = request.getfixturevalue(factory_name)
+    factory_boy invokes the ``_after_postgeneration`` method of the subclass, which does nothing: the model fixtures
+    call the one of the factory later, once they're able to evaluate all the related fixtures. The subclass is never
+    mutated afterwards, so that model fixtures can be set up concurrently (two threads creating the subclass at the
+    same time only cache one of them).
+    """
+    stripped: type[Factory[T]] | None = factory_class.__dict__.get(STRIPPED_FACTORY_ATTR)
+    if stripped is not None:
+        return stripped
 
     # create Factory override for the model fixture
-    NewFactory: type[Factory[object]] = type("Factory", (factory_class,), {})
+    NewFactory: type[Factory[T]] = type("Factory", (factory_class,), {"_after_postgeneration": classmethod(noop)})
     # equivalent to:
     # class Factory(factory_class):
-    #     pass
+    #     _after_postgeneration = classmethod(noop)
     # NewFactory = Factory
     # del Factory
 
@@ -383,20 +814,62 @@ def model_fixture(request: SubRequest, factory_name: str) -> object:
     }
     NewFactory._meta.post_declarations = DeclarationSet()
 
-    kwargs = {}
-    for key in factory_class._meta.pre_declarations:
-        argname = "".join((prefix, key))
-        if argname in request._fixturedef.argnames:
-            kwargs[key] = evaluate(request, request.getfixturevalue(argname))
+    setattr(factory_class, STRIPPED_FACTORY_ATTR, NewFactory)
+    stripped_factories.add(factory_class)
+    return NewFactory
+
+
+@profiled("model", get_factory=lambda kwargs: kwargs["plan"].factory_class)
+def model_fixture(request: SubRequest, factory_name: str, plan: BuildPlan) -> object:
+    """Model fixture implementation."""
+    factoryboy_request = get_factoryboy_request(request)
+
+    # Try to evaluate as much post-generation dependencies as possible
+    factoryboy_request.evaluate(request)
+
+    fixture_name = plan.model_name
+    factory_class, plan = get_factory_plan(request, factory_name, plan)
+
+    NewFactory = get_stripped_factory(factory_class) if plan.attr_fixtures else factory_class
+
+    kwargs = evaluate_pre_declarations(request, plan)
+    post_overrides = evaluate_overrides(request, plan, kwargs)
+
+    strategy = factoryboy_request.get_strategy(request, default=factory_class._meta.strategy)  # type: ignore[attr-defined]
+
+    hook = request.config.hook
+    cached = hook.pytest_factoryboy_before_create(
+        request=request, factory_class=factory_class, fixture_name=fixture_name, kwargs=kwargs, strategy=strategy
+    )
+    if cached is not None:
+        # The instance is provided by a plugin (e.g. reused), it's not created nor post-generated again.
+        return cached
 
-    strategy = factory.enums.CREATE_STRATEGY
     builder = StepBuilder(NewFactory._meta, kwargs, strategy)
     step = BuildStep(builder=builder, sequence=NewFactory._meta.next_sequence())
 
-    # FactoryBoy invokes the `_after_postgeneration` method, but we will instead call it manually later,
-    # once we are able to evaluate all the related fixtures.
-    with disable_method(NewFactory._after_postgeneration):  # type: ignore[arg-type]  # https://github.com/python/mypy/issues/14235
-        instance = NewFactory(**kwargs)
+    # Without attribute fixtures, factory_boy creates the sub-factories itself: they can't be deferred.
+    deferred_flush = factoryboy_request.defer_creation(request, strategy, deferrable=plan.attr_fixtures)
+
+    start = time.perf_counter()
+    # The stripped factory doesn't invoke `_after_postgeneration`: it's called later, once we are able to evaluate
+    # all the related fixtures.
+    instance = NewFactory.generate(BUILD_STRATEGY if deferred_flush else strategy, **kwargs)
+    elapsed = time.perf_counter() - start
+    if deferred_flush:
+        cast("UnitOfWork", factoryboy_request.unit_of_work).add(factory_class, instance, kwargs.values())
+
+    usage = get_usage(request)
+    if usage is not None:
+        usage.add_instances(fixture_name, factory_class, 1, elapsed)
+    hook.pytest_factoryboy_after_create(
+        request=request,
+        factory_class=factory_class,
+        fixture_name=fixture_name,
+        kwargs=kwargs,
+        instance=instance,
+        elapsed=elapsed,
+    )
 
     # Cache the instance value on pytest level so that the fixture can be resolved before the return
     request._fixturedef.cached_result = (instance, 0, None)
@@ -405,49 +878,255 @@ def model_fixture(request: SubRequest, factory_name: str) -> object:
     # Defer post-generation declarations
     deferred: list[DeferredFunction[object, object]] = []
 
-    for attr in factory_class._meta.post_declarations.sorted():
-        decl = factory_class._meta.post_declarations.declarations[attr]
-
-        if isinstance(decl, RelatedFactory):
-            deferred.append(make_deferred_related(factory_class, fixture_name, attr))
-        else:
-            argname = "".join((prefix, attr))
-            extra = {}
-            for k, v in factory_class._meta.post_declarations.contexts[attr].items():
-                if k == "":
-                    continue
-                post_attr = SEPARATOR.join((argname, k))
-
-                if post_attr in request._fixturedef.argnames:
-                    extra[k] = evaluate(request, request.getfixturevalue(post_attr))
-                else:
-                    extra[k] = v
-            # Handle special case for ``PostGenerationMethodCall`` where
-            # `attr_fixture` value is equal to ``NotProvided``, which mean
-            # that `value_provided` should be falsy
-            postgen_value = evaluate(request, request.getfixturevalue(argname))
-            postgen_context = PostGenerationContext(
-                value_provided=(postgen_value is not NotProvided),
-                value=postgen_value,
-                extra=extra,
-            )
-            deferred.append(
-                make_deferred_postgen(step, factory_class, fixture_name, instance, attr, decl, postgen_context)
+    for post in plan.post_declarations:
+        if post.is_related:
+            deferred.append(make_deferred_related(factory_class, fixture_name, post.attr, strategy))
+            continue
+
+        deferred.append(
+            make_deferred_postgen(
+                step,
+                factory_class,
+                fixture_name,
+                instance,
+                post.attr,
+                post.declaration,
+                make_postgen_context(request, post, post_overrides),
+                strategy,
             )
+        )
     factoryboy_request.defer(deferred)
 
     # Try to evaluate as much post-generation dependencies as possible.
     # This will finally invoke Factory._after_postgeneration, which was previously disabled
     factoryboy_request.evaluate(request)
+    finalize_scoped(request, factoryboy_request)
     return instance
 
 
-def make_deferred_related(factory: type[Factory[T]], fixture: str, attr: str) -> DeferredFunction[T, object]:
+@profiled("batch", get_factory=lambda kwargs: kwargs["plan"].factory_class)
+def batch_fixture(request: SubRequest, factory_name: str, plan: BuildPlan, name: str) -> list[object]:
+    """Batch fixture implementation.
+
+    All the instances are generated by a single call to the factory batch method (``create_batch`` or
+    ``build_batch``), so that factories can override it to insert the objects in bulk.
+    Post-generation declarations are deferred per instance; related factories are called by factory_boy directly,
+    since there is a single related fixture value per test.
+    """
+    factoryboy_request = get_factoryboy_request(request)
+
+    factoryboy_request.evaluate(request)
+
+    factory_class, plan = get_factory_plan(request, factory_name, plan)
+
+    NewFactory = get_stripped_factory(factory_class) if plan.attr_fixtures else factory_class
+
+    size: int = request.getfixturevalue(SEPARATOR.join((name, "size")))
+    kwargs = evaluate_pre_declarations(request, plan)
+    post_overrides = evaluate_overrides(request, plan, kwargs)
+
+    strategy = factoryboy_request.get_strategy(request, default=factory_class._meta.strategy)  # type: ignore[attr-defined]
+
+    # The related factories of the instances are created by factory_boy, the creation of the batch can't be deferred.
+    factoryboy_request.defer_creation(request, strategy, deferrable=False)
+
+    usage = get_usage(request)
+    start = time.perf_counter() if usage is not None else 0.0
+    instances: list[object] = NewFactory.generate_batch(strategy, size, **kwargs)
+    if usage is not None:
+        usage.add_instances(name, factory_class, len(instances), time.perf_counter() - start)
+
+    deferred: list[DeferredFunction[object, object]] = []
+    # Without post-generation declarations, there's nothing to defer and no build step to prepare per instance
+    for index, instance in enumerate(instances if plan.post_declarations else ()):
+        builder = StepBuilder(NewFactory._meta, kwargs, strategy)
+        step = BuildStep(builder=builder, sequence=NewFactory._meta.next_sequence())
+        item_name = f"{name}[{index}]"
+        for post in plan.post_declarations:
+            if post.is_related:
+                context = PostGenerationContext(
+                    value_provided=False,
+                    value=NotProvided,
+                    extra={key: default for key, _, default in post.context},
+                )
+            else:
+                context = make_postgen_context(request, post, post_overrides)
+            function = make_deferred_postgen(
+                step, factory_class, item_name, instance, post.attr, post.declaration, context, strategy
+            )
+            function.instance = instance
+            if post.is_related:
+                function.main_thread = True
+                function.function = count_related_instance(
+                    function.function, SEPARATOR.join((name, post.attr)), post.declaration
+                )
+            deferred.append(function)
+    factoryboy_request.defer(deferred)
+
+    factoryboy_request.evaluate(request)
+    finalize_scoped(request, factoryboy_request)
+    return instances
+
+
+def count_related_instance(
+    function: Callable[[SubRequest], object], fixture: str, declaration: PostGenerationDeclaration
+) -> Callable[[SubRequest], object]:
+    """Count the instance created by a related factory of a batch instance in the usage of the test.
+
+    :param function: Deferred function implementation, calling the related factory.
+    :param fixture: Name the instances are counted under, e.g. "author_batch__book".
+    :param declaration: Related factory declaration.
+    """
+
+    def deferred_impl(request: SubRequest) -> object:
+        result = function(request)
+        usage = get_usage(request)
+        if usage is not None:
+            # The creation time is accounted to the post-generation declarations.
+            usage.add_instances(fixture, cast(RelatedFactory, declaration).get_factory(), 1, 0.0)
+        return result
+
+    return deferred_impl
+
+
+def get_factoryboy_request(request: SubRequest) -> FactoryboyRequest:
+    """Get the pytest-factoryboy request for the model (or batch) fixture.
+
+    Function-scoped fixtures share the request of the test. The fixtures with a broader scope outlive the test,
+    so they get a private request, finalized before the fixture returns (see ``finalize_scoped``).
+    """
+    if request.scope == "function":
+        factoryboy_request: FactoryboyRequest = request.getfixturevalue("factoryboy_request")
+        return factoryboy_request
+
+    from .plugin import make_request
+
+    return make_request(request.node, scoped=True)
+
+
+def finalize_scoped(request: SubRequest, factoryboy_request: FactoryboyRequest) -> None:
+    """Evaluate all the deferred functions of a model fixture with a broader scope than function.
+
+    The fixture value is already cached, so the deferred functions are evaluated on behalf of the parent request:
+    the fixture itself doesn't block its related factories.
+    """
+    if request.scope != "function":
+        factoryboy_request.release_fixture(request._fixturedef.argname)
+        factoryboy_request.finalize(request._parent_request)  # type: ignore[arg-type]
+
+
+def get_factory_plan(
+    request: SubRequest, factory_name: str, plan: BuildPlan
+) -> tuple[type[Factory[object]], BuildPlan]:
+    """Get the factory class from its fixture, and the build plan matching it.
+
+    :param request: Request of the model (or batch) fixture.
+    :param factory_name: Factory fixture name.
+    :param plan: Build plan compiled at registration time.
+    """
+    factory_class: type[Factory[object]] = request.getfixturevalue(factory_name)
+    if factory_class is not plan.factory_class:
+        # The factory fixture has been overridden, the plan must reflect the declarations of the new factory.
+        plan = BuildPlan.compile(
+            factory_class,
+            plan.model_name,
+            request._fixturedef.argnames,
+            strategy=plan.strategy,
+            attributes=plan.attributes,
+            attr_fixtures=plan.attr_fixtures,
+            overrides=dict(plan.overrides),
+        )
+    return factory_class, plan
+
+
+def evaluate_pre_declarations(request: SubRequest, plan: BuildPlan) -> dict[str, object]:
+    """Evaluate the attribute fixtures of the pre-declarations into the factory keyword arguments.
+
+    The attribute fixtures that are neither overridden nor parametrized for the test are not set up, the value of
+    their declaration is used directly.
+    """
+    direct = request._pyfuncitem.stash.get(direct_attributes_key, None) if plan.attributes else None
+    if not direct:
+        return {key: evaluate(request, request.getfixturevalue(argname)) for key, argname in plan.pre_declarations}
+    return {
+        key: direct[argname] if argname in direct else evaluate(request, request.getfixturevalue(argname))
+        for key, argname in plan.pre_declarations
+    }
+
+
+def evaluate_overrides(request: SubRequest, plan: BuildPlan, kwargs: dict[str, object]) -> dict[str, object]:
+    """Evaluate the overrides of the model fixture into the factory keyword arguments.
+
+    These are the attributes overridden at registration when there are no attribute fixtures, then the ones of the
+    ``factory`` markers of the node. The overrides take precedence over the attribute fixtures.
+
+    :param request: Request of the model (or batch) fixture.
+    :param plan: Build plan.
+    :param kwargs: Factory keyword arguments, updated in place.
+    :return: The overrides of the post-generation declarations and of their context, when the factory class has no
+        post-generation declarations (see ``get_stripped_factory``).
+    """
+    from .plugin import get_marker_overrides
+
+    marker_overrides = get_marker_overrides(request.node).get(plan.model_name)
+    if not plan.overrides and not marker_overrides:
+        return {}
+    overrides = {**dict(plan.overrides), **(marker_overrides or {})}
+
+    post_overrides = {}
+    for attr, value in overrides.items():
+        if attr in plan.post_attributes:
+            post_overrides[attr] = evaluate(request, value)
+        else:
+            kwargs[attr] = evaluate(request, value)
+    for post in plan.post_declarations:
+        assert not post.is_related or post.attr not in post_overrides, (
+            f"Can't override the related factory {post.argname!r} with the factory marker, override the "
+            f"{post.argname!r} fixture instead."
+        )
+    return post_overrides
+
+
+def make_postgen_context(
+    request: SubRequest, post: PostDeclarationPlan, overrides: Mapping[str, object] | None = None
+) -> PostGenerationContext:
+    """Make the context of a post-generation declaration from its attribute fixtures.
+
+    :param overrides: Overrides of the post-generation declarations and of their context (see ``evaluate_overrides``).
+    """
+    overrides = overrides or {}
+    extra = {}
+    for key, argname, default in post.context:
+        override = SEPARATOR.join((post.attr, key))
+        if override in overrides:
+            extra[key] = overrides[override]
+        elif argname is not None:
+            extra[key] = evaluate(request, request.getfixturevalue(argname))
+        else:
+            extra[key] = default
+    # Handle special case for ``PostGenerationMethodCall`` where
+    # `attr_fixture` value is equal to ``NotProvided``, which mean
+    # that `value_provided` should be falsy
+    if post.attr in overrides:
+        postgen_value = overrides[post.attr]
+    else:
+        postgen_value = evaluate(request, request.getfixturevalue(post.argname))
+    return PostGenerationContext(
+        value_provided=(postgen_value is not NotProvided),
+        value=postgen_value,
+        extra=extra,
+    )
+
+
+def make_deferred_related(
+    factory: type[Factory[T]], fixture: str, attr: str, strategy: str = CREATE_STRATEGY
+) -> DeferredFunction[T, object]:
     """Make deferred function for the related factory declaration.
 
     :param factory: Factory class.
     :param fixture: Object fixture name e.g. "book".
     :param attr: Declaration attribute name e.g. "publications".
+    :param strategy: Strategy used to create the object, inherited by the related object.
 
     :note: Deferred function name results in "book__publication".
     """
@@ -461,6 +1140,7 @@ def make_deferred_related(factory: type[Factory[T]], fixture: str, attr: str) ->
         factory=factory,
         is_related=True,
         function=deferred_impl,
+        strategy=strategy,
     )
 
 
@@ -472,6 +1152,7 @@ def make_deferred_postgen(
     attr: str,
     declaration: PostGenerationDeclaration,
     context: PostGenerationContext,
+    strategy: str = CREATE_STRATEGY,
 ) -> DeferredFunction[T, object]:
     """Make deferred function for the post-generation declaration.
 
@@ -482,6 +1163,7 @@ def make_deferred_postgen(
     :param attr: Declaration attribute name e.g. "register_user".
     :param declaration: Post-generation declaration.
     :param context: Post-generation declaration context.
+    :param strategy: Strategy used to create the object.
 
     :note: Deferred function name results in "author__register_user".
     """
@@ -495,6 +1177,7 @@ def make_deferred_postgen(
         factory=factory_class,
         is_related=False,
         function=deferred_impl,
+        strategy=strategy,
     )
 
 
@@ -503,11 +1186,13 @@ def factory_fixture(request: SubRequest, factory_class: type[Factory[T]]) -> typ
     return factory_class
 
 
+@profiled("attr")
 def attr_fixture(request: SubRequest, value: T) -> T:
     """Attribute fixture implementation."""
     return value
 
 
+@profiled("subfactory", get_factory=lambda kwargs: kwargs["factory_class"])
 def subfactory_fixture(request: SubRequest, factory_class: type[Factory[object]]) -> object:
     """SubFactory/RelatedFactory fixture implementation."""
     fixture = inflection.underscore(factory_class._meta.model.__name__)
@@ -540,6 +1225,14 @@ class LazyFixture(Generic[T]):
         :param request: pytest request object.
         :return: evaluated fixture.
         """
+        profiler = get_profiler(request)
+        if profiler is None:
+            return self.evaluate_fixture(request)
+        name = self.fixture if isinstance(self.fixture, str) else self.fixture.__name__
+        with profiler.measure("lazy", name):
+            return self.evaluate_fixture(request)
+
+    def evaluate_fixture(self, request: SubRequest) -> T:
         if callable(self.fixture):
             kwargs = {arg: request.getfixturevalue(arg) for arg in self.args}
             return self.fixture(**kwargs)
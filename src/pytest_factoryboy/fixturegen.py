@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import functools
 import inspect
+import sys
 from collections.abc import Collection
-from typing import Callable, TypeVar
+from typing import Any, Callable, Literal, TypeVar, cast
 
 import pytest
 from typing_extensions import ParamSpec
@@ -13,17 +14,41 @@ from .compat import PytestFixtureT
 T = TypeVar("T")
 P = ParamSpec("P")
 
+ScopeName = Literal["session", "package", "module", "class", "function"]
+#: Fixture scopes, from the broadest to the narrowest.
+SCOPES: tuple[ScopeName, ...] = ("session", "package", "module", "class", "function")
+
+ALLOWED_PARAM_KINDS = frozenset({inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY})
+
+FIXTURE_FUNCTION_TEMPLATE = """\
+def make({make_args}):
+    def fixture{signature}:
+        return __function({arguments})
+
+    return fixture
+"""
+#: Template of the fixture functions calling a coroutine function, which pytest-asyncio runs in its event loop.
+ASYNC_FIXTURE_FUNCTION_TEMPLATE = """\
+def make({make_args}):
+    async def fixture{signature}:
+        return await __function({arguments})
+
+    return fixture
+"""
+
 
 def create_fixture(
     name: str,
     function: Callable[P, T],
     dependencies: Collection[str] | None = None,
+    scope: ScopeName = "function",
 ) -> tuple[PytestFixtureT, Callable[P, T]]:
     """Dynamically create a pytest fixture.
 
     :param name: Name of the fixture.
     :param function: Function to be called.
     :param dependencies: List of fixtures dependencies, but that will not be passed to ``function``.
+    :param scope: Scope of the fixture.
     :return: The created fixture function and the actual function.
 
     Example:
@@ -40,54 +65,101 @@ def create_fixture(
             def book(name, db):
                 return Book(name=name)
     """
-    if dependencies is None:
-        dependencies = []
+    fn = make_fixture_function(function, dependencies or ())
+    if inspect.iscoroutinefunction(function):
+        fixture = create_async_fixture(name, fn, scope)
+    else:
+        fixture = pytest.fixture(name=name, scope=scope, fixture_function=fn)
+
+    return fixture, fn
 
-    @usefixtures(*dependencies)
-    @functools.wraps(function)
-    def fn(*args: P.args, **kwargs: P.kwargs) -> T:
-        return function(*args, **kwargs)
 
-    fixture = pytest.fixture(name=name, fixture_function=fn)
+def create_async_fixture(name: str, fn: Callable[P, T], scope: ScopeName) -> PytestFixtureT:
+    """Create a pytest fixture from a coroutine function, marked for pytest-asyncio if it's installed.
 
-    return fixture, fn
+    pytest-asyncio (in strict mode) only runs the async fixtures declared with its own decorator. Without it, the
+    fixture is left to the other plugins running async fixtures (e.g. anyio).
+    """
+    try:
+        import pytest_asyncio
+    except ImportError:  # pytest-asyncio is not installed
+        return pytest.fixture(name=name, scope=scope, fixture_function=fn)
+    return cast(PytestFixtureT, pytest_asyncio.fixture(fn, name=name, scope=scope))
 
 
-def usefixtures(*fixtures: str) -> Callable[[Callable[P, T]], Callable[P, T]]:
-    """Like ``@pytest.mark.usefixtures(...)``, but for fixture functions."""
-
-    def inner(fixture_function: Callable[P, T]) -> Callable[P, T]:
-        function_params = list(inspect.signature(fixture_function).parameters.values())
-        allowed_param_kinds = {inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY}
-        # This is exactly what pytest does (at the moment) to discover which args to inject as fixtures.
-        function_args = {
-            param.name
-            for param in function_params
-            if param.kind in allowed_param_kinds
-            # Ignoring parameters with a default allows us to use ``functools.partial``s.
-            and param.default == inspect.Parameter.empty
-        }
-
-        use_fixtures_params = [
-            inspect.Parameter(name=name, kind=inspect.Parameter.KEYWORD_ONLY)
-            for name in fixtures
-            if name not in function_args  # if the name is already in the function signature, don't add it again
-        ]
-        # If the function ends with **kwargs, we have to insert our params before that.
-        if function_params and function_params[-1].kind == inspect.Parameter.VAR_KEYWORD:
-            insert_pos = len(function_params) - 1
-        else:
-            insert_pos = len(function_params)
-
-        params = function_params[0:insert_pos] + use_fixtures_params + function_params[insert_pos:]
-
-        @functools.wraps(fixture_function)
-        def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
-            for k in set(kwargs.keys()) - function_args:
-                del kwargs[k]
-            return fixture_function(*args, **kwargs)
-
-        wrapper.__signature__ = inspect.signature(wrapper).replace(parameters=params)  # type: ignore[attr-defined]
-        return wrapper
-
-    return inner
+def make_fixture_function(function: Callable[P, T], dependencies: Collection[str]) -> Callable[P, T]:
+    """Make the fixture function calling ``function``, with the dependencies added to its signature.
+
+    The fixture function is generated with the exact signature pytest injects the fixtures into, and calls the
+    function (unwrapped from its ``functools.partial``, if any) with only its own arguments: a single Python frame,
+    without building or filtering the keyword arguments on every call.
+    """
+    target: Callable[..., T] = function
+    args: tuple[object, ...] = ()
+    keywords: dict[str, object] = {}
+    if isinstance(function, functools.partial):
+        target, args, keywords = function.func, function.args, function.keywords
+
+    # This is exactly what pytest does (at the moment) to discover which args to inject as fixtures.
+    # Ignoring parameters with a default allows us to use ``functools.partial``s.
+    function_params = [
+        param
+        for param in inspect.signature(function).parameters.values()
+        if param.kind in ALLOWED_PARAM_KINDS and param.default is inspect.Parameter.empty
+    ]
+    function_args = tuple(param.name for param in function_params)
+    params = [
+        *(param.replace(annotation=inspect.Parameter.empty) for param in function_params),
+        *(
+            # Interned, like the parameter names of the compiled function: pytest passes the fixture values keyed by
+            # these names, and Python matches keyword arguments to parameters by identity first.
+            inspect.Parameter(name=sys.intern(name), kind=inspect.Parameter.KEYWORD_ONLY)
+            for name in dict.fromkeys(dependencies)
+            # if the name is already in the function signature, don't add it again
+            if name not in function_args
+        ),
+    ]
+    signature = inspect.Signature(params)
+
+    make = compile_fixture_function(
+        str(signature), len(args), function_args, tuple(keywords), is_async=inspect.iscoroutinefunction(function)
+    )
+    fn: Callable[P, T] = make(target, *args, *keywords.values())
+    functools.update_wrapper(fn, function)
+    # ``update_wrapper`` sets ``__wrapped__``, whose signature pytest would use otherwise.
+    fn.__signature__ = signature  # type: ignore[attr-defined]
+    return fn
+
+
+@functools.lru_cache(maxsize=None)
+def compile_fixture_function(
+    signature: str, args: int, function_args: tuple[str, ...], keywords: tuple[str, ...], is_async: bool = False
+) -> Callable[..., Callable[..., Any]]:
+    """Compile the factory of the fixture functions with the given shape.
+
+    The generated fixtures of a registration mostly share a few shapes (e.g. every attribute fixture), so the
+    compilation is cached by shape, the function and its bound arguments being passed to the returned factory.
+
+    :param signature: Signature of the fixture function.
+    :param args: Number of positional arguments bound by the ``functools.partial``.
+    :param function_args: Arguments of the function injected by pytest.
+    :param keywords: Keyword arguments bound by the ``functools.partial``.
+    :param is_async: The function is a coroutine function, the fixture function awaits it.
+    """
+    bound_args = [f"__arg_{i}" for i in range(args)]
+    bound_keywords = [f"__keyword_{i}" for i in range(len(keywords))]
+    arguments = [
+        *bound_args,
+        *(f"{name}={name}" for name in function_args),
+        *(f"{name}={bound}" for name, bound in zip(keywords, bound_keywords)),
+    ]
+    template = ASYNC_FIXTURE_FUNCTION_TEMPLATE if is_async else FIXTURE_FUNCTION_TEMPLATE
+    source = template.format(
+        make_args=", ".join(["__function", *bound_args, *bound_keywords]),
+        signature=signature,
+        arguments=", ".join(arguments),
+    )
+    namespace: dict[str, Any] = {"__name__": __name__}
+    exec(compile(source, "<pytest-factoryboy fixture>", "exec"), namespace)
+    make: Callable[..., Callable[..., Any]] = namespace["make"]
+    return make
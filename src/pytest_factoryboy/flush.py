@@ -0,0 +1,212 @@
+"""Deferred flush of the model instances created by a test (``factoryboy_deferred_flush`` marker).
+
+The model fixtures using the create strategy build their instances instead, and add them to the unit of work of the
+test. It's flushed once all the fixtures are set up, right before the test is called: the instances are persisted in
+dependency order by the ``pytest_factoryboy_flush`` hook implementations, with one call per factory and dependency
+level. The model fixtures requested afterwards (e.g. by the test itself) create their instances right away.
+The post-generation declarations (other than the related factories) of a pending instance, and its overridden
+``_after_postgeneration``, expect it to be persisted: the unit of work is flushed before they're evaluated.
+``SQLiteFlush`` is the reference implementation for sqlite3.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from collections.abc import Iterable, Mapping
+from typing import TYPE_CHECKING
+
+import pytest
+
+from .profiling import get_profiler
+
+if TYPE_CHECKING:
+    import sqlite3
+
+    from _pytest.fixtures import FixtureRequest
+    from _pytest.nodes import Node
+    from factory.base import Factory
+
+
+def is_deferred_flush(node: Node) -> bool:
+    """Check if the model instances of the node are flushed at the end of its setup.
+
+    The closest ``factoryboy_deferred_flush`` marker has the precedence over the ``factoryboy_deferred_flush`` ini
+    option.
+    """
+    marker = node.get_closest_marker("factoryboy_deferred_flush")
+    if marker is not None:
+        enabled = marker.args[0] if marker.args else marker.kwargs.get("enabled", True)
+        return bool(enabled)
+    return bool(node.config.getini("factoryboy_deferred_flush"))
+
+
+class FlushError(Exception):
+    """Raised when the instances of the unit of work of a test are not persisted."""
+
+
+class UnitOfWork:
+    """Model instances built by the model fixtures of a test, to be persisted in bulk."""
+
+    def __init__(self) -> None:
+        #: ``(factory_class, instance, level)`` triples, in creation order.
+        self.pending: list[tuple[type[Factory[object]], object, int]] = []
+        #: Dependency levels of the pending instances, keyed by instance id. An instance has a greater level than the
+        #: pending instances it was created with.
+        self.levels: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def __contains__(self, instance: object) -> bool:
+        return id(instance) in self.levels
+
+    def add(self, factory_class: type[Factory[object]], instance: object, dependencies: Iterable[object]) -> None:
+        """Add a built instance.
+
+        :param factory_class: Factory class the instance is persisted with.
+        :param instance: Built instance.
+        :param dependencies: Values the instance was built with (e.g. the factory keyword arguments). The pending
+            instances among them are persisted before it.
+        """
+        levels = self.levels
+        level = max((levels[id(value)] + 1 for value in dependencies if id(value) in levels), default=0)
+        levels[id(instance)] = level
+        self.pending.append((factory_class, instance, level))
+
+    def batches(self) -> list[tuple[type[Factory[object]], list[object]]]:
+        """Group the pending instances per dependency level and factory class, in dependency order.
+
+        Within a level, the factory classes are ordered by their first instance.
+        """
+        groups: dict[tuple[int, type[Factory[object]]], list[object]] = {}
+        for factory_class, instance, level in sorted(self.pending, key=lambda entry: entry[2]):
+            groups.setdefault((level, factory_class), []).append(instance)
+        return [(factory_class, instances) for (_, factory_class), instances in groups.items()]
+
+    def flush(self, request: FixtureRequest) -> None:
+        """Persist the pending instances with the ``pytest_factoryboy_flush`` hook, one batch at a time.
+
+        :raises FlushError: If no hook implementation persisted a batch.
+        """
+        batches = self.batches()
+        self.pending = []
+        self.levels = {}
+
+        hook = request.config.hook
+        profiler = get_profiler(request)
+        for factory_class, instances in batches:
+            if profiler is None:
+                flushed = hook.pytest_factoryboy_flush(
+                    request=request, factory_class=factory_class, instances=instances
+                )
+            else:
+                with profiler.measure("flush", factory_class.__name__, factory_class):
+                    flushed = hook.pytest_factoryboy_flush(
+                        request=request, factory_class=factory_class, instances=instances
+                    )
+            if not flushed:
+                raise FlushError(
+                    f"No pytest_factoryboy_flush hook implementation persisted the {len(instances)} instances of "
+                    f"{factory_class.__name__}."
+                )
+
+
+class SQLiteFlush:
+    """``pytest_factoryboy_flush`` implementation inserting the instances into sqlite3 tables.
+
+    The instances of a factory are inserted with a single ``executemany`` per batch, into the table of their model.
+    The columns are the ones of the table matching an attribute of the instances: either the attribute itself, or
+    ``<attribute>_id`` for the attributes referring to an instance of another mapped model, which is stored as its
+    primary key. The instances without primary key get the next ones of their table, so that the instances referring
+    to them can be inserted afterwards. The transaction is not committed.
+
+    Register it as a plugin, e.g. in ``conftest.py``:
+
+    .. code-block:: python
+
+        def pytest_configure(config):
+            config.pluginmanager.register(SQLiteFlush("connection", {Author: "author", Book: "book"}))
+    """
+
+    def __init__(
+        self, connection: sqlite3.Connection | str, tables: Mapping[type, str], primary_key: str = "id"
+    ) -> None:
+        """Create the sqlite3 flush.
+
+        :param connection: Connection to the database, or the name of the fixture providing it.
+        :param tables: Table names, keyed by model class. The instances of the other models are left to the other
+            hook implementations.
+        :param primary_key: Name of the primary key column and attribute of the models.
+        """
+        self.connection = connection
+        self.tables = tables
+        self.primary_key = primary_key
+
+    @pytest.hookimpl
+    def pytest_factoryboy_flush(
+        self, request: FixtureRequest, factory_class: type[Factory[object]], instances: list[object]
+    ) -> bool | None:
+        """Insert the instances into the table of their model."""
+        table = self.tables.get(factory_class._meta.model)
+        if table is None:
+            return None
+        connection: sqlite3.Connection = (
+            request.getfixturevalue(self.connection) if isinstance(self.connection, str) else self.connection
+        )
+
+        self.assign_primary_keys(connection, table, instances)
+        attributes = get_attributes(instances[0])
+        columns = []
+        getters = []
+        for column in self.get_columns(connection, table):
+            if column in attributes:
+                columns.append(column)
+                getters.append(column)
+            elif column.endswith("_id") and column[: -len("_id")] in attributes:
+                columns.append(column)
+                getters.append(column[: -len("_id")])
+
+        rows = [tuple(self.get_value(getattr(instance, attr)) for attr in getters) for instance in instances]
+        connection.executemany(
+            f"INSERT INTO {quote(table)} ({', '.join(map(quote, columns))}) "
+            f"VALUES ({', '.join('?' for _ in columns)})",
+            rows,
+        )
+        return True
+
+    def get_value(self, value: object) -> object:
+        """Get the column value of an attribute: the primary key of the instances of the mapped models."""
+        if type(value) in self.tables:
+            return getattr(value, self.primary_key)
+        return value
+
+    def get_columns(self, connection: sqlite3.Connection, table: str) -> tuple[str, ...]:
+        """Get the column names of the table.
+
+        They're not cached: the table may be altered, and a new connection may get the address of a closed one (the
+        sqlite3 connections can't be weakly referenced).
+        """
+        rows = connection.execute(f"PRAGMA table_info({quote(table)})").fetchall()
+        return tuple(row[1] for row in rows)
+
+    def assign_primary_keys(self, connection: sqlite3.Connection, table: str, instances: list[object]) -> None:
+        """Assign the next primary keys of the table to the instances without primary key."""
+        missing = [instance for instance in instances if getattr(instance, self.primary_key, None) is None]
+        if not missing:
+            return
+        pk = quote(self.primary_key)
+        (last,) = connection.execute(f"SELECT COALESCE(MAX({pk}), 0) FROM {quote(table)}").fetchone()
+        for offset, instance in enumerate(missing, start=1):
+            setattr(instance, self.primary_key, last + offset)
+
+
+def get_attributes(instance: object) -> frozenset[str]:
+    """Get the attribute names of a model instance (a dataclass or a plain object)."""
+    if dataclasses.is_dataclass(instance):
+        return frozenset(field.name for field in dataclasses.fields(instance))
+    return frozenset(vars(instance))
+
+
+def quote(identifier: str) -> str:
+    """Quote an SQL identifier."""
+    return '"{}"'.format(identifier.replace('"', '""'))
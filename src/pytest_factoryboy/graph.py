@@ -0,0 +1,233 @@
+"""Dependency graph of the generated fixtures (``--factoryboy-graph``)."""
+
+from __future__ import annotations
+
+import dataclasses
+import functools
+import inspect
+import json
+from collections import deque
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .asyncfixture import async_model_fixture, async_subfactory_fixture
+from .fixture import (
+    attr_fixture,
+    batch_fixture,
+    factory_fixture,
+    model_fixture,
+    subfactory_fixture,
+)
+from .registry import model_plans, related_fixtures
+
+if TYPE_CHECKING:
+    from _pytest.fixtures import FixtureDef
+
+#: Kinds of the generated fixtures, keyed by the function they call.
+FIXTURE_KINDS: dict[object, str] = {
+    model_fixture: "model",
+    async_model_fixture: "model",
+    batch_fixture: "batch",
+    factory_fixture: "factory",
+    attr_fixture: "attr",
+    subfactory_fixture: "subfactory",
+    async_subfactory_fixture: "subfactory",
+}
+
+#: Suffixes of the files written in the DOT format, JSON is used otherwise.
+DOT_SUFFIXES = frozenset({".dot", ".gv"})
+
+
+@dataclass(frozen=True)
+class FixtureNode:
+    """Generated fixture of the graph."""
+
+    name: str
+    #: Node id prefix of the fixture definition ("" for the root conftest.py).
+    baseid: str
+    #: "model", "batch", "factory", "attr", "subfactory" or "related".
+    kind: str
+    scope: str
+    #: Dotted path of the factory class, if the fixture is bound to one.
+    factory: str | None
+    dependencies: tuple[str, ...]
+    related: tuple[str, ...]
+
+    @property
+    def id(self) -> str:
+        return f"{self.baseid}::{self.name}" if self.baseid else self.name
+
+    def to_json(self) -> dict[str, object]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "baseid": self.baseid,
+            "kind": self.kind,
+            "scope": self.scope,
+            "factory": self.factory,
+            "dependencies": list(self.dependencies),
+            "related": list(self.related),
+        }
+
+
+class FixtureGraph:
+    """Graph of the generated fixtures, their dependencies and related fixtures."""
+
+    def __init__(self, arg2fixturedefs: Mapping[str, Sequence[FixtureDef[object]]]) -> None:
+        """Build the graph from the fixture definitions of the session.
+
+        :param arg2fixturedefs: Fixture definitions keyed by name, from the broadest to the narrowest visibility.
+        """
+        self.fixturedefs = arg2fixturedefs
+        self.nodes: list[FixtureNode] = []
+        for name, fixturedefs in arg2fixturedefs.items():
+            for fixturedef in fixturedefs:
+                node = make_node(name, fixturedef)
+                if node is not None:
+                    self.nodes.append(node)
+        # Related factory attribute fixtures are sub-factory fixtures listed in the related fixtures of their model.
+        related_names = {name for node in self.nodes for name in node.related}
+        self.nodes = [
+            (
+                dataclasses.replace(node, kind="related")
+                if node.kind == "subfactory" and node.name in related_names
+                else node
+            )
+            for node in self.nodes
+        ]
+        self.nodes.sort(key=lambda node: (node.baseid, node.name))
+
+    def closure(self, node: FixtureNode) -> set[str]:
+        """Names of the fixtures a test using the fixture requires (including the related fixtures).
+
+        The names are resolved as seen from the module (or directory) the fixture is defined in.
+        """
+        closure: set[str] = set()
+        pending = deque(node.dependencies + node.related)
+        while pending:
+            name = pending.popleft()
+            if name in closure or name == "request":
+                continue
+            closure.add(name)
+            fixturedef = self.resolve(name, node.baseid)
+            if fixturedef is None:
+                continue
+            pending.extend(fixturedef.argnames)
+            pending.extend(related_fixtures.get(fixturedef.func, ()))
+        return closure
+
+    def resolve(self, name: str, baseid: str) -> FixtureDef[object] | None:
+        """Get the narrowest definition of the fixture visible from the base node id."""
+        for fixturedef in reversed(self.fixturedefs.get(name, ())):
+            if is_visible(fixturedef.baseid, baseid):
+                return fixturedef
+        return None
+
+    def to_json(self) -> dict[str, object]:
+        """Get the fixtures, the model fixture statistics and the summary of the graph."""
+        fan_in: dict[str, int] = {}
+        for node in self.nodes:
+            for name in node.dependencies + node.related:
+                fan_in[name] = fan_in.get(name, 0) + 1
+
+        model_nodes = [node for node in self.nodes if node.kind in {"model", "batch"}]
+        closure_sizes = {node.id: len(self.closure(node)) for node in model_nodes}
+        model_nodes.sort(key=lambda node: closure_sizes[node.id], reverse=True)
+        models = [
+            {
+                "id": node.id,
+                "name": node.name,
+                "factory": node.factory,
+                "fan_out": len(node.dependencies) + len(node.related),
+                "fan_in": fan_in.get(node.name, 0),
+                "closure_size": closure_sizes[node.id],
+            }
+            for node in model_nodes
+        ]
+
+        kinds: dict[str, int] = {}
+        for node in self.nodes:
+            kinds[node.kind] = kinds.get(node.kind, 0) + 1
+        return {
+            "fixtures": [node.to_json() for node in self.nodes],
+            "models": models,
+            "summary": {
+                "fixtures": len(self.nodes),
+                "kinds": kinds,
+                "dependency_edges": sum(len(node.dependencies) for node in self.nodes),
+                "related_edges": sum(len(node.related) for node in self.nodes),
+                "max_closure_size": max(closure_sizes.values(), default=0),
+            },
+        }
+
+    def to_dot(self) -> str:
+        """Get the graph in the Graphviz DOT format. Related fixtures are the dashed edges."""
+        lines = ["digraph factoryboy {", "    rankdir=LR;", "    node [shape=box];"]
+        for node in self.nodes:
+            lines.append(f"    {quote(node.id)} [label={quote(f'{node.name} ({node.kind})')}];")
+        for node in self.nodes:
+            lines.extend(f"    {quote(node.id)} -> {quote(self.target_id(name, node))};" for name in node.dependencies)
+            lines.extend(
+                f"    {quote(node.id)} -> {quote(self.target_id(name, node))} [style=dashed];" for name in node.related
+            )
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+    def target_id(self, name: str, node: FixtureNode) -> str:
+        fixturedef = self.resolve(name, node.baseid)
+        if fixturedef is None or not fixturedef.baseid:
+            return name
+        return f"{fixturedef.baseid}::{name}"
+
+    def write(self, path: Path) -> None:
+        """Write the graph, in the DOT format if the file suffix is ``.dot`` (or ``.gv``), as JSON otherwise."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix in DOT_SUFFIXES:
+            path.write_text(self.to_dot())
+        else:
+            path.write_text(json.dumps(self.to_json(), indent=2))
+
+
+def make_node(name: str, fixturedef: FixtureDef[object]) -> FixtureNode | None:
+    """Make the graph node of a fixture definition, if it's generated by pytest-factoryboy."""
+    if not getattr(fixturedef.func, "_factoryboy_generated", False):
+        return None
+    function = inspect.unwrap(fixturedef.func)
+    kind = "attr"
+    factory_class = None
+    if isinstance(function, functools.partial):
+        kind = FIXTURE_KINDS.get(function.func, kind)
+        factory_class = function.keywords.get("factory_class")
+        if "declaration" in function.keywords:
+            # The sub-factory fixtures of the async factories are bound to their declaration.
+            factory_class = function.keywords["declaration"].get_factory()
+    dependencies = tuple(argname for argname in fixturedef.argnames if argname != "request")
+    related = related_fixtures.get(fixturedef.func, ())
+    plan = model_plans.get(fixturedef.func)
+    if plan is not None:
+        factory_class = plan.factory_class
+        # The attribute fixtures of the plain declarations are dependencies, resolved by the plugin.
+        dependencies += tuple(name for name in related if name in plan.attributes)
+        related = tuple(name for name in related if name not in plan.attributes)
+    return FixtureNode(
+        name=name,
+        baseid=fixturedef.baseid,
+        kind=kind,
+        scope=fixturedef.scope,
+        factory=f"{factory_class.__module__}.{factory_class.__qualname__}" if factory_class is not None else None,
+        dependencies=dependencies,
+        related=related,
+    )
+
+
+def is_visible(fixture_baseid: str, baseid: str) -> bool:
+    """Check if a fixture defined for the base node id is visible from another base node id."""
+    if not fixture_baseid or fixture_baseid == baseid:
+        return True
+    return baseid.startswith(fixture_baseid) and baseid[len(fixture_baseid)] in "/:"
+
+
+def quote(value: str) -> str:
+    return json.dumps(value)
@@ -4,9 +4,110 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+import pytest
+
 if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from factory.base import Factory
     from pytest import FixtureRequest
 
+    from .fixture import DeferredFunction
+
 
 def pytest_factoryboy_done(request: FixtureRequest) -> None:
     """Called after all factory based fixtures and their post-generation actions were evaluated."""
+
+
+@pytest.hookspec(firstresult=True)
+def pytest_factoryboy_before_create(
+    request: FixtureRequest,
+    factory_class: type[Factory[object]],
+    fixture_name: str,
+    kwargs: dict[str, object],
+    strategy: str,
+) -> object | None:
+    """Called before a model fixture creates its instance.
+
+    Stops at the first non-None result, which is then used as the value of the model fixture: the instance is
+    neither created nor post-generated (e.g. it's reused from a cache).
+
+    :param request: Request of the model fixture.
+    :param factory_class: Factory class.
+    :param fixture_name: Model fixture name.
+    :param kwargs: Keyword arguments the instance is created with, resolved from the attribute fixtures.
+        They can be modified.
+    :param strategy: factory_boy strategy used to create the instance.
+    """
+
+
+def pytest_factoryboy_after_create(
+    request: FixtureRequest,
+    factory_class: type[Factory[object]],
+    fixture_name: str,
+    kwargs: Mapping[str, object],
+    instance: object,
+    elapsed: float,
+) -> None:
+    """Called after a model fixture created its instance, before its post-generation declarations are evaluated.
+
+    :param request: Request of the model fixture.
+    :param factory_class: Factory class.
+    :param fixture_name: Model fixture name.
+    :param kwargs: Keyword arguments the instance was created with.
+    :param instance: Created instance.
+    :param elapsed: Wall time of the creation, in seconds.
+    """
+
+
+def pytest_factoryboy_before_deferred(request: FixtureRequest, function: DeferredFunction[object, object]) -> None:
+    """Called before a deferred post-generation declaration (or related factory) is evaluated.
+
+    :param request: Request the deferred function is evaluated with.
+    :param function: Deferred function, e.g. named "book__edition".
+    """
+
+
+def pytest_factoryboy_after_deferred(
+    request: FixtureRequest, function: DeferredFunction[object, object], result: object, elapsed: float
+) -> None:
+    """Called after a deferred post-generation declaration (or related factory) is evaluated.
+
+    :param request: Request the deferred function was evaluated with.
+    :param function: Deferred function.
+    :param result: Result of the declaration, passed to ``_after_postgeneration``.
+    :param elapsed: Wall time of the evaluation, in seconds.
+    """
+
+
+def pytest_factoryboy_after_postgeneration(
+    request: FixtureRequest,
+    factory_class: type[Factory[object]],
+    instance: object,
+    create: bool,
+    results: Mapping[str, object],
+) -> None:
+    """Called after the ``_after_postgeneration`` method of the factory was called for an instance.
+
+    :param request: Request the post-generation declarations were evaluated with.
+    :param factory_class: Factory class.
+    :param instance: Model instance.
+    :param create: Whether the instance was created with the create strategy.
+    :param results: Results of the post-generation declarations, keyed by attribute.
+    """
+
+
+@pytest.hookspec(firstresult=True)
+def pytest_factoryboy_flush(
+    request: FixtureRequest, factory_class: type[Factory[object]], instances: list[object]
+) -> bool | None:
+    """Called to persist in bulk the instances built by the model fixtures, in deferred flush mode.
+
+    Stops at the first non-None result. The hook is called in dependency order, once per factory class and dependency
+    level: the instances the batch refers to are persisted by the previous calls.
+
+    :param request: Request of the test.
+    :param factory_class: Factory class of the instances.
+    :param instances: Instances to persist, in creation order.
+    :return: ``True`` if the instances were persisted, ``None`` to leave them to the other implementations.
+    """
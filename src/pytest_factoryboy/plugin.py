@@ -2,117 +2,987 @@
 
 from __future__ import annotations
 
-from collections import defaultdict
+import inspect
+import time
+import warnings
+from collections import defaultdict, deque
+from collections.abc import Collection, Generator, Iterable, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
 
+import pluggy
 import pytest
-from _pytest.config import PytestPluginManager
-from _pytest.fixtures import FixtureRequest, SubRequest
-from _pytest.nodes import Item
+from _pytest.config import Config, PytestPluginManager
+from _pytest.config.argparsing import Parser
+from _pytest.fixtures import (
+    FixtureDef,
+    FixtureManager,
+    FixtureRequest,
+    FuncFixtureInfo,
+    SubRequest,
+)
+from _pytest.nodes import Item, Node
 from _pytest.python import Metafunc
-from factory.base import Factory
+from _pytest.terminal import TerminalReporter
 
-from .compat import getfixturedefs
-from .fixture import DeferredFunction
+from .budget import Budget, BudgetExceededWarning, budget_key, default_budget_key
+from .compat import getfixturedefs, register_fixture
+from .fixturegen import SCOPES
+from .flush import FlushError, UnitOfWork, is_deferred_flush
+from .profiling import Profiler, get_profiler, profiler_key
+from .registry import (
+    SEPARATOR,
+    STRATEGIES,
+    attribute_values,
+    direct_attributes_key,
+    invalidate_factory_cache,
+    lazy_declarations,
+    model_plans,
+    related_fixtures,
+)
+from .reporting import ItemUsage, UsageReport, get_usage, usage_key
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor, Future
+
+    from factory.base import Factory
+
+    from .fixture import DeferredFunction
+
+
+class FixtureScopeMismatch(Exception):
+    """Raised when a generated fixture depends on a fixture with a narrower scope."""
 
 
 class CycleDetected(Exception):
-    pass
+    """Raised when deferred post-generation declarations can't be evaluated because of a dependency cycle."""
+
+
+def get_fixture_closure(fixture: str, get_argnames: Callable[[str], Iterable[str]]) -> frozenset[str]:
+    """Get the names of the fixture and all of its transitive dependencies.
+
+    :param fixture: Fixture name.
+    :param get_argnames: Function returning the direct dependencies of a fixture.
+    """
+    closure = {fixture}
+    pending = [fixture]
+    while pending:
+        name = pending.pop()
+        if name == "request":
+            continue
+        for argname in get_argnames(name):
+            if argname not in closure:
+                closure.add(argname)
+                pending.append(argname)
+    return frozenset(closure)
+
+
+@dataclass(eq=False)
+class Batch:
+    """Deferred functions of a model (or batch) fixture instantiation, in declaration order."""
+
+    functions: list[DeferredFunction[object, object]]
+    #: Functions of the batch not completed yet, plus the batches deferred on top of it not completed yet.
+    remaining: int
+    #: Batch deferred before this one, whose functions not started yet wait for this one to be completed.
+    below: Batch | None = None
+    #: Functions of the batch below that were not started yet when this batch was deferred.
+    gated: list[DeferredFunction[object, object]] = field(default_factory=list)
+
+
+def get_batch_dependencies(
+    functions: Sequence[DeferredFunction[object, object]], executor: bool
+) -> list[list[DeferredFunction[object, object]]]:
+    """Get the dependencies of the deferred functions of a batch, among the previous functions of the batch.
+
+    A function depends on the previous function of the batch, except that:
+
+    * the consecutive related factories of the async model fixtures depend on the same functions, since they are
+      created concurrently;
+    * with an executor, the post-generation declarations only depend on the previous post-generation declaration
+      submitted to it, so that they're not held back by the related factories evaluated in the calling thread.
+
+    :param functions: Functions of the batch, in declaration order.
+    :param executor: Whether the post-generation declarations are submitted to an executor.
+    """
+    dependencies = []
+    # Functions that the next function evaluated in order waits for.
+    frontier: list[DeferredFunction[object, object]] = []
+    # Dependencies of the current group of concurrent functions.
+    group: list[DeferredFunction[object, object]] | None = None
+    submitted: DeferredFunction[object, object] | None = None
+    for function in functions:
+        if executor and function.threaded:
+            dependencies.append([] if submitted is None else [submitted])
+            submitted = function
+            frontier.append(function)
+            group = None
+        elif function.awaitable and function.is_related:
+            if group is None:
+                group, frontier = frontier, []
+            dependencies.append(list(group))
+            frontier.append(function)
+        else:
+            dependencies.append(frontier)
+            frontier = [function]
+            group = None
+    return dependencies
+
+
+def get_setup_chain(request: FixtureRequest) -> set[str]:
+    """Get the fixtures being set up: the fixture of the request, and the ones that requested it."""
+    fixtures = set()
+    while isinstance(request, SubRequest):
+        fixtures.add(request._fixturedef.argname)
+        request = request._parent_request
+    return fixtures
 
 
 class Request:
     """PyTest FactoryBoy request."""
 
-    def __init__(self) -> None:
-        """Create pytest_factoryboy request."""
-        self.deferred: list[list[DeferredFunction[object, object]]] = []
+    def __init__(
+        self,
+        strategy: str | None = None,
+        executor: Executor | None = None,
+        unit_of_work: UnitOfWork | None = None,
+    ) -> None:
+        """Create pytest_factoryboy request.
+
+        :param strategy: factory_boy strategy forced for all the model fixtures (see ``factoryboy_strategy`` marker).
+        :param executor: Executor of the deferred post-generation declarations (see ``--factoryboy-workers``). The
+            related factories are always evaluated in the calling thread, since they set up fixtures.
+        :param unit_of_work: Unit of work collecting the instances of the model fixtures using the create strategy,
+            persisted by ``flush`` (see ``factoryboy_deferred_flush`` marker).
+        """
+        self.strategy = strategy
+        self.executor = executor
+        self.unit_of_work = unit_of_work
+        #: Whether the fixtures of the test are set up, and its unit of work flushed. The model fixtures requested
+        #: afterwards (e.g. by ``request.getfixturevalue`` in the test) don't defer the creation of their instances.
+        self.set_up = False
+        #: Deferred functions submitted to the executor whose result is not merged yet, in submission order.
+        self.running: list[tuple[DeferredFunction[object, object], Future[tuple[object, float]]]] = []
+        #: Deferred functions not completed yet, in deferral order, with their batch. The functions submitted to the
+        #: executor are completed once submitted.
+        self.pending: dict[DeferredFunction[object, object], Batch] = {}
+        #: Number of unsatisfied dependencies of the deferred functions not started yet: previous functions of their
+        #: batch, batches deferred afterwards and fixtures being set up (for the related factories). A function is
+        #: ready once it drops to zero.
+        self.waiting: dict[DeferredFunction[object, object], int] = {}
+        #: Functions depending on each deferred function, in deferral order.
+        self.dependents: dict[DeferredFunction[object, object], list[DeferredFunction[object, object]]] = {}
+        #: Stack of the ready functions, the next one to evaluate last. Its entries may be stale: functions started
+        #: since, or waiting again for a batch deferred afterwards.
+        self.ready: list[DeferredFunction[object, object]] = []
+        #: Ready awaitable functions, left to ``evaluate_async``.
+        self.ready_async: list[DeferredFunction[object, object]] = []
+        #: Stack of the batches not completed yet, the last one deferred last.
+        self.batches: list[Batch] = []
+        #: Related functions waiting for a fixture being set up, keyed by fixture name.
+        self.fixture_dependents: dict[str, list[DeferredFunction[object, object]]] = {}
+        #: Fixtures being set up that prevent the related function from being evaluated.
+        self.blocked: dict[DeferredFunction[object, object], set[str]] = {}
         self.results: dict[str, dict[str, object]] = defaultdict(dict)
         self.model_factories: dict[str, type[Factory[object]]] = {}
+        self.model_strategies: dict[str, str] = {}
+        self.model_instances: dict[str, object] = {}
+        #: Strategies of the objects owning the related factory fixtures being evaluated, keyed by fixture name.
+        self.related_strategies: dict[str, str] = {}
         self.in_progress: set[DeferredFunction[object, object]] = set()
+        self.deps_cache: dict[tuple[str, Node], frozenset[str]] = {}
+        self.argnames_cache: dict[tuple[str, Node], tuple[str, ...]] = {}
+
+    @property
+    def deferred(self) -> list[list[DeferredFunction[object, object]]]:
+        """Deferred functions not evaluated yet, grouped by batch."""
+        batches = ([function for function in batch.functions if function in self.pending] for batch in self.batches)
+        return [batch for batch in batches if batch]
 
     def defer(self, functions: list[DeferredFunction[object, object]]) -> None:
         """Defer post-generation declaration execution until the end of the test setup.
 
+        The functions are added to the dependency graph: each one depends on the previous ones of the batch (see
+        ``get_batch_dependencies``), and the functions not started yet of the batch deferred before depend on the
+        whole batch, since it belongs to a model fixture set up in the meantime (e.g. by one of their related
+        factories). The result slots are reserved, so that the results are in the declaration order.
+
         :param functions: Functions to be deferred.
-        :note: Once already finalized all following defer calls will execute the function directly.
         """
-        self.deferred.append(functions)
+        if not functions:
+            return
+        batch = Batch(functions=functions, remaining=len(functions))
+        waiting = self.waiting
+        if self.batches:
+            below = batch.below = self.batches[-1]
+            below.remaining += 1
+            batch.gated = [function for function in below.functions if function in waiting]
+            for function in batch.gated:
+                waiting[function] += 1
+        self.batches.append(batch)
+
+        ready = []
+        for function, dependencies in zip(functions, get_batch_dependencies(functions, self.executor is not None)):
+            model, attr = function.name.split("__", 1)
+            self.results[model].setdefault(attr, None)
+            self.pending[function] = batch
+            self.dependents[function] = []
+            waiting[function] = len(dependencies)
+            for dependency in dependencies:
+                self.dependents[dependency].append(function)
+            if not dependencies:
+                ready.append(function)
+        self.ready.extend(reversed(ready))
+
+    def release(self, functions: Iterable[DeferredFunction[object, object]]) -> None:
+        """Satisfy one dependency of each function, and push the ones that are ready, in order."""
+        waiting = self.waiting
+        ready = []
+        for function in functions:
+            waiting[function] -= 1
+            if not waiting[function]:
+                ready.append(function)
+        self.ready.extend(reversed(ready))
 
-    def get_deps(self, request: SubRequest, fixture: str, deps: set[str] | None = None) -> set[str]:
+    def done(self, function: DeferredFunction[object, object]) -> None:
+        """Complete the deferred function: release its dependents, and the batches it completes."""
+        batch = self.pending.pop(function)
+        self.release(self.dependents.pop(function))
+        batch.remaining -= 1
+        while not batch.remaining:
+            # A batch is completed after the batches deferred on top of it, it's the last one.
+            self.batches.pop()
+            self.release(batch.gated)
+            if batch.below is None:
+                break
+            batch = batch.below
+            batch.remaining -= 1
+
+    def release_fixture(self, name: str) -> None:
+        """Release the related functions waiting for the fixture, once it's set up.
+
+        The functions waiting for another fixture of the same name (e.g. overridden by a fixture requesting it) check
+        their blockers again when they get ready.
+        """
+        functions = self.fixture_dependents.pop(name, None)
+        if not functions:
+            return
+        for function in functions:
+            blockers = self.blocked[function]
+            blockers.discard(name)
+            if not blockers:
+                del self.blocked[function]
+        self.release(functions)
+
+    def get_deps(self, request: SubRequest, fixture: str) -> frozenset[str]:
+        """Get the transitive fixture dependencies of the fixture, including the fixture itself.
+
+        The result is cached per (fixture, test node) for the lifetime of the test item.
+        """
         request = request.getfixturevalue("request")
+        node = request._pyfuncitem.parent
+        assert node is not None, "Request must have a parent item."
 
+        key = (fixture, node)
+        deps = self.deps_cache.get(key)
         if deps is None:
-            deps = {fixture}
-        if fixture == "request":
-            return deps
-
-        assert request._pyfuncitem.parent is not None, "Request must have a parent item."
-
-        fixturedefs = getfixturedefs(request._fixturemanager, fixture, request._pyfuncitem.parent)
-        for fixturedef in fixturedefs or []:
-            for argname in fixturedef.argnames:
-                if argname not in deps:
-                    deps.add(argname)
-                    deps.update(self.get_deps(request, argname, deps))
-        return deps
+            fixturemanager = request._fixturemanager
 
-    def get_current_deps(self, request: FixtureRequest | SubRequest) -> set[str]:
-        deps = set()
-        while hasattr(request, "_parent_request"):
-            if request.fixturename and request.fixturename not in getattr(request, "_fixturedefs", {}):
-                deps.add(request.fixturename)
-            request = request._parent_request
+            def get_argnames(name: str) -> tuple[str, ...]:
+                argnames_key = (name, node)
+                argnames = self.argnames_cache.get(argnames_key)
+                if argnames is None:
+                    fixturedefs = getfixturedefs(fixturemanager, name, node) or ()
+                    argnames = self.argnames_cache[argnames_key] = tuple(
+                        argname for fixturedef in fixturedefs for argname in fixturedef.argnames
+                    )
+                return argnames
+
+            deps = self.deps_cache[key] = get_fixture_closure(fixture, get_argnames)
         return deps
 
-    def execute(
-        self,
-        request: SubRequest,
-        function: DeferredFunction[object, object],
-        deferred: list[DeferredFunction[object, object]],
-    ) -> None:
-        """Execute deferred function and store the result."""
-        if function in self.in_progress:
-            raise CycleDetected()
-        fixture = function.name
-        model, attr = fixture.split("__", 1)
-        if function.is_related:
-            deps = self.get_deps(request, fixture)
-            if deps.intersection(self.get_current_deps(request)):
-                raise CycleDetected()
+    def get_strategy(self, request: SubRequest, default: str) -> str:
+        """Get the factory_boy strategy for the model fixture being set up.
+
+        The ``factoryboy_strategy`` marker has the precedence. Otherwise, the strategy is the one explicitly
+        registered for the closest model fixture in the request chain (starting from the model fixture itself),
+        or the one of the object owning the related factory fixture in the chain.
+
+        :param request: Request of the model fixture.
+        :param default: Strategy to use when there is no explicit one.
+        """
+        if self.strategy is not None:
+            return self.strategy
+
+        current: FixtureRequest | SubRequest = request
+        while isinstance(current, SubRequest):
+            strategy = self.related_strategies.get(current._fixturedef.argname)
+            if strategy is None:
+                plan = model_plans.get(current._fixturedef.func)
+                strategy = plan.strategy if plan is not None else None
+            if strategy is not None:
+                return strategy
+            current = current._parent_request
+        return default
+
+    def defer_creation(self, request: SubRequest, strategy: str, deferrable: bool = True) -> bool:
+        """Check if the model fixture builds its instance and adds it to the unit of work, instead of creating it.
+
+        The model fixtures that can't defer the creation of their instances flush the unit of work first, since they
+        may depend on its instances. Once the test is set up, the unit of work is never flushed again: the creation is
+        not deferred anymore.
+
+        :param request: Request of the model fixture.
+        :param strategy: factory_boy strategy of the model fixture. Only the create strategy is deferred.
+        :param deferrable: Whether the model fixture can defer the creation of its instance.
+        """
+        if self.unit_of_work is None:
+            return False
+        from factory.enums import CREATE_STRATEGY
+
+        if strategy != CREATE_STRATEGY:
+            return False
+        if deferrable and not self.set_up:
+            return True
+        self.flush(request)
+        return False
+
+    def flush(self, request: FixtureRequest | SubRequest) -> None:
+        """Persist the instances of the unit of work, if any (see ``pytest_factoryboy_flush``)."""
+        if self.unit_of_work:
+            self.unit_of_work.flush(request)
+
+    def check_flushed(self) -> None:
+        """Check that no instance was added to the unit of work once the test was set up.
+
+        :raises FlushError: If the unit of work has pending instances, which are never persisted.
+        """
+        if self.set_up and self.unit_of_work:
+            raise FlushError(
+                f"The {len(self.unit_of_work)} instances added to the unit of work after the setup of the test were "
+                "never persisted."
+            )
+
+    def prepare(self, request: SubRequest, function: DeferredFunction[object, object]) -> tuple[str, str]:
+        """Record the model of the deferred function before executing it.
+
+        :return: The model fixture name and the declaration attribute of the function.
+        """
+        model, attr = function.name.split("__", 1)
         self.model_factories[model] = function.factory
+        self.model_strategies[model] = function.strategy
+        if function.instance is not None:
+            self.model_instances[model] = function.instance
+        if function.is_related:
+            self.related_strategies[function.name] = function.strategy
+
+        request.config.hook.pytest_factoryboy_before_deferred(request=request, function=function)
+        return model, attr
+
+    def persist(self, request: SubRequest, instance: object) -> None:
+        """Flush the unit of work if the instance is pending in it, before it's post-generated.
+
+        The post-generation declarations and ``_after_postgeneration`` are called with ``create=True``: they may
+        rely on the instance being persisted (e.g. to add many-to-many relations, or to save it again).
+        """
+        if self.unit_of_work is not None and instance in self.unit_of_work:
+            self.flush(request)
+
+    def execute(self, request: SubRequest, function: DeferredFunction[object, object]) -> None:
+        """Execute deferred function and store the result."""
+        model, _ = self.prepare(request, function)
+        if self.unit_of_work and not function.is_related:
+            instance = self.model_instances[model] if model in self.model_instances else request.getfixturevalue(model)
+            self.persist(request, instance)
+        profiler = get_profiler(request)
+        if self.executor is not None and function.threaded:
+            self.running.append((function, self.executor.submit(call_timed, function, request)))
+            self.done(function)
+            return
 
         self.in_progress.add(function)
-        self.results[model][attr] = function(request)
-        deferred.remove(function)
-        self.in_progress.remove(function)
+        start = time.perf_counter()
+        try:
+            if profiler is None:
+                result = function(request)
+            else:
+                kind = "related" if function.is_related else "postgen"
+                with profiler.measure(kind, function.name, function.factory):
+                    result = function(request)
+        finally:
+            self.in_progress.remove(function)
+        elapsed = time.perf_counter() - start
+        self.complete(request, function, result, elapsed)
+        self.done(function)
 
-    def after_postgeneration(self, request: SubRequest) -> None:
-        """Call _after_postgeneration hooks."""
-        for model in list(self.results.keys()):
+    def complete(
+        self, request: SubRequest, function: DeferredFunction[object, object], result: object, elapsed: float
+    ) -> None:
+        """Store the result of an evaluated deferred function."""
+        model, attr = function.name.split("__", 1)
+        self.results[model][attr] = result
+
+        usage = get_usage(request)
+        if usage is not None:
+            usage.add_deferred(function.is_related, elapsed)
+        request.config.hook.pytest_factoryboy_after_deferred(
+            request=request, function=function, result=result, elapsed=elapsed
+        )
+
+    def merge(self, request: SubRequest) -> None:
+        """Wait for the deferred functions submitted to the executor, and merge their results in submission order.
+
+        All the functions are waited for, even if one of them fails. The first error is then raised.
+        """
+        running, self.running = self.running, []
+        profiler = get_profiler(request)
+        error: BaseException | None = None
+        for function, future in running:
+            try:
+                result, elapsed = future.result()
+            except BaseException as exc:
+                error = error or exc
+                continue
+            if profiler is not None:
+                profiler.record("postgen", function.name, function.factory, elapsed)
+            self.complete(request, function, result, elapsed)
+        if error is not None:
+            raise error
+
+    def pop_results(
+        self, request: SubRequest, models: Iterable[str] | None = None
+    ) -> Generator[tuple[type[Factory[object]], object, bool, dict[str, object]], None, None]:
+        """Pop the results of the deferred functions, per model instance.
+
+        :param models: Model fixture names. All the models with results if ``None``.
+        :return: ``(factory_class, instance, create, results)`` tuples.
+        """
+        # factory_boy is not imported by the plugin module, it's imported by the registration of the factories.
+        from factory.base import BaseFactory
+        from factory.enums import CREATE_STRATEGY
+
+        default_after_postgeneration = BaseFactory._after_postgeneration.__func__  # type: ignore[attr-defined]
+        for model in list(self.results.keys()) if models is None else models:
             results = self.results.pop(model)
-            obj = request.getfixturevalue(model)
+            if model in self.model_instances:
+                obj = self.model_instances.pop(model)
+            else:
+                obj = request.getfixturevalue(model)
             factory = self.model_factories[model]
-            factory._after_postgeneration(obj, create=True, results=results)
+            # The default ``_after_postgeneration`` does nothing, it doesn't need the instance to be persisted.
+            if getattr(factory._after_postgeneration, "__func__", None) is not default_after_postgeneration:
+                self.persist(request, obj)
+            yield factory, obj, self.model_strategies[model] == CREATE_STRATEGY, results
+
+    def after_postgeneration(self, request: SubRequest) -> None:
+        """Call _after_postgeneration hooks."""
+        for factory, obj, create, results in self.pop_results(request):
+            factory._after_postgeneration(obj, create=create, results=results)
+            request.config.hook.pytest_factoryboy_after_postgeneration(
+                request=request, factory_class=factory, instance=obj, create=create, results=results
+            )
+
+    async def after_postgeneration_async(self, request: SubRequest, models: Iterable[str] | None = None) -> None:
+        """Call _after_postgeneration hooks, awaiting the async ones.
+
+        :param models: Model fixture names. All the models with results if ``None``.
+        """
+        for factory, obj, create, results in self.pop_results(request, models):
+            result = factory._after_postgeneration(obj, create=create, results=results)
+            if inspect.isawaitable(result):
+                await result
+            request.config.hook.pytest_factoryboy_after_postgeneration(
+                request=request, factory_class=factory, instance=obj, create=create, results=results
+            )
 
     def evaluate(self, request: SubRequest) -> None:
-        """Finalize, run deferred post-generation actions, etc."""
-        while self.deferred:
-            try:
-                deferred = self.deferred[-1]
-                for function in list(deferred):
-                    self.execute(request, function, deferred)
-                if not deferred:
-                    self.deferred.remove(deferred)
-            except CycleDetected:
-                return
-
-        if not self.deferred:
+        """Finalize, run deferred post-generation actions, etc.
+
+        The ready deferred functions are evaluated (see ``evaluate_ready``), and ``_after_postgeneration`` is called
+        once all the deferred functions are evaluated. The functions that aren't ready yet are evaluated by a
+        following call.
+
+        With an executor, the post-generation declarations are submitted to it instead, while the following functions
+        are evaluated (including the ones following a blocked related factory). They have all completed when the
+        outermost call returns.
+        """
+        try:
+            evaluated = self.evaluate_ready(request)
+        finally:
+            # A re-entrant call (while evaluating a related factory) leaves the merge to the outer one.
+            if self.running and not self.in_progress:
+                self.merge(request)
+        if evaluated:
             self.after_postgeneration(request)
 
+    async def evaluate_async(self, request: SubRequest) -> None:
+        """Evaluate the deferred functions, awaiting the ones of the async model fixtures.
+
+        Like ``evaluate``, but the awaitable functions are evaluated too: the ones that are ready at the same time
+        (e.g. consecutive related factories of a batch) are awaited concurrently.
+        """
+        try:
+            evaluated = await self.evaluate_ready_async(request)
+        finally:
+            if self.running and not self.in_progress:
+                self.merge(request)
+        if evaluated:
+            await self.after_postgeneration_async(request)
+
+    async def evaluate_ready_async(self, request: SubRequest) -> bool:
+        """Evaluate (or submit) the ready deferred functions, awaiting the awaitable ones.
+
+        :return: Whether all the deferred functions are evaluated.
+        """
+        import asyncio
+
+        while not self.evaluate_ready(request):
+            waiting = self.waiting
+            group = [function for function in dict.fromkeys(self.ready_async) if waiting.get(function) == 0]
+            self.ready_async.clear()
+            if not group:
+                return False
+            for function in group:
+                del waiting[function]
+            await asyncio.gather(*(self.execute_async(request, function) for function in group))
+        return True
+
+    async def execute_async(self, request: SubRequest, function: DeferredFunction[object, object]) -> None:
+        """Execute deferred function, await its result and store it."""
+        self.prepare(request, function)
+        self.in_progress.add(function)
+        start = time.perf_counter()
+        try:
+            result = function(request)
+            if inspect.isawaitable(result):
+                result = await result
+        finally:
+            self.in_progress.remove(function)
+        elapsed = time.perf_counter() - start
+        profiler = get_profiler(request)
+        if profiler is not None:
+            profiler.record("related" if function.is_related else "postgen", function.name, function.factory, elapsed)
+        self.complete(request, function, result, elapsed)
+        self.done(function)
+
+    def evaluate_ready(self, request: SubRequest) -> bool:
+        """Evaluate (or submit) the deferred functions as they get ready, in dependency order.
+
+        A ready related factory function also waits for the fixtures of its closure being set up (the request chain),
+        until they're set up (see ``release_fixture``). The awaitable functions are left to ``evaluate_async``.
+
+        :return: Whether all the deferred functions are evaluated.
+        """
+        ready = self.ready
+        waiting = self.waiting
+        setup_chain: set[str] | None = None
+        while ready:
+            function = ready.pop()
+            if waiting.get(function) != 0:
+                # Stale entry: started since it was ready, or waiting for a batch deferred afterwards.
+                continue
+            if function.awaitable:
+                self.ready_async.append(function)
+                continue
+            if function.is_related:
+                if setup_chain is None:
+                    setup_chain = get_setup_chain(request)
+                blockers = setup_chain.intersection(self.get_deps(request, function.name))
+                if blockers:
+                    self.blocked[function] = blockers
+                    waiting[function] = len(blockers)
+                    for fixture in blockers:
+                        self.fixture_dependents.setdefault(fixture, []).append(function)
+                    continue
+            del waiting[function]
+            self.execute(request, function)
+        return not self.pending
+
+    def finalize(self, request: SubRequest) -> None:
+        """Evaluate all the deferred functions.
+
+        :raises CycleDetected: If some deferred functions can't be evaluated.
+        """
+        self.evaluate(request)
+        if not self.pending:
+            return
+
+        pending = []
+        for function in self.pending:
+            blockers = self.blocked.get(function)
+            if function in self.in_progress:
+                pending.append(f"{function.name} (in progress)")
+            elif blockers:
+                pending.append(f"{function.name} (waiting for {', '.join(sorted(blockers))})")
+            else:
+                pending.append(function.name)
+        raise CycleDetected(f"Can't evaluate the deferred post-generation declarations: {'; '.join(pending)}")
+
+
+def call_timed(function: DeferredFunction[object, object], request: SubRequest) -> tuple[object, float]:
+    """Call the deferred function (in a worker thread), and measure its wall time."""
+    start = time.perf_counter()
+    result = function(request)
+    return result, time.perf_counter() - start
+
+
+executor_key = pytest.StashKey["Executor"]()
+
+
+def make_request(node: Node, scoped: bool = False) -> Request:
+    """Make the pytest-factoryboy request of the model fixtures set up for the node.
+
+    :param scoped: The request is private to a model fixture with a broader scope than function. Its instances are
+        never flushed with the ones of the test, since they outlive it.
+    """
+    return Request(
+        strategy=get_marker_strategy(node),
+        executor=node.config.stash.get(executor_key, None),
+        unit_of_work=UnitOfWork() if not scoped and is_deferred_flush(node) else None,
+    )
+
+
+def get_active_request(request: FixtureRequest) -> Request | None:
+    """Get the pytest-factoryboy request of the test, if it's set up already."""
+    fixturedef = request._fixture_defs.get("factoryboy_request")
+    if fixturedef is None or fixturedef.cached_result is None:
+        return None
+    factoryboy_request: Request | None = fixturedef.cached_result[0]
+    return factoryboy_request
+
+
+def get_marker_strategy(node: Node) -> str | None:
+    """Get the strategy of the closest ``factoryboy_strategy`` marker of the node, if any."""
+    marker = node.get_closest_marker("factoryboy_strategy")
+    if marker is None:
+        return None
+    strategy: str = marker.args[0] if marker.args else marker.kwargs["strategy"]
+    assert strategy in STRATEGIES, f"Unknown factoryboy_strategy {strategy!r}, use 'build' or 'create'."
+    return strategy
+
+
+factory_overrides_key = pytest.StashKey["dict[str, dict[str, object]]"]()
+
+
+def get_marker_overrides(node: Node) -> dict[str, dict[str, object]]:
+    """Get the attribute overrides of the ``factory`` markers of the node, keyed by model fixture name.
+
+    The closest markers take precedence. The overrides are computed once per node.
+    """
+    overrides = node.stash.get(factory_overrides_key, None)
+    if overrides is None:
+        overrides = {}
+        for marker in reversed(list(node.iter_markers("factory"))):
+            assert len(marker.args) == 1, f"The factory marker takes the model fixture name, got {marker.args!r}."
+            overrides.setdefault(marker.args[0], {}).update(marker.kwargs)
+        node.stash[factory_overrides_key] = overrides
+    return overrides
+
+
+def check_marker_overrides(item: Item) -> None:
+    """Check that the ``factory`` markers of the test item override visible model fixtures.
+
+    :raises pytest.UsageError: If a marker names another fixture, or no fixture at all (e.g. a typo).
+    """
+    fixtureinfo = getattr(item, "_fixtureinfo", None)
+    for name in get_marker_overrides(item):
+        fixturedefs = fixtureinfo.name2fixturedefs.get(name) if fixtureinfo is not None else None
+        if not fixturedefs and item.parent is not None:
+            fixturedefs = getfixturedefs(item.session._fixturemanager, name, item.parent)
+        plan = model_plans.get(fixturedefs[-1].func) if fixturedefs else None
+        if plan is None or plan.model_name != name:
+            raise pytest.UsageError(f"The factory marker overrides {name!r}, which is not a model fixture.")
+
 
 @pytest.fixture
-def factoryboy_request() -> Request:
+def factoryboy_request(request: FixtureRequest) -> Generator[Request, None, None]:
     """PyTest FactoryBoy request fixture."""
-    return Request()
+    factoryboy_request = make_request(request.node)
+    yield factoryboy_request
+    factoryboy_request.check_flushed()
+
+
+def pytest_configure(config: Config) -> None:
+    """Register the markers, the scope check and the profiler."""
+    config.addinivalue_line(
+        "markers",
+        "factoryboy_strategy(strategy): factory_boy strategy ('build' or 'create') of all the model fixtures.",
+    )
+    config.addinivalue_line(
+        "markers",
+        "factory(model, **attributes): override the attributes of the model fixture, e.g. "
+        "@pytest.mark.factory('book', title='Bleak House').",
+    )
+    config.addinivalue_line(
+        "markers",
+        "factoryboy_deferred_flush(enabled=True): build the instances of the model fixtures using the create "
+        "strategy, and persist them in bulk right before the test is called (see the pytest_factoryboy_flush hook).",
+    )
+    config.addinivalue_line(
+        "markers",
+        "factoryboy_budget(max_instances=None, max_seconds=None, action='fail'): maximum number of model instances "
+        "created by the test, and time spent creating them. The action is 'fail' or 'warn'.",
+    )
+    config.pluginmanager.register(ScopeCheck(), "factoryboy-scope-check")
+    config.stash[default_budget_key] = Budget.from_config(config)
+    if config.getoption("factoryboy_profile"):
+        config.stash[profiler_key] = Profiler()
+    report_path = config.getoption("factoryboy_report")
+    if report_path is not None:
+        usage_report = config.stash[usage_report_key] = UsageReport(Path(report_path))
+        config.pluginmanager.register(usage_report, "factoryboy-usage-report")
+    workers = get_workers(config)
+    if workers:
+        from concurrent.futures import ThreadPoolExecutor
+
+        config.stash[executor_key] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="factoryboy")
+
+
+def get_workers(config: Config) -> int:
+    """Get the number of threads evaluating the deferred post-generation declarations, from the command line option
+    or the ini file.
+    """
+    workers: int | None = config.getoption("factoryboy_workers")
+    if workers is None:
+        value = config.getini("factoryboy_workers") or "0"
+        try:
+            workers = int(value)
+        except ValueError:
+            raise pytest.UsageError(f"factoryboy_workers must be an integer, got {value!r}.") from None
+    if workers < 0:
+        raise pytest.UsageError(f"The number of factoryboy workers can't be negative, got {workers}.")
+    return workers
+
+
+def pytest_unconfigure(config: Config) -> None:
+    """Drop the cached analysis of the factory classes, which is kept for the session, and stop the workers."""
+    invalidate_factory_cache()
+    executor = config.stash.get(executor_key, None)
+    if executor is not None:
+        executor.shutdown()
+        del config.stash[executor_key]
+
+
+def pytest_addoption(parser: Parser) -> None:
+    """Register the command line options."""
+    group = parser.getgroup("factoryboy", "pytest-factoryboy")
+    group.addoption(
+        "--factoryboy-profile",
+        action="store_true",
+        dest="factoryboy_profile",
+        default=False,
+        help="Profile the pytest-factoryboy fixtures and print the slowest factories.",
+    )
+    group.addoption(
+        "--factoryboy-report",
+        action="store",
+        dest="factoryboy_report",
+        default=None,
+        metavar="path",
+        help="Write the number of instances created per factory, and the deferred post-generation declarations "
+        "executed, for each test to a JSON file (or JSON lines file, with the .jsonl suffix).",
+    )
+    group.addoption(
+        "--factoryboy-graph",
+        action="store",
+        dest="factoryboy_graph",
+        default=None,
+        metavar="path",
+        help="Write the dependency graph of the generated fixtures, with the fixture closure size of the model "
+        "fixtures, to a JSON file (or Graphviz DOT file, with the .dot suffix) after the collection.",
+    )
+    group.addoption(
+        "--factoryboy-workers",
+        action="store",
+        dest="factoryboy_workers",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Evaluate the deferred post-generation declarations in a pool of N threads (0 to disable, default).",
+    )
+    parser.addini(
+        "factoryboy_workers",
+        "Default number of threads evaluating the deferred post-generation declarations (see --factoryboy-workers).",
+    )
+    parser.addini(
+        "factoryboy_deferred_flush",
+        "Build the instances of the model fixtures using the create strategy, and persist them in bulk right before "
+        "the test is called (see the factoryboy_deferred_flush marker).",
+        type="bool",
+        default=False,
+    )
+    parser.addini(
+        "factoryboy_max_instances",
+        "Default maximum number of model instances created by a test (see the factoryboy_budget marker).",
+    )
+    parser.addini(
+        "factoryboy_max_seconds",
+        "Default maximum time spent creating model instances by a test (see the factoryboy_budget marker).",
+    )
+    parser.addini(
+        "factoryboy_budget_action",
+        "What to do when a test exceeds its factoryboy budget: 'fail' (default) or 'warn'.",
+    )
+
+
+usage_report_key = pytest.StashKey[UsageReport]()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item: Item) -> None:
+    """Start recording the factory usage of the test item, for the usage report or its budget, and check its
+    ``factory`` markers.
+    """
+    budget = None
+    # The tests not using factories can only have a budget if they're explicitly marked with one.
+    if item.stash.get(uses_factoryboy_key, False) or item.get_closest_marker("factoryboy_budget") is not None:
+        budget = Budget.from_item(item, item.config.stash[default_budget_key])
+    if budget is not None:
+        item.stash[budget_key] = budget
+    if budget is not None or usage_report_key in item.config.stash:
+        item.stash[usage_key] = ItemUsage()
+    if item.get_closest_marker("factory") is not None:
+        check_marker_overrides(item)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item: Item) -> Generator[None, pluggy.Result[pytest.TestReport], None]:
+    """Attach the factory usage of the test item to its teardown report, serialized by xdist workers."""
+    outcome = yield
+    report = outcome.get_result()
+    usage = item.stash.get(usage_key, None)
+    if usage is not None and report.when == "teardown":
+        setattr(report, UsageReport.report_attr, usage.to_json())
+
+
+def pytest_collection_modifyitems(session: pytest.Session, items: list[Item]) -> None:
+    """Remove the attribute fixtures used directly by the model fixtures from the test closures."""
+    if not attribute_values:
+        return
+    # The parametrized items of a test function share its fixture info, thus its closure.
+    groups: dict[int, tuple[FuncFixtureInfo, list[Item]]] = {}
+    for item in items:
+        fixtureinfo = getattr(item, "_fixtureinfo", None)
+        if fixtureinfo is not None:
+            groups.setdefault(id(fixtureinfo), (fixtureinfo, []))[1].append(item)
+
+    fixturemanager = session._fixturemanager
+    resolved: dict[tuple[Node, str], FixtureDef[object] | None] = {}
+    # The test functions of a node mostly share the same closures.
+    cache: dict[tuple[Node, tuple[str, ...], tuple[str, ...], frozenset[str]], dict[str, object]] = {}
+    for fixtureinfo, group in groups.values():
+        node = group[0].parent
+        assert node is not None, "Test item must have a parent node."
+        parametrized = frozenset(name for item in group if hasattr(item, "callspec") for name in item.callspec.params)
+        key = (node, tuple(fixtureinfo.names_closure), fixtureinfo.initialnames, parametrized)
+        direct = cache.get(key)
+        if direct is None:
+            direct = cache[key] = get_direct_attributes(fixturemanager, node, fixtureinfo, parametrized, resolved)
+        if not direct:
+            continue
+        fixtureinfo.names_closure[:] = [name for name in fixtureinfo.names_closure if name not in direct]
+        for item in group:
+            item.stash[direct_attributes_key] = direct
+
+
+def get_direct_attributes(
+    fixturemanager: FixtureManager,
+    node: Node,
+    fixtureinfo: FuncFixtureInfo,
+    parametrized: Collection[str],
+    resolved: dict[tuple[Node, str], FixtureDef[object] | None],
+) -> dict[str, object]:
+    """Get the attribute fixtures that the model fixtures of the closure can use directly, with their value.
+
+    These are the generated attribute fixtures of plain declarations that are not overridden, not parametrized, and
+    not requested by the test nor by another fixture.
+
+    :param node: Parent node of the test function.
+    :param parametrized: Names parametrized for the test function.
+    :param resolved: Cache of the fixture definitions visible from the nodes.
+    """
+
+    def resolve(name: str) -> FixtureDef[object] | None:
+        fixturedefs = fixtureinfo.name2fixturedefs.get(name)
+        if fixturedefs:
+            return fixturedefs[-1]
+        key = (node, name)
+        if key not in resolved:
+            fixturedefs = getfixturedefs(fixturemanager, name, node)
+            resolved[key] = fixturedefs[-1] if fixturedefs else None
+        return resolved[key]
+
+    # The closure of parametrized tests is pruned by pytest, the attributes are looked up in the build plans.
+    attributes: dict[str, None] = {}
+    requested = {*fixtureinfo.initialnames, *parametrized}
+    for name in fixtureinfo.names_closure:
+        fixturedef = resolve(name)
+        if fixturedef is None:
+            continue
+        if fixturedef.func in attribute_values:
+            attributes[name] = None
+            continue
+        requested.update(fixturedef.argnames)
+        plan = model_plans.get(fixturedef.func)
+        if plan is not None:
+            attributes.update(dict.fromkeys(plan.attributes))
+
+    direct = {}
+    for name in attributes:
+        if name in requested:
+            continue
+        fixturedef = resolve(name)
+        if fixturedef is not None and fixturedef.func in attribute_values:
+            direct[name] = attribute_values[fixturedef.func]
+    return direct
+
+
+def pytest_collection_finish(session: pytest.Session) -> None:
+    """Write the dependency graph of the generated fixtures, on the first xdist worker (or the only process)."""
+    graph_path = session.config.getoption("factoryboy_graph")
+    if graph_path is None:
+        return
+    workerinput = getattr(session.config, "workerinput", None)
+    if workerinput is not None and workerinput["workerid"] != "gw0":
+        return
+
+    from .graph import FixtureGraph
+
+    FixtureGraph(session._fixturemanager._arg2fixturedefs).write(Path(graph_path))
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    """Write the factory usage report, on the xdist controller (or the only process)."""
+    usage_report = session.config.stash.get(usage_report_key, None)
+    if usage_report is not None and not hasattr(session.config, "workerinput"):
+        usage_report.write()
+
+
+def pytest_terminal_summary(terminalreporter: TerminalReporter) -> None:
+    """Print the pytest-factoryboy profile."""
+    profiler = terminalreporter.config.stash.get(profiler_key, None)
+    if profiler is not None:
+        profiler.report(terminalreporter)
+
+
+uses_factoryboy_key = pytest.StashKey[bool]()
+
+
+def uses_factoryboy(item: Item) -> bool:
+    """Check if any pytest-factoryboy fixture is in the fixture closure of the test item."""
+    fixtureinfo = getattr(item, "_fixtureinfo", None)
+    if fixtureinfo is None:
+        return False
+    for name, fixturedefs in fixtureinfo.name2fixturedefs.items():
+        if name == "factoryboy_request" or getattr(fixturedefs[-1].func, "_factoryboy_generated", False):
+            return True
+    return False
+
+
+def pytest_itemcollected(item: Item) -> None:
+    """Mark the test items that use pytest-factoryboy fixtures."""
+    item.stash[uses_factoryboy_key] = uses_factoryboy(item)
 
 
 @pytest.hookimpl(tryfirst=True)
@@ -124,10 +994,30 @@ def pytest_runtest_call(item: Item) -> None:
     except AttributeError:
         # pytest-pep8 plugin passes Pep8Item here during tests.
         return
+    # Fast path for the tests not using factories. The factoryboy_request may still have been requested dynamically
+    # (e.g. by a fixture calling ``request.getfixturevalue("book")``), in which case it has to be finalized.
+    if not item.stash.get(uses_factoryboy_key, False) and "factoryboy_request" not in request._fixture_defs:
+        return
     factoryboy_request = request.getfixturevalue("factoryboy_request")
-    factoryboy_request.evaluate(request)
-    assert not factoryboy_request.deferred
+    factoryboy_request.finalize(request)
+    factoryboy_request.flush(request)
+    factoryboy_request.set_up = True
     request.config.hook.pytest_factoryboy_done(request=request)
+    check_budget(item)
+
+
+def check_budget(item: Item) -> None:
+    """Fail the test (or warn) if it exceeds its factoryboy budget."""
+    budget = item.stash.get(budget_key, None)
+    if budget is None:
+        return
+    message = budget.check(item.stash[usage_key])
+    if message is None:
+        return
+    if budget.action == "warn":
+        warnings.warn(BudgetExceededWarning(message), stacklevel=1)
+    else:
+        pytest.fail(message, pytrace=False)
 
 
 def pytest_addhooks(pluginmanager: PytestPluginManager) -> None:
@@ -137,11 +1027,196 @@ def pytest_addhooks(pluginmanager: PytestPluginManager) -> None:
     pluginmanager.add_hookspecs(hooks)
 
 
+related_expansion_key = pytest.StashKey["dict[tuple[object, ...], tuple[str, ...]]"]()
+
+
+def expand_related(
+    fixturemanager: FixtureManager, node: Node, functions: Iterable[Callable[..., object]]
+) -> tuple[str, ...]:
+    """Get the deduplicated related fixture names of the given fixture functions, and of their related fixtures."""
+    related: dict[str, None] = {}
+    visited = set(functions)
+    pending = deque(name for function in visited for name in related_fixtures[function])
+    while pending:
+        name = pending.popleft()
+        if name in related:
+            continue
+        related[name] = None
+
+        fixturedefs = getfixturedefs(fixturemanager, name, node)
+        if not fixturedefs:
+            continue
+        function = fixturedefs[-1].func
+        if function not in visited and function in related_fixtures:
+            visited.add(function)
+            pending.extend(related_fixtures[function])
+    return tuple(related)
+
+
+def check_scopes(metafunc: Metafunc) -> None:
+    """Check that the dependencies of the generated fixtures with a scope broader than function are not overridden.
+
+    Overriding a dependency of such a fixture for a single test would either fail when setting up the test (if the
+    override has a narrower scope), or silently reuse the fixture value cached with the original dependency.
+
+    :raises FixtureScopeMismatch: If a dependency is overridden with a narrower scope, or parametrized directly.
+    """
+    parametrized = {argname for callspec in metafunc._calls for argname in callspec.params}
+    for argname, fixturedefs in metafunc._arg2fixturedefs.items():
+        fixturedef = fixturedefs[-1]
+        if fixturedef.scope == "function" or not getattr(fixturedef.func, "_factoryboy_generated", False):
+            continue
+        for dep in fixturedef.argnames:
+            dep_fixturedefs = metafunc._arg2fixturedefs.get(dep)
+            if not dep_fixturedefs:
+                continue
+            dep_fixturedef = dep_fixturedefs[-1]
+            if SCOPES.index(dep_fixturedef.scope) > SCOPES.index(fixturedef.scope):
+                raise FixtureScopeMismatch(
+                    f"The {fixturedef.scope}-scoped fixture {argname!r} depends on {dep!r}, which has a narrower "
+                    f"scope ({dep_fixturedef.scope}) for {metafunc.definition.nodeid}. Use a {fixturedef.scope}-scoped "
+                    f"fixture for {dep!r} (e.g. register its factory with _scope={fixturedef.scope!r}), or register "
+                    f"the factory of {argname!r} with a narrower scope."
+                )
+            if dep in parametrized and dep_fixturedef.params is None:
+                raise FixtureScopeMismatch(
+                    f"The {fixturedef.scope}-scoped fixture {argname!r} depends on {dep!r}, which is parametrized "
+                    f"for {metafunc.definition.nodeid}. The value of {argname!r} would be shared with the tests "
+                    "that are not parametrized: register the factory with a narrower scope, or override "
+                    f"{dep!r} with a parametrized {fixturedef.scope}-scoped fixture."
+                )
+
+
+class ScopeCheck:
+    """Check the scopes of the generated fixtures, once the test is parametrized by all the other plugins."""
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_generate_tests(self, metafunc: Metafunc) -> None:
+        check_scopes(metafunc)
+
+
+@pytest.hookimpl(tryfirst=True)
 def pytest_generate_tests(metafunc: Metafunc) -> None:
-    related: list[str] = []
-    for arg2fixturedef in metafunc._arg2fixturedefs.values():
-        fixturedef = arg2fixturedef[-1]
-        related_fixtures = getattr(fixturedef.func, "_factoryboy_related", [])
-        related.extend(related_fixtures)
+    """Add the related fixtures of the model fixtures, and the lazily registered fixtures, to the test closure.
+
+    This way, they can be parametrized (including by the ``pytest_generate_tests`` hooks of the conftests).
+    """
+    add_related_fixtures(metafunc)
+    if lazy_declarations:
+        add_lazy_fixtures(metafunc)
+
+
+def add_related_fixtures(metafunc: Metafunc) -> None:
+    """Add the related fixtures of the model fixtures to the test closure."""
+    functions = tuple(
+        fixturedefs[-1].func
+        for fixturedefs in metafunc._arg2fixturedefs.values()
+        if fixturedefs[-1].func in related_fixtures
+    )
+    if not functions:
+        return
+
+    node = metafunc.definition.parent
+    assert node is not None, "Test definition must have a parent node."
+
+    # The expansion only depends on the generated fixtures in the closure and on the fixtures visible from the node.
+    cache = metafunc.config.stash.setdefault(related_expansion_key, {})
+    key = (node, *functions)
+    related = cache.get(key)
+    if related is None:
+        related = cache[key] = expand_related(metafunc.definition.session._fixturemanager, node, functions)
+
+    fixturenames = set(metafunc.fixturenames)
+    metafunc.fixturenames.extend(name for name in related if name not in fixturenames)
+
+
+lazy_lookup_key = pytest.StashKey[bool]()
+
+
+def add_lazy_fixtures(metafunc: Metafunc) -> None:
+    """Create the lazily registered declaration fixtures of the test closure, and add their dependencies to it."""
+    fixturemanager = metafunc.definition.session._fixturemanager
+    node = metafunc.definition.parent
+    assert node is not None, "Test definition must have a parent node."
+
+    config = metafunc.config
+    if not config.stash.get(lazy_lookup_key, False):
+        install_lazy_lookup(fixturemanager)
+        config.stash[lazy_lookup_key] = True
+
+    fixturenames = set(metafunc.fixturenames)
+    pending = deque(name for name in metafunc.fixturenames if name not in metafunc._arg2fixturedefs)
+    while pending:
+        name = pending.popleft()
+        # The lookup creates the lazily registered declaration fixture (see ``install_lazy_lookup``).
+        fixturedefs = getfixturedefs(fixturemanager, name, node)
+        if not fixturedefs:
+            continue
+        metafunc._arg2fixturedefs[name] = fixturedefs
+        for argname in fixturedefs[-1].argnames:
+            if argname not in fixturenames:
+                fixturenames.add(argname)
+                metafunc.fixturenames.append(argname)
+                pending.append(argname)
+
+
+def install_lazy_lookup(fixturemanager: FixtureManager) -> None:
+    """Create the lazily registered declaration fixtures when the fixture manager looks them up.
+
+    It covers the dependencies of the model fixtures requested dynamically (``request.getfixturevalue``), which pytest
+    looks up before ``pytest_fixture_setup`` is called, as well as the test closures.
+    """
+    lookup = fixturemanager.getfixturedefs
+
+    # The node is a node id before pytest 8.1.
+    def getfixturedefs_lazy(argname: str, node: Node) -> Sequence[FixtureDef[object]] | None:
+        fixturedefs = lookup(argname, node)
+        if not fixturedefs and lazy_declarations and SEPARATOR in argname:
+            return materialize_lazy_fixture(fixturemanager, argname, lambda name: lookup(name, node)) or fixturedefs
+        return fixturedefs
+
+    fixturemanager.getfixturedefs = getfixturedefs_lazy  # type: ignore[method-assign]
+
+
+def materialize_lazy_fixture(
+    fixturemanager: FixtureManager, name: str, lookup: Callable[[str], Sequence[FixtureDef[object]] | None]
+) -> Sequence[FixtureDef[object]] | None:
+    """Create and register the lazily registered declaration fixture, if any of the visible model fixtures has it.
+
+    The fixture is registered with the same visibility as the model fixture, so that it's found by the fixture
+    lookup of the tests collected afterwards.
+
+    :param lookup: Look up the fixture definitions visible from the requesting node.
+    :return: The fixture definitions visible from the node, ``None`` if there is no such declaration fixture.
+    """
+    # The model fixture name is a prefix of the declaration fixture name, e.g. "author" for
+    # "author__register_user__password".
+    prefix = name
+    while SEPARATOR in prefix:
+        prefix = prefix.rsplit(SEPARATOR, 1)[0]
+        for fixturedef in reversed(lookup(prefix) or ()):
+            declarations = lazy_declarations.get(fixturedef.func)
+            if declarations is None or name not in declarations:
+                continue
+            declaration = declarations.pop(name)
+            if not declarations:
+                del lazy_declarations[fixturedef.func]
+            register_fixture(fixturemanager, name, declaration.materialize(), declaration.scope, fixturedef)
+            return lookup(name)
+    return None
+
 
-    metafunc.fixturenames.extend(related)
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef: FixtureDef[object], request: SubRequest) -> Generator[None, None, None]:
+    """Profile the fixture setup, and release the deferred related factories waiting for the fixture once it's set up
+    (see ``Request.release_fixture``).
+    """
+    profiler = get_profiler(request)
+    if profiler is None:
+        yield
+    else:
+        with profiler.measure_fixture(fixturedef):
+            yield
+    factoryboy_request = get_active_request(request)
+    if factoryboy_request is not None and factoryboy_request.fixture_dependents:
+        factoryboy_request.release_fixture(fixturedef.argname)
@@ -0,0 +1,150 @@
+"""Profiling of the pytest-factoryboy fixtures (``--factoryboy-profile``)."""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import time
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, ContextManager, TypeVar
+
+import pytest
+from typing_extensions import ParamSpec
+
+if TYPE_CHECKING:
+    from _pytest.fixtures import FixtureDef, FixtureRequest
+    from _pytest.terminal import TerminalReporter
+
+T = TypeVar("T")
+P = ParamSpec("P")
+
+#: Number of rows of the slowest fixtures table.
+TOP_FIXTURES = 20
+
+
+@dataclass
+class Timing:
+    """Aggregated wall time of a fixture or factory."""
+
+    calls: int = 0
+    #: Time including the nested profiled calls.
+    total: float = 0.0
+    #: Time excluding the nested profiled calls.
+    own: float = 0.0
+
+
+class Profiler:
+    """Aggregate the wall time of the fixtures and deferred functions, per fixture name and per factory class."""
+
+    def __init__(self) -> None:
+        #: Timings keyed by (kind, name), e.g. ``("model", "book")``.
+        self.fixtures: dict[tuple[str, str], Timing] = {}
+        self.factories: dict[type, Timing] = {}
+        #: Time spent in the nested calls, for each call in progress.
+        self.nested: list[float] = []
+
+    @contextlib.contextmanager
+    def measure(self, kind: str, name: str, factory: type | None = None) -> Iterator[None]:
+        """Measure the wall time of the block.
+
+        :param kind: Kind of the profiled call (e.g. "model", "attr", "related").
+        :param name: Fixture or deferred function name.
+        :param factory: Factory class the time is accounted to, if any.
+        """
+        self.nested.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            own = elapsed - self.nested.pop()
+            if self.nested:
+                self.nested[-1] += elapsed
+            self.add(self.fixtures.setdefault((kind, name), Timing()), elapsed, own)
+            if factory is not None:
+                self.add(self.factories.setdefault(factory, Timing()), elapsed, own)
+
+    def measure_fixture(self, fixturedef: FixtureDef[object]) -> ContextManager[None]:
+        """Measure the setup of the fixture, if it's implemented by a profiled function (see ``profiled``)."""
+        # The generated fixture functions wrap the ``functools.partial`` binding the implementation to its arguments.
+        wrapped = getattr(fixturedef.func, "__wrapped__", None)
+        if not isinstance(wrapped, functools.partial):
+            return contextlib.nullcontext()
+        profile = getattr(wrapped.func, "_factoryboy_profile", None)
+        if profile is None:
+            return contextlib.nullcontext()
+        kind, get_factory = profile
+        factory = get_factory(wrapped.keywords) if get_factory is not None else None
+        return self.measure(kind, fixturedef.argname, factory)
+
+    def record(self, kind: str, name: str, factory: type | None, elapsed: float) -> None:
+        """Record the wall time of a call measured in another thread, which has no nested profiled calls."""
+        self.add(self.fixtures.setdefault((kind, name), Timing()), elapsed, elapsed)
+        if factory is not None:
+            self.add(self.factories.setdefault(factory, Timing()), elapsed, elapsed)
+
+    @staticmethod
+    def add(timing: Timing, elapsed: float, own: float) -> None:
+        timing.calls += 1
+        timing.total += elapsed
+        timing.own += own
+
+    def report(self, terminalreporter: TerminalReporter) -> None:
+        """Write the slowest factories and fixtures tables."""
+        terminalreporter.write_sep("=", "pytest-factoryboy profile")
+        if not self.fixtures:
+            terminalreporter.write_line("No pytest-factoryboy fixtures were used.")
+            return
+
+        factories = sorted(self.factories.items(), key=lambda item: item[1].own, reverse=True)
+        write_table(
+            terminalreporter,
+            "Slowest factories (own time excludes the nested factories and fixtures)",
+            "factory",
+            [(factory.__name__, timing) for factory, timing in factories],
+        )
+        fixtures = sorted(self.fixtures.items(), key=lambda item: item[1].own, reverse=True)[:TOP_FIXTURES]
+        write_table(
+            terminalreporter,
+            f"Slowest fixtures and deferred functions (top {TOP_FIXTURES})",
+            "name (kind)",
+            [(f"{name} ({kind})", timing) for (kind, name), timing in fixtures],
+        )
+
+
+def write_table(terminalreporter: TerminalReporter, title: str, header: str, rows: list[tuple[str, Timing]]) -> None:
+    width = max([len(header)] + [len(name) for name, _ in rows])
+    terminalreporter.write_line("")
+    terminalreporter.write_line(title)
+    terminalreporter.write_line(f"{header:<{width}}  {'calls':>8}  {'own (s)':>10}  {'total (s)':>10}")
+    for name, timing in rows:
+        terminalreporter.write_line(f"{name:<{width}}  {timing.calls:>8}  {timing.own:>10.4f}  {timing.total:>10.4f}")
+
+
+profiler_key = pytest.StashKey[Profiler]()
+
+
+def get_profiler(request: FixtureRequest) -> Profiler | None:
+    """Get the profiler of the session, if profiling is enabled."""
+    return request.config.stash.get(profiler_key, None)
+
+
+def profiled(
+    kind: str, get_factory: Callable[[Mapping[str, Any]], type] | None = None
+) -> Callable[[Callable[P, T]], Callable[P, T]]:
+    """Mark a fixture implementation to be profiled.
+
+    The implementation is not wrapped: the generated fixture functions call it directly, and its fixture setup is
+    measured by the plugin only when profiling is enabled (see ``Profiler.measure_fixture``).
+
+    :param kind: Kind of the fixture (e.g. "model").
+    :param get_factory: Function returning the factory class the time is accounted to, from the keyword arguments
+        bound to the implementation.
+    """
+
+    def decorator(function: Callable[P, T]) -> Callable[P, T]:
+        function._factoryboy_profile = (kind, get_factory)  # type: ignore[attr-defined]
+        return function
+
+    return decorator
@@ -0,0 +1,88 @@
+"""Registries of the generated fixtures and of the factory class analysis.
+
+This module doesn't import factory_boy, so that the plugin can look up the registries without importing it:
+factory_boy is only imported by the first ``register`` call.
+"""
+
+from __future__ import annotations
+
+import weakref
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, Callable
+
+import pytest
+
+if TYPE_CHECKING:
+    from factory.base import Factory
+
+    from .fixture import BuildPlan, DeclarationFixture
+
+SEPARATOR = "__"
+STRIPPED_FACTORY_ATTR = "_pytest_factoryboy_stripped_factory"
+#: factory_boy strategies (``factory.BUILD_STRATEGY`` and ``factory.CREATE_STRATEGY``).
+STRATEGIES = frozenset({"build", "create"})
+
+#: Related fixture names (deduplicated) of the generated fixture functions, keyed by the fixture function.
+related_fixtures: weakref.WeakKeyDictionary[Callable[..., object], tuple[str, ...]] = weakref.WeakKeyDictionary()
+#: Build plans of the generated model fixture functions, keyed by the fixture function.
+model_plans: weakref.WeakKeyDictionary[Callable[..., object], BuildPlan] = weakref.WeakKeyDictionary()
+#: Declaration fixtures not created yet of the lazily registered model fixture functions, keyed by the function.
+lazy_declarations: weakref.WeakKeyDictionary[Callable[..., object], dict[str, DeclarationFixture]] = (
+    weakref.WeakKeyDictionary()
+)
+#: Values of the plain declarations, that the model fixtures can use instead of their attribute fixture, keyed by the
+#: attribute fixture function.
+attribute_values: weakref.WeakKeyDictionary[Callable[..., object], object] = weakref.WeakKeyDictionary()
+#: Values of the attribute fixtures of a test item used directly by the model fixtures, keyed by the fixture name:
+#: the generated attribute fixtures of plain declarations that are neither overridden nor parametrized for the item.
+direct_attributes_key = pytest.StashKey[Mapping[str, object]]()
+
+#: Model fixture names of the factory classes, keyed by the factory class.
+model_names: weakref.WeakKeyDictionary[type[Factory[Any]], str] = weakref.WeakKeyDictionary()
+#: Factory fixture names of the factory classes, keyed by the factory class.
+factory_names: weakref.WeakKeyDictionary[type[Factory[Any]], str] = weakref.WeakKeyDictionary()
+#: Dependencies of the factory classes, keyed by the factory class, then by the (model name, parent model name) pair.
+factory_deps: weakref.WeakKeyDictionary[type[Factory[Any]], dict[tuple[str, str | None], tuple[str, ...]]] = (
+    weakref.WeakKeyDictionary()
+)
+#: Attributes of the plain declarations of the factory classes, keyed by the factory class.
+factory_attributes: weakref.WeakKeyDictionary[type[Factory[Any]], frozenset[str]] = weakref.WeakKeyDictionary()
+#: Whether the factory classes create their instances asynchronously (see ``is_async_factory``), keyed by the factory
+#: class.
+async_factories: weakref.WeakKeyDictionary[type[Factory[Any]], bool] = weakref.WeakKeyDictionary()
+#: Factory classes registered under their default model fixture name without attribute fixtures: the fixtures of the
+#: sub-factory declarations don't depend on the attribute fixtures of their model fixture.
+plain_factories: weakref.WeakSet[type[Factory[Any]]] = weakref.WeakSet()
+#: Factory classes with a cached stripped subclass (see ``get_stripped_factory``).
+stripped_factories: weakref.WeakSet[type[Factory[Any]]] = weakref.WeakSet()
+
+
+def invalidate_factory_cache(factory_class: type[Factory[Any]] | None = None) -> None:
+    """Invalidate the cached analysis of a factory class, after it's mutated.
+
+    The model and factory fixture names, the dependencies, the plain declarations, whether the factory is async and
+    the subclass without post-generation declarations used by the model fixtures are cached per factory class. The
+    fixtures registered before the invalidation are not updated: register the factory again to take its changes into
+    account.
+
+    :param factory_class: Factory class to invalidate. All the factory classes if ``None``.
+    """
+    if factory_class is None:
+        factories = list(stripped_factories)
+        model_names.clear()
+        factory_names.clear()
+        factory_deps.clear()
+        factory_attributes.clear()
+        async_factories.clear()
+    else:
+        factories = [factory_class]
+        model_names.pop(factory_class, None)
+        factory_names.pop(factory_class, None)
+        factory_deps.pop(factory_class, None)
+        factory_attributes.pop(factory_class, None)
+        async_factories.pop(factory_class, None)
+
+    for factory in factories:
+        if STRIPPED_FACTORY_ATTR in factory.__dict__:
+            delattr(factory, STRIPPED_FACTORY_ATTR)
+        stripped_factories.discard(factory)
@@ -0,0 +1,112 @@
+"""Per-test usage of the factories (``--factoryboy-report``)."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    from _pytest.fixtures import FixtureRequest
+
+
+@dataclass
+class Usage:
+    """Number of instances (or calls) and the wall time spent creating them."""
+
+    count: int = 0
+    time: float = 0.0
+
+    def add(self, count: int, elapsed: float) -> None:
+        self.count += count
+        self.time += elapsed
+
+    def to_json(self) -> dict[str, object]:
+        return {"count": self.count, "time": self.time}
+
+
+@dataclass
+class ItemUsage:
+    """Factory usage of a test item."""
+
+    #: Model instances created, keyed by the factory class.
+    instances: dict[type, Usage] = field(default_factory=dict)
+    #: Deferred post-generation declarations executed (related factories excluded).
+    postgen: Usage = field(default_factory=Usage)
+    #: Deferred related factories executed. The time includes the creation of the related model fixture.
+    related: Usage = field(default_factory=Usage)
+    #: Instances created, keyed by the model (or batch) fixture name.
+    fixtures: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total_instances(self) -> int:
+        return sum(usage.count for usage in self.instances.values())
+
+    @property
+    def total_time(self) -> float:
+        """Time spent creating the instances and evaluating the deferred post-generation declarations."""
+        return sum(usage.time for usage in self.instances.values()) + self.postgen.time
+
+    def add_instances(self, fixture: str, factory_class: type, count: int, elapsed: float) -> None:
+        """Record model instances created by a fixture.
+
+        :param fixture: Model (or batch) fixture name.
+        :param factory_class: Factory class.
+        :param count: Number of instances.
+        :param elapsed: Wall time of the creation.
+        """
+        self.instances.setdefault(factory_class, Usage()).add(count, elapsed)
+        self.fixtures[fixture] = self.fixtures.get(fixture, 0) + count
+
+    def add_deferred(self, is_related: bool, elapsed: float) -> None:
+        """Record a deferred function execution."""
+        (self.related if is_related else self.postgen).add(1, elapsed)
+
+    def to_json(self) -> dict[str, object]:
+        return {
+            "instances": {
+                f"{factory_class.__module__}.{factory_class.__qualname__}": usage.to_json()
+                for factory_class, usage in self.instances.items()
+            },
+            "total_instances": self.total_instances,
+            "postgen": self.postgen.to_json(),
+            "related": self.related.to_json(),
+            "fixtures": dict(self.fixtures),
+        }
+
+
+usage_key = pytest.StashKey[ItemUsage]()
+
+
+def get_usage(request: FixtureRequest) -> ItemUsage | None:
+    """Get the factory usage of the test item being set up, if it's recorded."""
+    return request._pyfuncitem.stash.get(usage_key, None)
+
+
+class UsageReport:
+    """Collect the factory usage of the test items, from the test reports (possibly from xdist workers)."""
+
+    #: Attribute of the teardown test report holding the JSON usage of the item.
+    report_attr = "factoryboy_usage"
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.items: dict[str, dict[str, object]] = {}
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        usage = getattr(report, self.report_attr, None)
+        if usage is not None:
+            self.items[report.nodeid] = usage
+
+    def write(self) -> None:
+        """Write the report, as JSON lines if the file suffix is ``.jsonl``, as a JSON list otherwise."""
+        entries = [{"nodeid": nodeid, **usage} for nodeid, usage in self.items.items()]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("w") as fp:
+            if self.path.suffix == ".jsonl":
+                fp.writelines(json.dumps(entry) + "\n" for entry in entries)
+            else:
+                json.dump(entries, fp, indent=2)
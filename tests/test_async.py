@@ -0,0 +1,453 @@
+"""Test the async factories and their model fixtures."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+
+import factory
+import pytest
+
+from pytest_factoryboy import register
+from pytest_factoryboy.asyncfixture import generate_async
+from pytest_factoryboy.fixture import is_async_factory
+from tests.compat import assert_outcomes
+
+
+@dataclass
+class Author:
+    name: str
+    tags: list[str] = field(default_factory=list)
+    after_postgeneration: list[dict[str, object]] = field(default_factory=list)
+
+
+@dataclass
+class Book:
+    title: str
+    author: Author
+    editor: Author | None = None
+
+
+@dataclass
+class Review:
+    book: Book
+    rating: int = 5
+
+
+class AsyncFactory(factory.Factory):
+    class Meta:
+        abstract = True
+
+    @classmethod
+    async def _create(cls, model_class, *args, **kwargs):
+        await asyncio.sleep(0)
+        return model_class(*args, **kwargs)
+
+
+class AuthorFactory(AsyncFactory):
+    class Meta:
+        model = Author
+
+    name = "Charles Dickens"
+
+    @factory.post_generation
+    async def tags(obj, create, extracted, **kwargs):
+        await asyncio.sleep(0)
+        obj.tags = extracted or ["novelist"]
+        return obj.tags
+
+    @classmethod
+    async def _after_postgeneration(cls, instance, create, results=None):
+        instance.after_postgeneration.append(results)
+
+
+class ReviewFactory(AsyncFactory):
+    class Meta:
+        model = Review
+
+    book = None
+
+
+class BookFactory(AsyncFactory):
+    class Meta:
+        model = Book
+
+    title = "Bleak House"
+    author = factory.SubFactory(AuthorFactory)
+    editor = factory.SubFactory(AuthorFactory, name="John Forster")
+    review = factory.RelatedFactory(ReviewFactory, factory_related_name="book", rating=4)
+    second_review = factory.RelatedFactory(ReviewFactory, factory_related_name="book")
+
+
+class SyncAuthorFactory(factory.Factory):
+    class Meta:
+        model = Author
+
+    name = "Charles Dickens"
+
+
+class CyclicFactory(factory.Factory):
+    class Meta:
+        model = Author
+
+    name = "Charles Dickens"
+    author = factory.SubFactory("tests.test_async.CyclicFactory")
+
+
+def test_is_async_factory():
+    """Test that the factories creating async factories (transitively) are async."""
+    assert is_async_factory(AuthorFactory)
+    assert is_async_factory(BookFactory)
+    assert is_async_factory(ReviewFactory)
+    assert not is_async_factory(SyncAuthorFactory)
+    assert not is_async_factory(CyclicFactory)
+
+
+def test_generate_async():
+    """Test that the sub-factories, the post-generation declarations and the related factories are awaited."""
+    book = asyncio.run(generate_async(BookFactory, factory.CREATE_STRATEGY, {"author__name": "Wilkie Collins"}))
+
+    assert book.title == "Bleak House"
+    assert book.author.name == "Wilkie Collins"
+    assert book.author.tags == ["novelist"]
+    assert book.author.after_postgeneration == [{"tags": ["novelist"]}]
+    assert book.editor is not None
+    assert book.editor.name == "John Forster"
+
+
+def test_generate_async_post_generation():
+    """Test the results of the post-generation declarations, in declaration order."""
+    calls: list[dict[str, object]] = []
+
+    class ResultsBookFactory(BookFactory):
+        @classmethod
+        async def _after_postgeneration(cls, instance, create, results=None):
+            calls.append(results)
+
+    book = asyncio.run(generate_async(ResultsBookFactory, factory.BUILD_STRATEGY, {"second_review": None}))
+
+    [book_results] = calls
+    assert list(book_results) == ["review", "second_review"]
+    review = book_results["review"]
+    assert isinstance(review, Review)
+    assert review.book is book
+    assert review.rating == 4
+    assert book_results["second_review"] is None
+
+
+def test_generate_async_concurrent():
+    """Test that the independent sub-factories are created concurrently."""
+    started: list[str] = []
+
+    class WaitingAuthorFactory(AsyncFactory):
+        class Meta:
+            model = Author
+
+        name = "Charles Dickens"
+
+        @classmethod
+        async def _create(cls, model_class, *args, **kwargs):
+            started.append(kwargs["name"])
+            # Only returns once both the authors of the book are being created.
+            while len(started) < 2:
+                await asyncio.sleep(0)
+            return model_class(*args, **kwargs)
+
+    class WaitingBookFactory(factory.Factory):
+        class Meta:
+            model = Book
+
+        title = "Bleak House"
+        author = factory.SubFactory(WaitingAuthorFactory)
+        editor = factory.SubFactory(WaitingAuthorFactory, name="John Forster")
+
+    async def generate() -> Book:
+        return await asyncio.wait_for(generate_async(WaitingBookFactory, factory.CREATE_STRATEGY, {}), timeout=5)
+
+    book = asyncio.run(generate())
+    assert sorted(started) == ["Charles Dickens", "John Forster"]
+    assert book.author.name == "Charles Dickens"
+
+
+def test_batch():
+    """Test that the async factories can't be registered with batch fixtures."""
+    with pytest.raises(AssertionError, match="Async factories don't support batch fixtures"):
+        register(AuthorFactory, _batch_size=2)
+
+
+def test_model_fixtures(pytester: pytest.Pytester):
+    """Test the async model fixtures, set up by pytest-asyncio."""
+    pytest.importorskip("pytest_asyncio")
+    pytester.makepyfile("""
+        import asyncio
+        from dataclasses import dataclass, field
+
+        import factory
+        import pytest
+
+        from pytest_factoryboy import register
+
+
+        @dataclass
+        class Author:
+            name: str
+            tags: list = field(default_factory=list)
+            after_postgeneration: list = field(default_factory=list)
+
+
+        @dataclass
+        class Book:
+            title: str
+            author: Author
+
+
+        @dataclass
+        class Review:
+            book: Book
+
+
+        @dataclass
+        class Publisher:
+            name: str
+
+
+        @dataclass
+        class Editor:
+            name: str
+            author: Author
+
+
+        class AsyncFactory(factory.Factory):
+            class Meta:
+                abstract = True
+
+            @classmethod
+            async def _create(cls, model_class, *args, **kwargs):
+                await asyncio.sleep(0)
+                return model_class(*args, **kwargs)
+
+
+        @register
+        class AuthorFactory(AsyncFactory):
+            class Meta:
+                model = Author
+
+            name = "Charles Dickens"
+
+            @factory.post_generation
+            async def tags(obj, create, extracted, **kwargs):
+                obj.tags = extracted or ["novelist"]
+                return obj.tags
+
+            @classmethod
+            async def _after_postgeneration(cls, instance, create, results=None):
+                instance.after_postgeneration.append(results)
+
+
+        class ReviewFactory(AsyncFactory):
+            class Meta:
+                model = Review
+
+            book = None
+
+
+        @register
+        class BookFactory(AsyncFactory):
+            class Meta:
+                model = Book
+
+            title = "Bleak House"
+            author = factory.SubFactory(AuthorFactory)
+            review = factory.RelatedFactory(ReviewFactory, factory_related_name="book")
+
+
+        @register
+        class PublisherFactory(factory.Factory):
+            class Meta:
+                model = Publisher
+
+            name = "Chapman & Hall"
+
+
+        @register(_scope="module")
+        class EditorFactory(AsyncFactory):
+            class Meta:
+                model = Editor
+
+            name = "John Forster"
+            author = factory.SubFactory(AuthorFactory)
+
+
+        @pytest.mark.asyncio
+        async def test_author(author):
+            assert author.name == "Charles Dickens"
+            assert author.after_postgeneration == [{"tags": ["novelist"]}]
+
+
+        @pytest.mark.asyncio
+        @pytest.mark.parametrize("author__name", ["Wilkie Collins"])
+        @pytest.mark.parametrize("author__tags", [["poet"]])
+        async def test_author_attributes(author):
+            assert author.name == "Wilkie Collins"
+            assert author.tags == ["poet"]
+
+
+        @pytest.mark.asyncio
+        async def test_book(book):
+            assert book.author.name == "Charles Dickens"
+            assert book.author.tags == ["novelist"]
+
+
+        @pytest.mark.asyncio
+        @pytest.mark.parametrize("author__name", ["Wilkie Collins"])
+        async def test_book_author(book, author):
+            assert book.author is author
+            assert author.name == "Wilkie Collins"
+
+
+        @pytest.mark.asyncio
+        @pytest.mark.factory("book", title="Hard Times")
+        async def test_book_marker(book):
+            assert book.title == "Hard Times"
+
+
+        @pytest.mark.asyncio
+        async def test_sync_model(author, publisher):
+            assert author.name == "Charles Dickens"
+            assert publisher.name == "Chapman & Hall"
+
+
+        @pytest.mark.asyncio(loop_scope="module")
+        async def test_scope(editor):
+            assert editor.author.after_postgeneration == [{"tags": ["novelist"]}]
+    """)
+    result = pytester.runpytest()
+    assert_outcomes(result, passed=7)
+
+
+SYNC_RUNNER_CONFTEST = """
+import asyncio
+import inspect
+
+import pytest
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_fixture_setup(fixturedef, request):
+    \"\"\"Run the async fixtures to completion in a new event loop, without pytest-asyncio.\"\"\"
+    if not inspect.iscoroutinefunction(fixturedef.func):
+        return None
+    kwargs = {argname: request.getfixturevalue(argname) for argname in fixturedef.argnames}
+    result = asyncio.run(fixturedef.func(**kwargs))
+    fixturedef.cached_result = (result, fixturedef.cache_key(request), None)
+    return result
+"""
+
+
+def test_sync_runner(pytester: pytest.Pytester):
+    """Test the async model fixtures set up by another runner, and the overrides of their sub-factories."""
+    pytester.makeconftest(SYNC_RUNNER_CONFTEST)
+    pytester.makepyfile("""
+        import asyncio
+        from dataclasses import dataclass, field
+
+        import factory
+        import pytest
+
+        from pytest_factoryboy import register
+
+
+        @dataclass
+        class User:
+            username: str
+
+
+        @dataclass
+        class Author:
+            name: str
+            user: User
+            tags: list = field(default_factory=list)
+
+
+        @dataclass
+        class Book:
+            title: str
+            author: Author
+
+
+        class AsyncFactory(factory.Factory):
+            class Meta:
+                abstract = True
+
+            @classmethod
+            async def _create(cls, model_class, *args, **kwargs):
+                await asyncio.sleep(0)
+                return model_class(*args, **kwargs)
+
+
+        @register
+        class UserFactory(AsyncFactory):
+            class Meta:
+                model = User
+
+            username = "dickens"
+
+
+        @register
+        class AuthorFactory(AsyncFactory):
+            class Meta:
+                model = Author
+
+            name = "Charles Dickens"
+            user = factory.SubFactory(UserFactory)
+
+            @factory.post_generation
+            def tags(obj, create, extracted, **kwargs):
+                obj.tags = extracted or ["novelist"]
+
+
+        @register
+        class BookFactory(AsyncFactory):
+            class Meta:
+                model = Book
+
+            title = "Bleak House"
+            author = factory.SubFactory(AuthorFactory)
+
+
+        def test_book(book):
+            assert book.title == "Bleak House"
+            assert (book.author.name, book.author.tags, book.author.user.username) == (
+                "Charles Dickens",
+                ["novelist"],
+                "dickens",
+            )
+
+
+        @pytest.mark.parametrize("author__name", ["Wilkie Collins"])
+        @pytest.mark.parametrize("author__tags", [["poet"]])
+        @pytest.mark.parametrize("user__username", ["collins"])
+        def test_parametrized(book, author__name, author__tags, user__username):
+            assert (book.author.name, book.author.tags, book.author.user.username) == (
+                "Wilkie Collins",
+                ["poet"],
+                "collins",
+            )
+
+
+        class TestOverridden:
+            @pytest.fixture
+            def author__name(self):
+                return "Jane Austen"
+
+            def test_overridden(self, book):
+                assert book.author.name == "Jane Austen"
+
+
+        @pytest.mark.parametrize("author__name", ["Wilkie Collins"])
+        def test_model_fixture(book, author):
+            assert book.author is author
+            assert author.name == "Wilkie Collins"
+    """)
+    result = pytester.runpytest("-p", "no:asyncio")
+    assert_outcomes(result, passed=4)
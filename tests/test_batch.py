@@ -0,0 +1,103 @@
+"""Test the batch fixtures."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+
+import factory
+import pytest
+
+from pytest_factoryboy import register
+
+
+@dataclass
+class Author:
+    name: str
+    tags: list[str] = field(default_factory=list)
+    books: list[Book] = field(default_factory=list)
+    results: Mapping[str, object] | None = None
+
+
+@dataclass
+class Book:
+    title: str
+    author: Author
+
+    def __post_init__(self) -> None:
+        self.author.books.append(self)
+
+
+batch_calls: list[int] = []
+
+
+class AuthorFactory(factory.Factory):
+    class Meta:
+        model = Author
+
+    name = factory.Sequence(lambda n: f"Author {n}")
+    book = factory.RelatedFactory("tests.test_batch.BookFactory", "author", title="Bleak House")
+
+    @factory.post_generation
+    def tags(obj: Author, create: bool, extracted: list[str] | None, **kwargs: object) -> str:
+        obj.tags = list(extracted or ["default"])
+        return obj.name
+
+    @classmethod
+    def create_batch(cls, size: int, **kwargs: object) -> list[Author]:
+        batch_calls.append(size)
+        return super().create_batch(size, **kwargs)
+
+    @classmethod
+    def _after_postgeneration(cls, obj: Author, create: bool, results: Mapping[str, object] | None = None) -> None:
+        obj.results = results
+
+
+class BookFactory(factory.Factory):
+    class Meta:
+        model = Book
+
+    title = "Great Expectations"
+    author = factory.SubFactory(AuthorFactory)
+
+
+register(AuthorFactory, _batch_size=3)
+register(BookFactory)
+
+
+def test_batch(author_batch: list[Author]):
+    """Test that the instances are created by a single batch call."""
+    assert len(author_batch) == 3
+    assert len({author.name for author in author_batch}) == 3
+    assert batch_calls[-1] == 3
+
+
+def test_batch_postgen(author_batch: list[Author]):
+    """Test that the post-generation declarations are evaluated per instance."""
+    for author in author_batch:
+        assert author.tags == ["default"]
+        assert [book.title for book in author.books] == ["Bleak House"]
+        assert author.results is not None
+        assert author.results["tags"] == author.name
+        assert author.results["book"] is author.books[0]
+
+
+@pytest.mark.parametrize("author_batch__size", [0, 5])
+def test_batch_size(author_batch: list[Author], author_batch__size: int):
+    """Test that the batch size can be parametrized."""
+    assert len(author_batch) == author_batch__size
+
+
+@pytest.mark.parametrize("author__name", ["Charles Dickens"])
+@pytest.mark.parametrize("author__tags", [["novel"]])
+def test_batch_overrides(author_batch: list[Author], author: Author):
+    """Test that the attribute fixtures of the model are shared with the batch fixture."""
+    assert [author.name for author in author_batch] == ["Charles Dickens"] * 3
+    assert all(author.tags == ["novel"] for author in author_batch)
+    assert author not in author_batch
+
+
+def test_no_batch(request: pytest.FixtureRequest):
+    """Test that the batch fixture is only registered on demand."""
+    with pytest.raises(pytest.FixtureLookupError):
+        request.getfixturevalue("book_batch")
@@ -0,0 +1,229 @@
+"""Test the factoryboy_budget marker."""
+
+from __future__ import annotations
+
+import pytest
+
+MODELS = """
+from dataclasses import dataclass, field
+
+import factory
+import pytest
+
+from pytest_factoryboy import register
+
+
+@dataclass
+class Author:
+    name: str
+    books: list = field(default_factory=list)
+
+
+@dataclass
+class Book:
+    title: str
+    author: Author
+
+    def __post_init__(self):
+        self.author.books.append(self)
+
+
+class AuthorFactory(factory.Factory):
+    class Meta:
+        model = Author
+
+    name = "Charles Dickens"
+    book = factory.RelatedFactory("test_budget.BookFactory", "author")
+
+
+class BookFactory(factory.Factory):
+    class Meta:
+        model = Book
+
+    title = "Bleak House"
+    author = factory.SubFactory(AuthorFactory)
+
+
+register(AuthorFactory, _batch_size=3)
+register(BookFactory)
+"""
+
+
+def test_budget_exceeded(pytester: pytest.Pytester):
+    """Test that a test exceeding its budget fails, with the breakdown of the instances."""
+    pytester.makepyfile(test_budget=MODELS + """
+
+@pytest.mark.factoryboy_budget(max_instances=1)
+def test_author(author):
+    raise AssertionError("The test is not called")
+
+
+@pytest.mark.factoryboy_budget(max_instances=2)
+def test_within_budget(author):
+    pass
+""")
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=1, failed=1)
+    result.stdout.fnmatch_lines(
+        [
+            "factoryboy budget exceeded: 2 instances created (max 1).",
+            "Instances per model fixture:",
+            "  author: 1",
+            "  book: 1",
+            "Instances per factory:",
+            "  AuthorFactory: 1 (*s)",
+            "  BookFactory: 1 (*s)",
+            "Deferred functions: 1 related factories (*s), 0 post-generation declarations (*s).",
+        ]
+    )
+    result.stdout.no_fnmatch_line("*The test is not called*")
+
+
+def test_budget_batch_related(pytester: pytest.Pytester):
+    """Test that the instances created by the related factories of batch instances are counted."""
+    pytester.makepyfile(test_budget=MODELS + """
+
+@pytest.mark.factoryboy_budget(max_instances=5)
+def test_batch(author_batch):
+    pass
+""")
+    result = pytester.runpytest()
+    result.assert_outcomes(failed=1)
+    result.stdout.fnmatch_lines(
+        [
+            "factoryboy budget exceeded: 6 instances created (max 5).",
+            "Instances per model fixture:",
+            "  author_batch: 3",
+            "  author_batch__book: 3",
+        ]
+    )
+
+
+def test_budget_warn(pytester: pytest.Pytester):
+    """Test the warn action."""
+    pytester.makepyfile(test_budget=MODELS + """
+
+@pytest.mark.factoryboy_budget(max_instances=1, action="warn")
+def test_author(author):
+    pass
+""")
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=1, warnings=1)
+    result.stdout.fnmatch_lines("*BudgetExceededWarning: factoryboy budget exceeded: 2 instances created (max 1).")
+
+
+def test_budget_ini(pytester: pytest.Pytester):
+    """Test the ini defaults, overridden by the marker."""
+    pytester.makeini("""
+        [pytest]
+        factoryboy_max_instances = 1
+        factoryboy_max_seconds = 60
+    """)
+    pytester.makepyfile(test_budget=MODELS + """
+
+def test_author(author):
+    pass
+
+
+@pytest.mark.factoryboy_budget(max_instances=2)
+def test_author_budget(author):
+    pass
+
+
+def test_book_factory(book_factory):
+    pass
+""")
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=2, failed=1)
+    result.stdout.fnmatch_lines("FAILED test_budget.py::test_author - Failed: factoryboy budget exceeded*")
+
+
+def test_budget_seconds(pytester: pytest.Pytester):
+    """Test the time budget."""
+    pytester.makepyfile(test_budget=MODELS + """
+
+@pytest.mark.factoryboy_budget(max_seconds=0)
+def test_author(author):
+    pass
+""")
+    result = pytester.runpytest()
+    result.assert_outcomes(failed=1)
+    result.stdout.fnmatch_lines("factoryboy budget exceeded: *s spent creating instances (max 0s).")
+
+
+def test_budget_dynamic(pytester: pytest.Pytester):
+    """Test the budget of a test using factories only dynamically, which needs the marker."""
+    pytester.makeini("""
+        [pytest]
+        factoryboy_max_instances = 1
+    """)
+    pytester.makepyfile(test_budget=MODELS + """
+
+@pytest.fixture
+def dynamic_author(request):
+    return request.getfixturevalue("author")
+
+
+@pytest.mark.factoryboy_budget
+def test_marked(dynamic_author):
+    pass
+
+
+def test_not_marked():
+    pass
+""")
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=1, failed=1)
+    result.stdout.fnmatch_lines("FAILED test_budget.py::test_marked - Failed: factoryboy budget exceeded*")
+
+
+@pytest.mark.parametrize(
+    ["ini", "message"],
+    [
+        ("factoryboy_max_instances = lots", "*factoryboy_max_instances must be an integer, got 'lots'."),
+        ("factoryboy_max_seconds = 1s", "*factoryboy_max_seconds must be a number, got '1s'."),
+        ("factoryboy_budget_action = raise", "*Unknown factoryboy budget action 'raise', use 'fail' or 'warn'."),
+    ],
+)
+def test_invalid_ini(pytester: pytest.Pytester, ini: str, message: str):
+    """Test that an invalid default budget is a usage error."""
+    pytester.makeini(f"""
+        [pytest]
+        {ini}
+    """)
+    pytester.makepyfile("""
+def test_nothing():
+    pass
+""")
+    result = pytester.runpytest()
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines([message])
+
+
+@pytest.mark.parametrize(
+    ["arguments", "message"],
+    [
+        (
+            "max_instance=1",
+            "*Unknown factoryboy_budget arguments: max_instance. Use max_instances, max_seconds, action.",
+        ),
+        ("1", "*factoryboy_budget only accepts keyword arguments (max_instances, max_seconds, action), got (1,)."),
+        (
+            "max_instances='1'",
+            "*max_instances of the factoryboy budget must be a non-negative integer, got '1'.",
+        ),
+        ("max_seconds=-1", "*max_seconds of the factoryboy budget must be a non-negative number, got -1."),
+        ("max_instances=1, action='raise'", "*Unknown factoryboy budget action 'raise', use 'fail' or 'warn'."),
+    ],
+)
+def test_invalid_marker(pytester: pytest.Pytester, arguments: str, message: str):
+    """Test that the invalid arguments of the marker are reported."""
+    pytester.makepyfile(test_budget=MODELS + f"""
+
+@pytest.mark.factoryboy_budget({arguments})
+def test_author(author):
+    pass
+""")
+    result = pytester.runpytest()
+    result.assert_outcomes(errors=1)
+    result.stdout.fnmatch_lines([message])
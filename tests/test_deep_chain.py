@@ -0,0 +1,67 @@
+"""Test deep SubFactory chains with related factories."""
+
+from __future__ import annotations
+
+import factory
+
+from pytest_factoryboy import named_model, register
+
+DEPTH = 50
+
+
+class Node:
+    """Model of a chain level."""
+
+    def __init__(self, **kwargs: object) -> None:
+        self.__dict__.update(kwargs)
+        self.tags: list[Node] = []
+
+
+class Tag:
+    """Model of the related object attached to every level."""
+
+    def __init__(self, owner: Node) -> None:
+        self.owner = owner
+        owner.tags.append(self)
+
+
+def make_factory(name: str, model: type, declarations: dict[str, object]) -> type[factory.Factory]:
+    meta = type("Meta", (), {"model": model})
+    return type(name, (factory.Factory,), {"Meta": meta, **declarations})
+
+
+parent_factory: type[factory.Factory] | None = None
+for level in range(DEPTH):
+    declarations: dict[str, object] = {
+        "level": level,
+        "tag": factory.RelatedFactory(f"{__name__}.Tag{level}Factory", "owner"),
+    }
+    if parent_factory is not None:
+        declarations["parent"] = factory.SubFactory(parent_factory)
+    parent_factory = globals()[f"Level{level}Factory"] = make_factory(
+        f"Level{level}Factory", named_model(Node, f"Level{level}"), declarations
+    )
+    tag_factory = globals()[f"Tag{level}Factory"] = make_factory(
+        f"Tag{level}Factory", named_model(Tag, f"Tag{level}"), {"owner": factory.SubFactory(parent_factory)}
+    )
+    register(parent_factory)
+    register(tag_factory)
+
+
+def test_deep_chain(level49: Node):
+    """Test that the related factories of every level of a deep SubFactory chain are evaluated."""
+    node: Node | None = level49
+    for level in reversed(range(DEPTH)):
+        assert node is not None
+        assert node.level == level
+        [tag] = node.tags
+        assert tag.owner is node
+        node = getattr(node, "parent", None)
+    assert node is None
+
+
+def test_deep_chain_deps_cached(request, factoryboy_request):
+    """Test that the dependency closure of a related fixture spans the whole chain and is computed once."""
+    deps = factoryboy_request.get_deps(request, f"level{DEPTH - 1}__tag")
+    assert {f"tag{DEPTH - 1}", f"level{DEPTH - 1}", "level0", "level1__parent"} <= deps
+    assert factoryboy_request.get_deps(request, f"level{DEPTH - 1}__tag") is deps
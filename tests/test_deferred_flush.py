@@ -0,0 +1,337 @@
+"""Test the deferred flush of the model instances (``factoryboy_deferred_flush`` marker)."""
+
+from __future__ import annotations
+
+import pytest
+
+from pytest_factoryboy.flush import UnitOfWork
+from tests.compat import assert_outcomes
+
+CONFTEST = """
+import sqlite3
+
+import factory
+import pytest
+
+from pytest_factoryboy import LazyFixture, register
+from pytest_factoryboy.flush import SQLiteFlush
+
+from models import Author, Book, Review
+
+flushes = []
+
+
+def pytest_configure(config):
+    config.pluginmanager.register(SQLiteFlush("connection", {Author: "author", Book: "book", Review: "review"}))
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_factoryboy_flush(request, factory_class, instances):
+    flushes.append((factory_class.__name__, len(instances)))
+
+
+@pytest.fixture
+def connection():
+    connection = sqlite3.connect(":memory:")
+    connection.executescript(
+        '''
+        CREATE TABLE author (id INTEGER PRIMARY KEY, name TEXT NOT NULL);
+        CREATE TABLE book (id INTEGER PRIMARY KEY, title TEXT NOT NULL, author_id INTEGER NOT NULL REFERENCES author);
+        CREATE TABLE review (id INTEGER PRIMARY KEY, book_id INTEGER NOT NULL REFERENCES book, rating INTEGER);
+        '''
+    )
+    yield connection
+    connection.close()
+
+
+class ModelFactory(factory.Factory):
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def _create(cls, model_class, *args, **kwargs):
+        raise AssertionError(f"{model_class.__name__} created outside of the flush.")
+
+
+class AuthorFactory(ModelFactory):
+    class Meta:
+        model = Author
+
+    name = factory.Sequence(lambda n: f"Author {n}")
+
+
+class ReviewFactory(ModelFactory):
+    class Meta:
+        model = Review
+
+    book = factory.SubFactory("conftest.BookFactory")
+
+
+class BookFactory(ModelFactory):
+    class Meta:
+        model = Book
+
+    title = "Bleak House"
+    author = factory.SubFactory(AuthorFactory)
+    review = factory.RelatedFactory(ReviewFactory, factory_related_name="book")
+
+
+register(AuthorFactory)
+register(AuthorFactory, "other_author")
+register(BookFactory)
+register(BookFactory, "other_book", author=LazyFixture("other_author"))
+register(ReviewFactory)
+
+
+@pytest.fixture(autouse=True)
+def reset_flushes():
+    flushes.clear()
+"""
+
+MODELS = """
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class Author:
+    name: str
+    id: Optional[int] = None
+
+
+@dataclass
+class Book:
+    title: str
+    author: Author
+    id: Optional[int] = None
+
+
+@dataclass
+class Review:
+    book: Book
+    rating: int = 5
+    id: Optional[int] = None
+"""
+
+
+@pytest.fixture
+def flush_pytester(pytester: pytest.Pytester) -> pytest.Pytester:
+    pytester.makeconftest(CONFTEST)
+    pytester.makepyfile(models=MODELS)
+    return pytester
+
+
+def test_flush(flush_pytester: pytest.Pytester):
+    """Test that the instances are inserted in bulk, in dependency order, right before the test is called."""
+    flush_pytester.makepyfile("""
+import pytest
+
+from conftest import flushes
+
+
+@pytest.fixture
+def not_flushed(book, other_book, connection):
+    assert book.id is None
+    assert connection.execute("SELECT COUNT(*) FROM book").fetchone() == (0,)
+
+
+@pytest.mark.factoryboy_deferred_flush
+def test_book(not_flushed, book, other_book, review, connection):
+    assert flushes == [("AuthorFactory", 2), ("BookFactory", 2), ("ReviewFactory", 1)]
+    assert connection.execute("SELECT id, title, author_id FROM book ORDER BY id").fetchall() == [
+        (book.id, "Bleak House", book.author.id),
+        (other_book.id, "Bleak House", other_book.author.id),
+    ]
+    assert book.author.id != other_book.author.id
+    assert connection.execute("SELECT id, book_id FROM review").fetchall() == [(review.id, book.id)]
+""")
+    result = flush_pytester.runpytest()
+    assert_outcomes(result, passed=1)
+
+
+def test_ini(flush_pytester: pytest.Pytester):
+    """Test the deferred flush of the ini option, and its opt-out with the marker."""
+    flush_pytester.makeini("""
+        [pytest]
+        factoryboy_deferred_flush = true
+    """)
+    flush_pytester.makepyfile("""
+import pytest
+
+from conftest import flushes
+
+
+def test_author(author, connection):
+    assert flushes == [("AuthorFactory", 1)]
+    assert connection.execute("SELECT id, name FROM author").fetchall() == [(author.id, author.name)]
+
+
+@pytest.mark.factoryboy_deferred_flush(False)
+def test_disabled(author):
+    pass
+""")
+    result = flush_pytester.runpytest()
+    assert_outcomes(result, passed=1, errors=1)
+    result.stdout.fnmatch_lines(["*AssertionError: Author created outside of the flush."])
+
+
+def test_build_strategy(flush_pytester: pytest.Pytester):
+    """Test that the instances built with the build strategy are not flushed."""
+    flush_pytester.makepyfile("""
+import pytest
+
+from conftest import flushes
+
+
+@pytest.mark.factoryboy_deferred_flush
+@pytest.mark.factoryboy_strategy("build")
+def test_author(author):
+    assert flushes == []
+    assert author.id is None
+""")
+    result = flush_pytester.runpytest()
+    assert_outcomes(result, passed=1)
+
+
+def test_after_setup(flush_pytester: pytest.Pytester):
+    """Test that the model fixtures requested by the test create their instances right away."""
+    flush_pytester.makepyfile("""
+import pytest
+
+from conftest import AuthorFactory, flushes
+from pytest_factoryboy import register
+
+
+@register(_name="created_author")
+class CreatedAuthorFactory(AuthorFactory):
+    @classmethod
+    def _create(cls, model_class, *args, **kwargs):
+        return model_class(*args, id=0, **kwargs)
+
+
+@pytest.mark.factoryboy_deferred_flush
+def test_author(request, author, factoryboy_request):
+    created_author = request.getfixturevalue("created_author")
+    assert created_author.id == 0
+    assert flushes == [("AuthorFactory", 1)]
+    assert not factoryboy_request.unit_of_work
+""")
+    result = flush_pytester.runpytest()
+    assert_outcomes(result, passed=1)
+
+
+def test_post_generation(flush_pytester: pytest.Pytester):
+    """Test that the instances are persisted before their post-generation declarations and _after_postgeneration."""
+    flush_pytester.makepyfile("""
+import factory
+import pytest
+
+from conftest import AuthorFactory, flushes
+from pytest_factoryboy import register
+
+calls = []
+
+
+@register(_name="tagged_author")
+class TaggedAuthorFactory(AuthorFactory):
+    @factory.post_generation
+    def tags(obj, create, extracted, **kwargs):
+        calls.append(("tags", create, obj.id, list(flushes)))
+
+    @classmethod
+    def _after_postgeneration(cls, instance, create, results=None):
+        calls.append(("_after_postgeneration", create, instance.id, list(flushes)))
+
+
+@pytest.mark.factoryboy_deferred_flush
+def test_author(author, tagged_author, connection):
+    assert calls == [
+        ("tags", True, tagged_author.id, [("AuthorFactory", 1), ("TaggedAuthorFactory", 1)]),
+        ("_after_postgeneration", True, tagged_author.id, [("AuthorFactory", 1), ("TaggedAuthorFactory", 1)]),
+    ]
+    assert tagged_author.id is not None
+    assert flushes == [("AuthorFactory", 1), ("TaggedAuthorFactory", 1)]
+    assert connection.execute("SELECT COUNT(*) FROM author").fetchone() == (2,)
+""")
+    result = flush_pytester.runpytest()
+    assert_outcomes(result, passed=1)
+
+
+def test_not_flushed(flush_pytester: pytest.Pytester):
+    """Test that the instances added to the unit of work after the setup of the test are reported in its teardown."""
+    flush_pytester.makepyfile("""
+import pytest
+
+from conftest import AuthorFactory
+from models import Author
+
+
+@pytest.mark.factoryboy_deferred_flush
+def test_author(author, factoryboy_request):
+    factoryboy_request.unit_of_work.add(AuthorFactory, Author("Wilkie Collins"), [])
+""")
+    result = flush_pytester.runpytest()
+    assert_outcomes(result, passed=1, errors=1)
+    result.stdout.fnmatch_lines(
+        ["*FlushError: The 1 instances added to the unit of work after the setup of the test were never persisted."]
+    )
+
+
+def test_not_implemented(pytester: pytest.Pytester):
+    """Test that the instances no hook implementation persisted are reported."""
+    pytester.makepyfile("""
+        from dataclasses import dataclass
+
+        import factory
+        import pytest
+
+        from pytest_factoryboy import register
+
+
+        @dataclass
+        class Author:
+            name: str
+
+
+        @register
+        class AuthorFactory(factory.Factory):
+            class Meta:
+                model = Author
+
+            name = "Charles Dickens"
+
+
+        @pytest.mark.factoryboy_deferred_flush
+        def test_author(author):
+            pass
+    """)
+    result = pytester.runpytest()
+    assert_outcomes(result, failed=1)
+    result.stdout.fnmatch_lines(
+        ["*FlushError: No pytest_factoryboy_flush hook implementation persisted the 1 instances of *"]
+    )
+
+
+def test_unit_of_work_batches():
+    """Test that the instances are grouped per dependency level and factory, in dependency order."""
+
+    class AuthorFactory:
+        pass
+
+    class BookFactory:
+        pass
+
+    unit_of_work = UnitOfWork()
+    dickens, collins, bleak_house, woman_in_white, forster = object(), object(), object(), object(), object()
+    unit_of_work.add(AuthorFactory, dickens, ["Charles Dickens"])  # type: ignore[arg-type]
+    unit_of_work.add(BookFactory, bleak_house, ["Bleak House", dickens])  # type: ignore[arg-type]
+    unit_of_work.add(AuthorFactory, collins, [])  # type: ignore[arg-type]
+    unit_of_work.add(BookFactory, woman_in_white, [collins])  # type: ignore[arg-type]
+    unit_of_work.add(AuthorFactory, forster, [bleak_house])  # type: ignore[arg-type]
+
+    assert len(unit_of_work) == 5
+    assert unit_of_work.batches() == [
+        (AuthorFactory, [dickens, collins]),
+        (BookFactory, [bleak_house, woman_in_white]),
+        (AuthorFactory, [forster]),
+    ]
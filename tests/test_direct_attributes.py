@@ -0,0 +1,144 @@
+"""Test the attribute fixtures used directly by the model fixtures, when they're not overridden."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import factory
+import pytest
+
+from pytest_factoryboy import LazyFixture, register
+from tests.compat import assert_outcomes
+
+
+@dataclass
+class Author:
+    name: str
+    country: str
+
+
+@dataclass
+class Book:
+    title: str
+    edition: int
+    author: Author
+
+
+class AuthorFactory(factory.Factory):
+    class Meta:
+        model = Author
+
+    name = "Charles Dickens"
+    country = "England"
+
+
+class BookFactory(factory.Factory):
+    class Meta:
+        model = Book
+
+    title = "Bleak House"
+    edition = 1
+    author = factory.SubFactory(AuthorFactory)
+
+
+register(AuthorFactory)
+register(BookFactory)
+register(BookFactory, "novel", title="Hard Times")
+register(BookFactory, "reprint", edition=LazyFixture("reprint_edition"))
+
+
+@pytest.fixture
+def reprint_edition() -> int:
+    return 2
+
+
+def test_not_set_up(request, book: Book):
+    """Test that the attribute fixtures that are not overridden are not set up."""
+    assert book == Book(title="Bleak House", edition=1, author=Author(name="Charles Dickens", country="England"))
+    assert "book__title" not in request.fixturenames
+    assert "author__name" not in request.fixturenames
+    assert "book__author" in request.fixturenames
+
+
+def test_registration_override(novel: Book):
+    """Test that the value overridden at registration is used."""
+    assert novel.title == "Hard Times"
+
+
+def test_lazy_fixture(request, reprint: Book):
+    """Test that the attribute fixtures of lazy fixtures are set up."""
+    assert reprint.edition == 2
+    assert "reprint__edition" in request.fixturenames
+    assert "reprint__title" not in request.fixturenames
+
+
+@pytest.mark.parametrize("book__title", ["Little Dorrit"])
+@pytest.mark.parametrize("author__name", ["Wilkie Collins"])
+def test_parametrized(request, book: Book):
+    """Test that the parametrized attribute fixtures are used, including the ones of sub-factories."""
+    assert book.title == "Little Dorrit"
+    assert book.author.name == "Wilkie Collins"
+    assert book.author.country == "England"
+    assert "book__edition" not in request.fixturenames
+
+
+def test_requested(book: Book, book__title: str):
+    """Test that an attribute fixture requested by the test is still available."""
+    assert book.title == book__title == "Bleak House"
+
+
+def test_dynamic(request):
+    """Test that a model fixture requested dynamically sets up its attribute fixtures."""
+    book = request.getfixturevalue("book")
+    assert book.title == "Bleak House"
+    assert request.getfixturevalue("book__title") == "Bleak House"
+
+
+class TestOverride:
+    @pytest.fixture
+    def book__title(self, book__edition: int) -> str:
+        return f"Bleak House (edition {book__edition})"
+
+    def test_override(self, request, book: Book):
+        """Test that an attribute fixture overridden by a fixture is used, as well as its dependencies."""
+        assert book.title == "Bleak House (edition 1)"
+        assert "book__edition" in request.fixturenames
+
+
+def test_generate_tests(pytester: pytest.Pytester):
+    """Test that the attribute fixtures can be parametrized by a ``pytest_generate_tests`` hook."""
+    pytester.makeconftest("""
+        def pytest_generate_tests(metafunc):
+            if "parametrized" in metafunc.function.__name__:
+                metafunc.parametrize("author__name", ["Jane Austen", "Mary Shelley"])
+    """)
+    pytester.makepyfile("""
+        from dataclasses import dataclass
+
+        import factory
+
+        from pytest_factoryboy import register
+
+
+        @dataclass
+        class Author:
+            name: str
+
+
+        @register
+        class AuthorFactory(factory.Factory):
+            class Meta:
+                model = Author
+
+            name = "Charles Dickens"
+
+
+        def test_parametrized(author):
+            assert author.name in {"Jane Austen", "Mary Shelley"}
+
+
+        def test_author(author):
+            assert author.name == "Charles Dickens"
+    """)
+    result = pytester.runpytest()
+    assert_outcomes(result, passed=3)
@@ -0,0 +1,113 @@
+"""Test the cached analysis of the factory classes."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import factory
+import pytest
+
+from pytest_factoryboy import invalidate_factory_cache, register
+from pytest_factoryboy.fixture import (
+    Box,
+    get_deps,
+    get_factory_name,
+    get_model_name,
+    get_stripped_factory,
+)
+
+
+@dataclass
+class Author:
+    name: str
+
+
+@dataclass
+class Writer:
+    name: str
+
+
+@dataclass
+class Book:
+    title: str
+    author: Author
+
+
+class AuthorFactory(factory.Factory):
+    class Meta:
+        model = Author
+
+    name = "Charles Dickens"
+    book = factory.RelatedFactory("tests.test_factory_cache.BookFactory", "author")
+
+
+class BookFactory(factory.Factory):
+    class Meta:
+        model = Book
+
+    title = "Great Expectations"
+    author = factory.SubFactory(AuthorFactory)
+
+
+def test_get_deps_cached():
+    """Test that the dependencies are cached per model name and parent, and can't be altered by the callers."""
+    deps = get_deps(BookFactory)
+    assert deps == ["book__title", "book__author"]
+    deps.append("book__edition")
+    assert get_deps(BookFactory) == ["book__title", "book__author"]
+
+    assert get_deps(BookFactory, model_name="novel") == ["novel__title", "novel__author"]
+    # The sub-factory of the parent is not a dependency.
+    assert get_deps(BookFactory, AuthorFactory) == ["book__title"]
+
+
+def test_invalidate_factory_cache():
+    """Test that the invalidation of a factory class drops its names and its stripped subclass."""
+
+    class PenFactory(factory.Factory):
+        class Meta:
+            model = Author
+
+        name = "Charles Dickens"
+
+        @factory.post_generation
+        def signature(obj, create, extracted, **kwargs):
+            pass
+
+    assert get_model_name(PenFactory) == "author"
+    assert get_factory_name(PenFactory) == "pen_factory"
+    stripped = get_stripped_factory(PenFactory)
+    assert get_stripped_factory(PenFactory) is stripped
+
+    PenFactory._meta.model = Writer
+    assert get_model_name(PenFactory) == "author"
+
+    invalidate_factory_cache(PenFactory)
+    assert get_model_name(PenFactory) == "writer"
+    assert get_stripped_factory(PenFactory) is not stripped
+
+    fixtures: dict[str, object] = {}
+    register(PenFactory, _caller_locals=Box(fixtures))
+    assert {"writer", "writer__name", "writer__signature", "pen_factory"} <= set(fixtures)
+
+
+def test_invalidate_all():
+    """Test the invalidation of all the factory classes."""
+    stripped = get_stripped_factory(BookFactory)
+    get_model_name(BookFactory)
+
+    invalidate_factory_cache()
+    assert get_stripped_factory(BookFactory) is not stripped
+    assert get_model_name(BookFactory) == "book"
+
+
+def test_get_model_name_warns_every_time():
+    """Test that the model names of the common containers are not cached, so that the warning is always issued."""
+
+    class PayloadFactory(factory.Factory):
+        class Meta:
+            model = dict
+
+    for _ in range(2):
+        with pytest.warns(UserWarning, match="is discouraged"):
+            assert get_model_name(PayloadFactory) == "dict"
@@ -211,3 +211,23 @@ class TestLazyFixture:
 
         """
         assert another_book.author.name == "Another Author"
+
+
+class TestOverriddenFactoryFixture:
+    @pytest.fixture
+    def author_factory(self) -> type[AuthorFactory]:
+        class OverriddenAuthorFactory(AuthorFactory):
+            @classmethod
+            def _create(cls, model_class: type[Author], *args: object, **kwargs: object) -> Author:
+                author = super()._create(model_class, *args, **kwargs)
+                author.name = author.name.upper()
+                return author
+
+        return OverriddenAuthorFactory
+
+    @pytest.mark.parametrize("author__register_user", ["admin"])
+    def test_model_uses_overridden_factory(self, author: Author):
+        """Test that the model fixture builds the instance using the overridden factory fixture."""
+        assert author.name == "CHARLES DICKENS"
+        assert author.user
+        assert author.user.username == "admin"
@@ -0,0 +1,316 @@
+"""Test the attribute overrides of the factory marker, and the registration without attribute fixtures."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import factory
+import pytest
+from _pytest.fixtures import FixtureLookupError
+
+from pytest_factoryboy import LazyFixture, register
+from tests.compat import assert_outcomes
+
+
+@dataclass
+class Author:
+    name: str
+    country: str
+    tags: list[str] = field(default_factory=list)
+
+
+@dataclass
+class Book:
+    title: str
+    edition: int
+    author: Author
+
+
+@dataclass
+class Publisher:
+    name: str
+    book: Book
+
+
+class AuthorFactory(factory.Factory):
+    class Meta:
+        model = Author
+
+    name = "Charles Dickens"
+    country = "England"
+
+    @factory.post_generation
+    def tags(obj, create, extracted, **kwargs):
+        obj.tags = extracted or (["satirist"] if kwargs["satirist"] else ["novelist"])
+
+    tags__satirist = False
+
+
+class BookFactory(factory.Factory):
+    class Meta:
+        model = Book
+
+    title = "Bleak House"
+    edition = 1
+    author = factory.SubFactory(AuthorFactory)
+
+
+class PublisherFactory(factory.Factory):
+    class Meta:
+        model = Publisher
+
+    name = "Chapman & Hall"
+    book = factory.SubFactory(BookFactory)
+
+
+register(AuthorFactory)
+register(BookFactory, _attr_fixtures=False)
+register(BookFactory, "reprint", _attr_fixtures=False, edition=LazyFixture("reprint_edition"))
+register(PublisherFactory)
+
+pytestmark = pytest.mark.factory("author", country="United Kingdom")
+
+
+@pytest.fixture
+def reprint_edition() -> int:
+    return 2
+
+
+@pytest.fixture
+def other_author() -> Author:
+    return Author(name="Wilkie Collins", country="England")
+
+
+def test_module_marker(author: Author):
+    """Test that the marker of the module overrides the attributes."""
+    assert author.country == "United Kingdom"
+
+
+@pytest.mark.factory("author", name="Jane Austen")
+def test_marker(author: Author):
+    """Test that the markers of the test and of the module are merged."""
+    assert author.name == "Jane Austen"
+    assert author.country == "United Kingdom"
+
+
+@pytest.mark.factory("author", country="England")
+def test_closest_marker(author: Author):
+    """Test that the closest marker takes precedence."""
+    assert author.country == "England"
+
+
+@pytest.mark.factory("author", name="Jane Austen")
+@pytest.mark.parametrize("author__name", ["Mary Shelley"])
+def test_parametrized(author: Author):
+    """Test that the marker takes precedence over the parametrized attribute fixtures."""
+    assert author.name == "Jane Austen"
+
+
+@pytest.mark.factory("author", tags=["poet"])
+def test_post_generation(author: Author):
+    """Test that the post-generation declarations are overridden."""
+    assert author.tags == ["poet"]
+
+
+@pytest.mark.factory("author", tags__satirist=True)
+def test_post_generation_context(author: Author):
+    """Test that the context of the post-generation declarations is overridden."""
+    assert author.tags == ["satirist"]
+
+
+def test_without_attr_fixtures(request, book: Book):
+    """Test that the model fixtures registered without attribute fixtures are created by the factory."""
+    author = Author(name="Charles Dickens", country="England", tags=["novelist"])
+    assert book == Book(title="Bleak House", edition=1, author=author)
+    assert "book__title" not in request.fixturenames
+    with pytest.raises(FixtureLookupError):
+        request.getfixturevalue("book__title")
+
+
+@pytest.mark.factory("book", title="Hard Times", author=LazyFixture("other_author"))
+def test_without_attr_fixtures_marker(book: Book, other_author: Author):
+    """Test that the marker overrides the attributes of the model fixtures without attribute fixtures."""
+    assert book.title == "Hard Times"
+    assert book.author is other_author
+
+
+@pytest.mark.factory("book", author__name="Mary Shelley", author__tags=["gothic"])
+def test_without_attr_fixtures_sub_factory(book: Book):
+    """Test that the marker overrides the declarations of the sub-factories, evaluated by the factory."""
+    assert book.author.name == "Mary Shelley"
+    assert book.author.tags == ["gothic"]
+
+
+@pytest.mark.factory("reprint", title="Hard Times")
+def test_without_attr_fixtures_registration(reprint: Book):
+    """Test that the attributes overridden at registration are used, after the marker ones."""
+    assert reprint.title == "Hard Times"
+    assert reprint.edition == 2
+
+
+def test_sub_factory_without_attr_fixtures(request, publisher: Publisher):
+    """Test a sub-factory registered without attribute fixtures."""
+    assert publisher.book.title == "Bleak House"
+    assert publisher.book is request.getfixturevalue("book")
+
+
+def test_related_factory(pytester: pytest.Pytester):
+    """Test that the related factories can't be overridden with the marker."""
+    pytester.makepyfile("""
+        from dataclasses import dataclass
+
+        import factory
+        import pytest
+
+        from pytest_factoryboy import register
+
+
+        @dataclass
+        class Author:
+            name: str
+
+
+        @dataclass
+        class Book:
+            author: Author
+
+
+        class BookFactory(factory.Factory):
+            class Meta:
+                model = Book
+
+            author = None
+
+
+        @register
+        class AuthorFactory(factory.Factory):
+            class Meta:
+                model = Author
+
+            name = "Charles Dickens"
+            book = factory.RelatedFactory(BookFactory, factory_related_name="author")
+
+
+        register(BookFactory)
+
+
+        @pytest.mark.factory("author", book=None)
+        def test_author(author):
+            pass
+    """)
+    result = pytester.runpytest()
+    assert_outcomes(result, errors=1)
+    result.stdout.fnmatch_lines(["*Can't override the related factory 'author__book' with the factory marker*"])
+
+
+def test_unknown_model(pytester: pytest.Pytester):
+    """Test that the markers overriding an unknown model fixture are reported."""
+    pytester.makepyfile("""
+        from dataclasses import dataclass
+
+        import factory
+        import pytest
+
+        from pytest_factoryboy import register
+
+
+        @dataclass
+        class Book:
+            title: str
+
+
+        @register
+        class BookFactory(factory.Factory):
+            class Meta:
+                model = Book
+
+            title = "Bleak House"
+
+
+        @pytest.mark.factory("bok", title="Hard Times")
+        def test_typo(book):
+            pass
+
+
+        @pytest.mark.factory("book_factory", title="Hard Times")
+        def test_factory_fixture(book):
+            pass
+
+
+        @pytest.mark.factory("book", title="Hard Times")
+        def test_book(book):
+            assert book.title == "Hard Times"
+    """)
+    result = pytester.runpytest()
+    assert_outcomes(result, passed=1, errors=2)
+    result.stdout.fnmatch_lines(
+        [
+            "*UsageError: The factory marker overrides 'bok', which is not a model fixture.",
+            "*UsageError: The factory marker overrides 'book_factory', which is not a model fixture.",
+        ]
+    )
+
+
+def test_sub_factory_override(pytester: pytest.Pytester):
+    """Test that the marker still sets up the overridden sub-factory, unlike the parametrized attribute fixture."""
+    pytester.makepyfile("""
+        from dataclasses import dataclass
+
+        import factory
+        import pytest
+
+        from pytest_factoryboy import LazyFixture, register
+
+        created = []
+
+
+        @dataclass
+        class Author:
+            name: str
+
+            def __post_init__(self):
+                created.append(self.name)
+
+
+        @dataclass
+        class Book:
+            author: Author
+
+
+        @register
+        class AuthorFactory(factory.Factory):
+            class Meta:
+                model = Author
+
+            name = "Charles Dickens"
+
+
+        register(AuthorFactory, "other_author", name="Jane Austen")
+
+
+        @register
+        class BookFactory(factory.Factory):
+            class Meta:
+                model = Book
+
+            author = factory.SubFactory(AuthorFactory)
+
+
+        @pytest.fixture(autouse=True)
+        def reset_created():
+            created.clear()
+
+
+        @pytest.mark.factory("book", author=LazyFixture("other_author"))
+        def test_marker(book):
+            assert book.author.name == "Jane Austen"
+            assert created == ["Charles Dickens", "Jane Austen"]
+
+
+        @pytest.mark.parametrize("book__author", [LazyFixture("other_author")])
+        def test_parametrized(book):
+            assert book.author.name == "Jane Austen"
+            assert created == ["Jane Austen"]
+    """)
+    result = pytester.runpytest()
+    assert_outcomes(result, passed=2)
@@ -0,0 +1,54 @@
+"""Test the generated fixture functions."""
+
+from __future__ import annotations
+
+import functools
+import inspect
+
+from _pytest.compat import getfuncargnames
+
+from pytest_factoryboy.fixturegen import create_fixture
+
+
+def get_book(request: object, title: str, *, edition: int = 1, publisher: str) -> tuple[object, ...]:
+    return request, title, edition, publisher
+
+
+def test_signature():
+    """Test that the dependencies are added to the signature, once, after the arguments of the function."""
+    _, fn = create_fixture(
+        name="book",
+        function=functools.partial(get_book, publisher="Chapman & Hall"),
+        dependencies=["book__author", "title", "book__author"],
+    )
+    assert getfuncargnames(fn, name="book") == ("request", "title", "book__author")
+    assert str(inspect.signature(fn)) == "(request, title, *, book__author)"
+
+
+def test_forward_arguments():
+    """Test that only the arguments of the function are forwarded, with the ones bound by the partial."""
+    _, fn = create_fixture(
+        name="book",
+        function=functools.partial(get_book, publisher="Chapman & Hall", edition=2),
+        dependencies=["book__author"],
+    )
+    assert fn(request="request", title="Bleak House", book__author="Charles Dickens") == (
+        "request",
+        "Bleak House",
+        2,
+        "Chapman & Hall",
+    )
+
+
+def test_positional_partial():
+    """Test a function with positional arguments bound by the partial."""
+    _, fn = create_fixture(name="book", function=functools.partial(get_book, "request", publisher="Chapman & Hall"))
+    assert getfuncargnames(fn, name="book") == ("title",)
+    assert fn(title="Bleak House") == ("request", "Bleak House", 1, "Chapman & Hall")
+
+
+def test_unwrap():
+    """Test that the fixture function unwraps to the partial, for the fixture location and the graph."""
+    function = functools.partial(get_book, publisher="Chapman & Hall")
+    _, fn = create_fixture(name="book", function=function)
+    assert inspect.unwrap(fn) is function
@@ -0,0 +1,191 @@
+"""Test the dependency graph of the generated fixtures."""
+
+from __future__ import annotations
+
+import json
+import sys
+
+import pytest
+
+import pytest_factoryboy
+
+MODELS = """
+from dataclasses import dataclass, field
+
+import factory
+import pytest
+
+from pytest_factoryboy import LazyFixture, register
+
+
+@dataclass
+class Author:
+    name: str
+    books: list = field(default_factory=list)
+
+
+@dataclass
+class Book:
+    title: str
+    author: Author
+
+    def __post_init__(self):
+        self.author.books.append(self)
+
+
+class AuthorFactory(factory.Factory):
+    class Meta:
+        model = Author
+
+    name = LazyFixture("author_name")
+    book = factory.RelatedFactory("test_graph.BookFactory", "author")
+
+
+class BookFactory(factory.Factory):
+    class Meta:
+        model = Book
+
+    title = "Bleak House"
+    author = factory.SubFactory(AuthorFactory)
+
+
+register(AuthorFactory)
+register(BookFactory, _batch_size=2)
+
+
+@pytest.fixture
+def author_name():
+    return "Charles Dickens"
+
+
+def test_book(book):
+    pass
+"""
+
+
+def test_graph_json(pytester: pytest.Pytester):
+    """Test the fixtures, the dependencies and the closure sizes of the JSON graph."""
+    pytester.makepyfile(test_graph=MODELS)
+    result = pytester.runpytest("--factoryboy-graph=graph/fixtures.json", "--collect-only")
+    assert result.ret == 0
+
+    graph = json.loads((pytester.path / "graph/fixtures.json").read_text())
+    fixtures = {fixture["name"]: fixture for fixture in graph["fixtures"]}
+    assert {name: fixture["kind"] for name, fixture in fixtures.items()} == {
+        "author": "model",
+        "author__book": "related",
+        "author__name": "attr",
+        "author_factory": "factory",
+        "book": "model",
+        "book__author": "subfactory",
+        "book__title": "attr",
+        "book_batch": "batch",
+        "book_batch__size": "attr",
+        "book_factory": "factory",
+    }
+
+    author = fixtures["author"]
+    assert author["id"] == "test_graph.py::author"
+    assert author["factory"] == "test_graph.AuthorFactory"
+    assert author["scope"] == "function"
+    assert author["dependencies"] == ["author__name"]
+    assert set(author["related"]) == {"book", "author__book"}
+    assert fixtures["author__name"]["dependencies"] == ["author_name"]
+
+    models = {model["name"]: model for model in graph["models"]}
+    # author__name, author_name, and the related book, author__book, book__title, book__author and author.
+    assert models["author"]["closure_size"] == 7
+    assert models["book_batch"]["fan_out"] == len(fixtures["book_batch"]["dependencies"])
+    assert graph["summary"]["fixtures"] == 10
+    assert graph["summary"]["max_closure_size"] == max(model["closure_size"] for model in graph["models"])
+
+
+def test_graph_reimported(pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch):
+    """Test the graph of in-process runs importing the fixture module again, like the first import of a session."""
+    module = sys.modules.get("pytest_factoryboy.fixture")
+    if module is not None:
+        monkeypatch.setattr(pytest_factoryboy, "fixture", module)
+    monkeypatch.delitem(sys.modules, "pytest_factoryboy.fixture", raising=False)
+    pytester.makepyfile(test_graph=MODELS)
+
+    for _ in range(2):
+        # pytester drops the modules imported by each run, so that the fixture module is imported again.
+        result = pytester.runpytest_inprocess("--factoryboy-graph=fixtures.json", "--collect-only")
+        assert result.ret == 0
+        graph = json.loads((pytester.path / "fixtures.json").read_text())
+        kinds = {fixture["name"]: fixture["kind"] for fixture in graph["fixtures"]}
+        assert kinds["author"] == "model"
+        assert kinds["book__author"] == "subfactory"
+
+
+def test_graph_dot(pytester: pytest.Pytester):
+    """Test the DOT graph, with the related fixtures as dashed edges."""
+    pytester.makepyfile(test_graph=MODELS)
+    result = pytester.runpytest("--factoryboy-graph=fixtures.dot")
+    result.assert_outcomes(passed=1)
+
+    dot = (pytester.path / "fixtures.dot").read_text().splitlines()
+    assert dot[0] == "digraph factoryboy {"
+    assert '    "test_graph.py::author" [label="author (model)"];' in dot
+    assert '    "test_graph.py::author__name" -> "test_graph.py::author_name";' in dot
+    assert '    "test_graph.py::author" -> "test_graph.py::book" [style=dashed];' in dot
+
+
+def test_graph_disabled(pytester: pytest.Pytester):
+    """Test that no graph is written without the option."""
+    pytester.makepyfile(test_graph=MODELS)
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=1)
+    assert not list(pytester.path.glob("*.json"))
+
+
+def test_graph_async(pytester: pytest.Pytester):
+    """Test the kinds of the fixtures of the async factories."""
+    pytester.makepyfile(test_graph="""
+        from dataclasses import dataclass
+
+        import factory
+
+        from pytest_factoryboy import register
+
+
+        @dataclass
+        class Author:
+            name: str
+
+
+        @dataclass
+        class Book:
+            title: str
+            author: Author
+
+
+        @register
+        class AuthorFactory(factory.Factory):
+            class Meta:
+                model = Author
+
+            name = "Charles Dickens"
+
+            @classmethod
+            async def _create(cls, model_class, *args, **kwargs):
+                return model_class(*args, **kwargs)
+
+
+        @register
+        class BookFactory(factory.Factory):
+            class Meta:
+                model = Book
+
+            title = "Bleak House"
+            author = factory.SubFactory(AuthorFactory)
+    """)
+    result = pytester.runpytest("--factoryboy-graph=fixtures.json", "--collect-only")
+    assert result.ret == pytest.ExitCode.NO_TESTS_COLLECTED
+
+    graph = json.loads((pytester.path / "fixtures.json").read_text())
+    fixtures = {fixture["name"]: fixture for fixture in graph["fixtures"]}
+    assert fixtures["book"]["kind"] == "model"
+    assert fixtures["book"]["factory"] == "test_graph.BookFactory"
+    assert fixtures["book__author"]["kind"] == "subfactory"
+    assert fixtures["book__author"]["factory"] == "test_graph.AuthorFactory"
@@ -0,0 +1,226 @@
+"""Test pytest-factoryboy hooks."""
+
+from __future__ import annotations
+
+import pytest
+
+from tests.compat import assert_outcomes
+
+MODELS = """
+from dataclasses import dataclass
+
+import factory
+import pytest
+
+from pytest_factoryboy import register
+
+
+@dataclass
+class Author:
+    name: str
+
+
+@register
+class AuthorFactory(factory.Factory):
+    class Meta:
+        model = Author
+
+    name = "Charles Dickens"
+"""
+
+
+@pytest.fixture
+def done_calls_conftest(pytester: pytest.Pytester) -> None:
+    pytester.makeconftest("""
+        DONE_CALLS = []
+
+
+        def pytest_factoryboy_done(request):
+            DONE_CALLS.append(request.node.name)
+
+
+        def pytest_sessionfinish(session):
+            print("done calls:", ",".join(DONE_CALLS))
+        """)
+
+
+def test_done_only_for_factory_tests(pytester: pytest.Pytester, done_calls_conftest: None):
+    """Test that ``pytest_factoryboy_done`` is called only for the tests that use factory fixtures."""
+    pytester.makepyfile(MODELS + """
+
+def test_model(author):
+    assert author.name == "Charles Dickens"
+
+
+def test_factory(author_factory):
+    assert author_factory is AuthorFactory
+
+
+def test_without_factories(tmp_path):
+    pass
+
+
+def test_factoryboy_request(factoryboy_request):
+    pass
+""")
+    result = pytester.runpytest("-s")
+    assert_outcomes(result, passed=4)
+    result.stdout.fnmatch_lines(["*done calls: test_model,test_factory,test_factoryboy_request"])
+
+
+def test_done_for_dynamically_requested_models(pytester: pytest.Pytester, done_calls_conftest: None):
+    """Test that ``pytest_factoryboy_done`` is called when a model fixture is only requested dynamically."""
+    pytester.makepyfile(MODELS + """
+
+@pytest.fixture
+def dynamic_author(request):
+    return request.getfixturevalue("author")
+
+
+def test_dynamic(dynamic_author):
+    assert dynamic_author.name == "Charles Dickens"
+""")
+    result = pytester.runpytest("-s")
+    assert_outcomes(result, passed=1)
+    result.stdout.fnmatch_lines(["*done calls: test_dynamic"])
+
+
+LIFECYCLE_MODELS = """
+from dataclasses import dataclass, field
+
+import factory
+import pytest
+
+from pytest_factoryboy import register
+
+
+@dataclass
+class Author:
+    name: str
+    books: list = field(default_factory=list)
+
+
+@dataclass
+class Book:
+    title: str
+    author: Author
+
+    def __post_init__(self):
+        self.author.books.append(self)
+
+
+class AuthorFactory(factory.Factory):
+    class Meta:
+        model = Author
+
+    name = "Charles Dickens"
+    book = factory.RelatedFactory("test_lifecycle.BookFactory", "author")
+
+    @factory.post_generation
+    def tags(obj, create, extracted, **kwargs):
+        return "tagged"
+
+
+class BookFactory(factory.Factory):
+    class Meta:
+        model = Book
+
+    title = "Bleak House"
+    author = factory.SubFactory(AuthorFactory)
+
+
+register(AuthorFactory)
+register(BookFactory)
+"""
+
+
+def test_lifecycle_hooks(pytester: pytest.Pytester):
+    """Test the order and the arguments of the lifecycle hooks."""
+    pytester.makeconftest("""
+        CALLS = []
+
+
+        def pytest_factoryboy_before_create(factory_class, fixture_name, kwargs, strategy):
+            CALLS.append(f"before_create {fixture_name} {factory_class.__name__} {sorted(kwargs)} {strategy}")
+
+
+        def pytest_factoryboy_after_create(fixture_name, instance, elapsed):
+            assert elapsed >= 0
+            CALLS.append(f"after_create {fixture_name} {type(instance).__name__}")
+
+
+        def pytest_factoryboy_before_deferred(function):
+            CALLS.append(f"before_deferred {function.name}")
+
+
+        def pytest_factoryboy_after_deferred(function, result, elapsed):
+            assert elapsed >= 0
+            CALLS.append(f"after_deferred {function.name} {type(result).__name__}")
+
+
+        def pytest_factoryboy_after_postgeneration(factory_class, instance, create, results):
+            CALLS.append(f"after_postgeneration {factory_class.__name__} {create} {sorted(results)}")
+
+
+        def pytest_sessionfinish(session):
+            print("calls:", *CALLS, sep="\\n")
+        """)
+    pytester.makepyfile(test_lifecycle=LIFECYCLE_MODELS + """
+
+def test_author(author):
+    pass
+""")
+    result = pytester.runpytest("-s")
+    assert_outcomes(result, passed=1)
+    result.stdout.fnmatch_lines(
+        [
+            "*calls:",
+            "before_create author AuthorFactory ['name'] create",
+            "after_create author Author",
+            "before_create book BookFactory ['author', 'title'] create",
+            "after_create book Book",
+            "before_deferred author__book",
+            "after_deferred author__book Book",
+            "before_deferred author__tags",
+            "after_deferred author__tags str",
+            "after_postgeneration AuthorFactory True ['book', 'tags']",
+        ]
+    )
+
+
+def test_before_create_cached_instance(pytester: pytest.Pytester):
+    """Test that the instance returned by ``pytest_factoryboy_before_create`` is used as the model fixture value."""
+    pytester.makeconftest("""
+        import pytest
+
+        CACHE = {}
+
+
+        @pytest.hookimpl(tryfirst=True)
+        def pytest_factoryboy_before_create(fixture_name, kwargs):
+            return CACHE.get((fixture_name, tuple(sorted(kwargs.items()))))
+
+
+        def pytest_factoryboy_after_create(fixture_name, kwargs, instance):
+            CACHE[(fixture_name, tuple(sorted(kwargs.items())))] = instance
+        """)
+    pytester.makepyfile(test_lifecycle=MODELS + """
+
+INSTANCES = []
+
+
+def test_first(author):
+    INSTANCES.append(author)
+
+
+def test_second(author):
+    assert author is INSTANCES[0]
+
+
+@pytest.mark.parametrize("author__name", ["Jane Austen"])
+def test_other_kwargs(author):
+    assert author is not INSTANCES[0]
+    assert author.name == "Jane Austen"
+""")
+    result = pytester.runpytest()
+    assert_outcomes(result, passed=3)
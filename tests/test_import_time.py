@@ -0,0 +1,60 @@
+"""Test that the plugin doesn't import factory_boy until a factory is registered."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+from tests.compat import assert_outcomes
+
+#: Modules that must not be imported by loading the plugin.
+HEAVY_MODULES = ("factory", "inflection", "faker")
+
+
+def get_imported_modules(code: str) -> set[str]:
+    """Get the modules imported by running the code in a fresh interpreter, parsed from ``-X importtime``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True
+    )
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or line.endswith("| imported package"):
+            continue
+        modules.add(line.rsplit("|", 1)[1].strip())
+    return modules
+
+
+def get_heavy_modules(modules: set[str]) -> set[str]:
+    return {module for module in modules if module.split(".")[0] in HEAVY_MODULES}
+
+
+@pytest.mark.parametrize("module", ["pytest_factoryboy", "pytest_factoryboy.plugin"])
+def test_import_plugin(module: str):
+    """Test that importing the plugin (or the package) doesn't import factory_boy."""
+    modules = get_imported_modules(f"import {module}")
+    assert module in modules
+    assert get_heavy_modules(modules) == set()
+
+
+def test_import_register():
+    """Test that factory_boy is imported on first access to the registration API."""
+    modules = get_imported_modules("from pytest_factoryboy import register")
+    assert "pytest_factoryboy.fixture" in modules
+    assert "factory" in modules
+
+
+def test_session_without_factories(pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch):
+    """Test that a session that doesn't register any factory doesn't import factory_boy."""
+    monkeypatch.setenv("PYTEST_DISABLE_PLUGIN_AUTOLOAD", "1")
+    pytester.makepyfile("""
+        import sys
+
+
+        def test_factory_boy_not_imported():
+            assert "factory" not in sys.modules
+            assert "inflection" not in sys.modules
+    """)
+    result = pytester.runpytest_subprocess("-p", "pytest_factoryboy.plugin")
+    assert_outcomes(result, passed=1)
@@ -0,0 +1,251 @@
+"""Test the lazy registration of the declaration fixtures."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import factory
+import pytest
+
+from pytest_factoryboy import LazyFixture, register
+from tests.compat import assert_outcomes
+
+
+@dataclass
+class User:
+    username: str
+    password: str | None = None
+    is_active: bool = False
+
+
+@dataclass
+class Author:
+    name: str
+    user: User | None = None
+
+
+@dataclass
+class Book:
+    title: str
+    author: Author
+    editions: list[Edition] = field(default_factory=list)
+
+
+@dataclass
+class Edition:
+    book: Book
+    year: int
+
+    def __post_init__(self) -> None:
+        self.book.editions.append(self)
+
+
+class AuthorFactory(factory.Factory):
+    class Meta:
+        model = Author
+
+    name = LazyFixture("author_name")
+    register_user__password = "qwerty"
+
+    @factory.post_generation
+    def register_user(author: Author, create: bool, username: str | None, **kwargs: object) -> None:
+        author.user = User(username=username or "dickens", **kwargs)
+
+
+class BookFactory(factory.Factory):
+    class Meta:
+        model = Book
+
+    title = "Great Expectations"
+    author = factory.SubFactory(AuthorFactory)
+    edition = factory.RelatedFactory("tests.test_lazy_registration.EditionFactory", "book")
+
+
+class EditionFactory(factory.Factory):
+    class Meta:
+        model = Edition
+
+    book = factory.SubFactory(BookFactory)
+    year = 1861
+
+
+register(AuthorFactory, _lazy=True)
+register(BookFactory, _lazy=True)
+register(EditionFactory, _lazy=True)
+
+
+@pytest.fixture
+def author_name() -> str:
+    return "Charles Dickens"
+
+
+def test_declaration_fixtures_not_created():
+    """Test that only the model and factory fixtures are created at registration."""
+    assert {"author", "author_factory", "book", "book_factory", "edition", "edition_factory"} <= set(globals())
+    assert not {name for name in globals() if "__" in name and not name.startswith("__")}
+
+
+def test_book(book: Book):
+    """Test the model fixture with lazily created declaration fixtures."""
+    assert book.title == "Great Expectations"
+    assert book.author.name == "Charles Dickens"
+    assert book.author.user == User(username="dickens", password="qwerty")
+    assert [edition.year for edition in book.editions] == [1861]
+
+
+def test_declaration_fixtures(book__title: str, author__register_user__password: str, edition__year: int):
+    """Test that the declaration fixtures can be requested by the tests."""
+    assert book__title == "Great Expectations"
+    assert author__register_user__password == "qwerty"
+    assert edition__year == 1861
+
+
+@pytest.mark.parametrize("book__title", ["Bleak House"])
+@pytest.mark.parametrize("author__register_user__password", ["secret"])
+@pytest.mark.parametrize("edition__year", [1853])
+def test_parametrized(book: Book):
+    """Test the parametrization of the lazily created declaration fixtures, including the related ones."""
+    assert book.title == "Bleak House"
+    assert book.author.user == User(username="dickens", password="secret")
+    assert [edition.year for edition in book.editions] == [1853]
+
+
+class TestOverride:
+    @pytest.fixture
+    def author__name(self) -> str:
+        return "Jane Austen"
+
+    def test_overridden(self, author: Author):
+        """Test that a fixture defined in the class overrides the declaration fixture."""
+        assert author.name == "Jane Austen"
+
+
+class TestClassRegistration:
+    register(AuthorFactory, "another_author", _lazy=True, name="Leo Tolstoy")
+
+    def test_class(self, another_author: Author, another_author__name: str):
+        assert another_author.name == another_author__name == "Leo Tolstoy"
+
+
+def test_conftest_registration(pytester: pytest.Pytester):
+    """Test the declaration fixtures of a factory registered lazily in a conftest, used by several modules."""
+    pytester.makeconftest("""
+        from dataclasses import dataclass
+
+        import factory
+
+        from pytest_factoryboy import register
+
+
+        @dataclass
+        class Book:
+            title: str
+            year: int
+
+
+        @register(_lazy=True)
+        class BookFactory(factory.Factory):
+            class Meta:
+                model = Book
+
+            title = "Great Expectations"
+            year = 1861
+        """)
+    pytester.makepyfile(
+        test_first="""
+            import pytest
+
+
+            @pytest.fixture
+            def book__title():
+                return "Bleak House"
+
+
+            def test_overridden(book):
+                assert (book.title, book.year) == ("Bleak House", 1861)
+            """,
+        test_second="""
+            import pytest
+
+
+            def test_book(book):
+                assert (book.title, book.year) == ("Great Expectations", 1861)
+
+
+            @pytest.mark.parametrize("book__year", [1853])
+            def test_parametrized(book, book__title):
+                assert (book.title, book.year) == (book__title, 1853)
+            """,
+    )
+    result = pytester.runpytest()
+    assert_outcomes(result, passed=3)
+
+
+def test_getfixturevalue(pytester: pytest.Pytester):
+    """Test that the declaration fixtures are created for the model fixtures only requested dynamically."""
+    pytester.makepyfile("""
+        from dataclasses import dataclass
+
+        import factory
+        import pytest
+
+        from pytest_factoryboy import LazyFixture, register
+
+
+        @dataclass
+        class Author:
+            name: str
+
+
+        @dataclass
+        class Book:
+            title: str
+            author: Author
+
+
+        @register(_lazy=True)
+        class AuthorFactory(factory.Factory):
+            class Meta:
+                model = Author
+
+            name = LazyFixture("author_name")
+
+
+        @register(_lazy=True)
+        class BookFactory(factory.Factory):
+            class Meta:
+                model = Book
+
+            title = "Great Expectations"
+            author = factory.SubFactory(AuthorFactory)
+
+
+        @pytest.fixture
+        def author_name():
+            return "Charles Dickens"
+
+
+        @pytest.fixture
+        def dynamic_book(request):
+            return request.getfixturevalue("book")
+
+
+        def test_test_body(request):
+            book = request.getfixturevalue("book")
+            assert book.title == "Great Expectations"
+            assert book.author.name == "Charles Dickens"
+
+
+        def test_fixture(dynamic_book):
+            assert dynamic_book.author.name == "Charles Dickens"
+
+
+        def test_not_requested(request, author):
+            # Only the declaration fixtures of the requested model fixtures are created.
+            assert "author__name" in request._fixturemanager._arg2fixturedefs
+            assert "book__title" not in request._fixturemanager._arg2fixturedefs
+        """)
+    result = pytester.runpytest("-k", "test_not_requested")
+    assert_outcomes(result, passed=1)
+    result = pytester.runpytest("-k", "not test_not_requested")
+    assert_outcomes(result, passed=2)
@@ -11,6 +11,8 @@ import pytest
 from factory.declarations import NotProvided
 
 from pytest_factoryboy import register
+from pytest_factoryboy.fixture import DeferredFunction
+from pytest_factoryboy.plugin import CycleDetected, get_batch_dependencies
 
 if TYPE_CHECKING:
     from pytest_factoryboy.plugin import Request
@@ -228,3 +230,51 @@ class OrderedFactory(factory.Factory):
 def test_ordered(ordered: Ordered):
     """Test post generation are ordered by creation counter."""
     assert ordered.value == "aaa"
+
+
+def test_cycle_reported(request, factoryboy_request: Request):
+    """Test that deferred functions that can't be evaluated are reported by name."""
+
+    def reenter(subrequest: object) -> None:
+        factoryboy_request.finalize(request)
+
+    factoryboy_request.defer(
+        [DeferredFunction(name="ordered__reenter", factory=OrderedFactory, is_related=False, function=reenter)]
+    )
+    with pytest.raises(CycleDetected, match=r"ordered__reenter \(in progress\)"):
+        factoryboy_request.evaluate(request)
+
+
+def make_function(name: str, is_related: bool = False, awaitable: bool = False) -> DeferredFunction[object, object]:
+    return DeferredFunction(
+        name=f"ordered__{name}",
+        factory=OrderedFactory,
+        is_related=is_related,
+        function=lambda request: None,
+        awaitable=awaitable,
+    )
+
+
+@pytest.mark.parametrize(
+    ("executor", "awaitable", "expected"),
+    [
+        # Each function depends on the previous one.
+        (False, False, [[], ["first"], ["related"], ["second"], ["other_related"]]),
+        # The post-generation declarations are submitted in order, the related factories wait for them.
+        (True, False, [[], ["first"], ["first"], ["related", "second"], ["second"]]),
+        # The consecutive related factories of an async model fixture are created concurrently.
+        (False, True, [[], ["first"], ["first"], ["related", "second"], ["other_related"]]),
+    ],
+)
+def test_batch_dependencies(executor: bool, awaitable: bool, expected: list[list[str]]):
+    """Test the dependency edges of the deferred functions of a batch."""
+    functions = [
+        make_function("first"),
+        make_function("related", is_related=True, awaitable=awaitable),
+        make_function("second", is_related=awaitable, awaitable=awaitable),
+        make_function("other_related", is_related=True),
+        make_function("third"),
+    ]
+    names = {function: function.name.split("__", 1)[1] for function in functions}
+    dependencies = get_batch_dependencies(functions, executor)
+    assert [[names[dependency] for dependency in deps] for deps in dependencies] == expected
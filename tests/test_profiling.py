@@ -0,0 +1,97 @@
+"""Test the pytest-factoryboy profiler."""
+
+from __future__ import annotations
+
+import pytest
+
+MODELS = """
+from dataclasses import dataclass, field
+
+import factory
+import pytest
+
+from pytest_factoryboy import LazyFixture, register
+
+
+@dataclass
+class Author:
+    name: str
+    books: list = field(default_factory=list)
+
+
+@dataclass
+class Book:
+    title: str
+    author: Author
+
+    def __post_init__(self):
+        self.author.books.append(self)
+
+
+class AuthorFactory(factory.Factory):
+    class Meta:
+        model = Author
+
+    name = LazyFixture("author_name")
+    book = factory.RelatedFactory("test_profile.BookFactory", "author")
+
+    @factory.post_generation
+    def tags(obj, create, extracted, **kwargs):
+        pass
+
+
+class BookFactory(factory.Factory):
+    class Meta:
+        model = Book
+
+    title = "Bleak House"
+    author = factory.SubFactory(AuthorFactory)
+
+
+register(AuthorFactory)
+register(BookFactory)
+
+
+@pytest.fixture
+def author_name():
+    return "Charles Dickens"
+
+
+def test_author(author):
+    assert author.books
+"""
+
+
+def test_profile(pytester: pytest.Pytester):
+    """Test that the profile lists the factories and the fixtures."""
+    pytester.makepyfile(test_profile=MODELS)
+    result = pytester.runpytest("--factoryboy-profile")
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(
+        [
+            "*pytest-factoryboy profile*",
+            "Slowest factories*",
+            "factory * calls * own (s) * total (s)",
+        ]
+    )
+    result.stdout.re_match_lines_random(
+        [
+            r"AuthorFactory +4 +[\d.]+ +[\d.]+",
+            r"BookFactory +2 +[\d.]+ +[\d.]+",
+            r"author \(model\) +1 ",
+            r"book \(model\) +1 ",
+            r"book__author \(subfactory\) +1 ",
+            r"author__book \(related\) +1 ",
+            r"author__tags \(postgen\) +1 ",
+            r"author__name \(attr\) +1 ",
+            r"author_name \(lazy\) +1 ",
+        ]
+    )
+
+
+def test_profile_disabled(pytester: pytest.Pytester):
+    """Test that nothing is reported without the option."""
+    pytester.makepyfile(test_profile=MODELS)
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=1)
+    result.stdout.no_fnmatch_line("*pytest-factoryboy profile*")
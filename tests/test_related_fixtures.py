@@ -0,0 +1,80 @@
+"""Test related fixtures discovery."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import factory
+import pytest
+
+from pytest_factoryboy import register
+
+
+@dataclass
+class Author:
+    name: str
+    books: list[Book] = field(default_factory=list, init=False)
+
+
+@dataclass
+class Book:
+    title: str
+    author: Author
+    reviews: list[Review] = field(default_factory=list, init=False)
+
+    def __post_init__(self) -> None:
+        self.author.books.append(self)
+
+
+@dataclass
+class Review:
+    rating: int
+    book: Book
+
+    def __post_init__(self) -> None:
+        self.book.reviews.append(self)
+
+
+class AuthorFactory(factory.Factory):
+    class Meta:
+        model = Author
+
+    name = "Charles Dickens"
+    book = factory.RelatedFactory("tests.test_related_fixtures.BookFactory", "author")
+
+
+class BookFactory(factory.Factory):
+    class Meta:
+        model = Book
+
+    title = "Great Expectations"
+    author = factory.SubFactory(AuthorFactory)
+    review = factory.RelatedFactory("tests.test_related_fixtures.ReviewFactory", "book")
+
+
+class ReviewFactory(factory.Factory):
+    class Meta:
+        model = Review
+
+    rating = 3
+    book = factory.SubFactory(BookFactory)
+
+
+register(AuthorFactory)
+register(AuthorFactory, "second_author")
+register(BookFactory)
+register(ReviewFactory)
+
+
+@pytest.mark.parametrize("review__rating", [5])
+def test_transitive_related_parametrization(author: Author):
+    """Test that attributes of the related fixtures of related fixtures can be parametrized."""
+    [book] = author.books
+    [review] = book.reviews
+    assert review.rating == 5
+
+
+def test_related_fixtures_deduplicated(request, author: Author, second_author: Author):
+    """Test that related fixtures shared by several model fixtures are added to the closure only once."""
+    assert "book__review" in request.fixturenames
+    assert len(request.fixturenames) == len(set(request.fixturenames))
@@ -0,0 +1,122 @@
+"""Test the factory usage report."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+MODELS = """
+from dataclasses import dataclass, field
+
+import factory
+import pytest
+
+from pytest_factoryboy import register
+
+
+@dataclass
+class Author:
+    name: str
+    books: list = field(default_factory=list)
+
+
+@dataclass
+class Book:
+    title: str
+    author: Author
+
+    def __post_init__(self):
+        self.author.books.append(self)
+
+
+class AuthorFactory(factory.Factory):
+    class Meta:
+        model = Author
+
+    name = "Charles Dickens"
+    book = factory.RelatedFactory("test_report.BookFactory", "author")
+
+    @factory.post_generation
+    def tags(obj, create, extracted, **kwargs):
+        pass
+
+
+class BookFactory(factory.Factory):
+    class Meta:
+        model = Book
+
+    title = "Bleak House"
+    author = factory.SubFactory(AuthorFactory)
+
+
+register(AuthorFactory, _batch_size=3)
+register(BookFactory)
+
+
+def test_author(author):
+    assert author.books
+
+
+def test_batch(author_batch):
+    pass
+
+
+def test_without_factories():
+    pass
+"""
+
+
+def test_report(pytester: pytest.Pytester):
+    """Test the JSON report."""
+    pytester.makepyfile(test_report=MODELS)
+    result = pytester.runpytest("--factoryboy-report=reports/factories.json")
+    result.assert_outcomes(passed=3)
+
+    entries = {entry["nodeid"]: entry for entry in json.loads((pytester.path / "reports/factories.json").read_text())}
+    assert set(entries) == {
+        "test_report.py::test_author",
+        "test_report.py::test_batch",
+        "test_report.py::test_without_factories",
+    }
+
+    author = entries["test_report.py::test_author"]
+    assert {name: usage["count"] for name, usage in author["instances"].items()} == {
+        "test_report.AuthorFactory": 1,
+        "test_report.BookFactory": 1,
+    }
+    assert author["total_instances"] == 2
+    assert author["postgen"]["count"] == 1
+    assert author["related"]["count"] == 1
+    assert author["fixtures"] == {"author": 1, "book": 1}
+
+    batch = entries["test_report.py::test_batch"]
+    assert batch["instances"]["test_report.AuthorFactory"]["count"] == 3
+    # Related factories of batch instances are called by factory_boy, as post-generation declarations.
+    assert batch["postgen"]["count"] == 6
+    assert batch["related"]["count"] == 0
+
+    assert entries["test_report.py::test_without_factories"]["total_instances"] == 0
+
+
+def test_report_jsonl(pytester: pytest.Pytester):
+    """Test the JSON lines report."""
+    pytester.makepyfile(test_report=MODELS)
+    result = pytester.runpytest("--factoryboy-report=factories.jsonl", "-k", "test_author")
+    result.assert_outcomes(passed=1, deselected=2)
+
+    lines = (pytester.path / "factories.jsonl").read_text().splitlines()
+    assert [json.loads(line)["nodeid"] for line in lines] == ["test_report.py::test_author"]
+
+
+def test_report_serialized(pytester: pytest.Pytester):
+    """Test that the usage survives the report serialization of xdist workers."""
+    pytester.makepyfile(test_report=MODELS)
+    reprec = pytester.inline_run("--factoryboy-report=factories.json", "-k", "test_author")
+    (report,) = (report for report in reprec.getreports("pytest_runtest_logreport") if report.when == "teardown")
+    config = pytester.parseconfigure()
+
+    data = config.hook.pytest_report_to_serializable(config=config, report=report)
+    data = json.loads(json.dumps(data))
+    restored = config.hook.pytest_report_from_serializable(config=config, data=data)
+    assert restored.factoryboy_usage["total_instances"] == 2
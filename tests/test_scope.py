@@ -0,0 +1,201 @@
+"""Test the scope of the generated fixtures."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+
+import factory
+import pytest
+
+from pytest_factoryboy import register
+
+
+@dataclass
+class Country:
+    name: str
+    cities: list[City] = field(default_factory=list)
+    currency: str | None = None
+    after_postgeneration_calls: int = 0
+
+
+@dataclass
+class City:
+    name: str
+    country: Country
+
+    def __post_init__(self) -> None:
+        self.country.cities.append(self)
+
+
+created: list[str] = []
+
+
+class CountryFactory(factory.Factory):
+    class Meta:
+        model = Country
+
+    name = "France"
+    capital = factory.RelatedFactory("tests.test_scope.CityFactory", "country")
+
+    @factory.post_generation
+    def currency(obj: Country, create: bool, extracted: str | None, **kwargs: object) -> None:
+        obj.currency = extracted or "EUR"
+
+    @classmethod
+    def _create(cls, model_class: type[Country], **kwargs: object) -> Country:
+        created.append(cls.__name__)
+        return super()._create(model_class, **kwargs)
+
+    @classmethod
+    def _after_postgeneration(cls, obj: Country, create: bool, results: Mapping[str, object] | None = None) -> None:
+        obj.after_postgeneration_calls += 1
+
+
+class CityFactory(factory.Factory):
+    class Meta:
+        model = City
+
+    name = "Paris"
+    country = factory.SubFactory(CountryFactory)
+
+
+register(CountryFactory, _scope="module")
+register(CityFactory, _scope="module")
+
+
+def test_scoped_model(country: Country, city: City):
+    """Test the post-generation declarations of a scoped model fixture."""
+    assert country.currency == "EUR"
+    assert country.cities == [city]
+    assert city.country is country
+    assert country.after_postgeneration_calls == 1
+
+
+def test_scoped_model_reused(country: Country, country_factory: type[CountryFactory]):
+    """Test that the scoped model fixture is created once per module."""
+    assert country_factory is CountryFactory
+    assert len(created) == 1
+    assert country.after_postgeneration_calls == 1
+
+
+def test_invalid_scope():
+    """Test that unknown scopes are rejected."""
+    with pytest.raises(AssertionError, match="Unknown scope 'test'"):
+        register(CountryFactory, "other_country", _scope="test")  # type: ignore[arg-type]
+
+
+MODELS = """
+from dataclasses import dataclass
+
+import factory
+import pytest
+
+from pytest_factoryboy import register
+
+
+@dataclass
+class Author:
+    name: str
+
+
+@dataclass
+class Book:
+    title: str
+    author: Author
+
+
+class AuthorFactory(factory.Factory):
+    class Meta:
+        model = Author
+
+    name = "Charles Dickens"
+
+
+class BookFactory(factory.Factory):
+    class Meta:
+        model = Book
+
+    title = "Bleak House"
+    author = factory.SubFactory(AuthorFactory)
+"""
+
+
+def test_narrower_override(pytester: pytest.Pytester):
+    """Test that overriding an attribute of a scoped model with a narrower fixture is an error."""
+    pytester.makepyfile(MODELS + """
+register(AuthorFactory, _scope="session")
+
+
+@pytest.fixture
+def author__name():
+    return "Jane Austen"
+
+
+def test_author(author):
+    pass
+""")
+    result = pytester.runpytest()
+    result.stdout.fnmatch_lines(
+        "*FixtureScopeMismatch: The session-scoped fixture 'author' depends on 'author__name', "
+        "which has a narrower scope (function)*"
+    )
+
+
+def test_narrower_subfactory(pytester: pytest.Pytester):
+    """Test that a scoped model can't depend on a function-scoped model fixture."""
+    pytester.makepyfile(MODELS + """
+register(AuthorFactory)
+register(BookFactory, _scope="module")
+
+
+def test_book(book):
+    pass
+""")
+    result = pytester.runpytest()
+    result.stdout.fnmatch_lines(
+        "*FixtureScopeMismatch: The module-scoped fixture 'book__author' depends on 'author__name', "
+        "which has a narrower scope (function)*"
+    )
+
+
+def test_parametrized_attribute(pytester: pytest.Pytester):
+    """Test that parametrizing an attribute of a scoped model is an error."""
+    pytester.makepyfile(MODELS + """
+register(AuthorFactory, _scope="module")
+
+
+def test_author(author):
+    pass
+
+
+@pytest.mark.parametrize("author__name", ["Jane Austen"], scope="module")
+def test_parametrized(author):
+    pass
+""")
+    result = pytester.runpytest()
+    result.stdout.fnmatch_lines(
+        "*FixtureScopeMismatch: The module-scoped fixture 'author' depends on 'author__name', "
+        "which is parametrized for test_parametrized_attribute.py::test_parametrized*"
+    )
+
+
+def test_same_scope_override(pytester: pytest.Pytester):
+    """Test that an attribute of a scoped model can be overridden with a fixture of the same scope."""
+    pytester.makeconftest(MODELS + """
+register(AuthorFactory, _scope="module")
+""")
+    pytester.makepyfile("""
+import pytest
+
+
+@pytest.fixture(scope="module")
+def author__name():
+    return "Jane Austen"
+
+
+def test_author(author):
+    assert author.name == "Jane Austen"
+""")
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=1)
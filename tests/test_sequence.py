@@ -0,0 +1,50 @@
+"""Test factory sequences of model fixtures."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import factory
+import pytest
+
+from pytest_factoryboy import register
+from pytest_factoryboy.fixture import STRIPPED_FACTORY_ATTR
+
+
+@dataclass
+class Ticket:
+    number: int
+
+
+@register
+class TicketFactory(factory.Factory):
+    class Meta:
+        model = Ticket
+
+    number = factory.Sequence(lambda n: n)
+
+
+register(TicketFactory, "other_ticket")
+
+seen_numbers: list[int] = []
+
+
+@pytest.mark.parametrize("run", range(3))
+def test_sequence_advances(ticket: Ticket, other_ticket: Ticket, run: int):
+    """Test that sequences advance across model fixture invocations reusing the same factory subclass."""
+    assert ticket.number != other_ticket.number
+    assert all(number < ticket.number for number in seen_numbers)
+    seen_numbers.extend((ticket.number, other_ticket.number))
+
+    # The direct factory usage shares the sequence counter with the model fixtures
+    assert TicketFactory().number > max(ticket.number, other_ticket.number)
+
+
+def test_stripped_factory_reused(request):
+    """Test that the factory subclass without post-generation declarations is created only once."""
+    request.getfixturevalue("ticket")
+    stripped = TicketFactory.__dict__[STRIPPED_FACTORY_ATTR]
+    assert issubclass(stripped, TicketFactory)
+
+    request.getfixturevalue("other_ticket")
+    assert TicketFactory.__dict__[STRIPPED_FACTORY_ATTR] is stripped
@@ -0,0 +1,120 @@
+"""Test the factory_boy strategy of model fixtures."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+
+import factory
+import pytest
+
+from pytest_factoryboy import register
+
+
+@dataclass
+class Author:
+    name: str
+    created: bool = False
+
+
+@dataclass
+class Book:
+    title: str
+    author: Author
+    created: bool = False
+    editions: list[Edition] = field(default_factory=list)
+    postgen_create: bool | None = None
+    after_postgeneration_create: bool | None = None
+
+
+@dataclass
+class Edition:
+    book: Book
+    created: bool = False
+
+    def __post_init__(self) -> None:
+        self.book.editions.append(self)
+
+
+class CreateTrackingFactory(factory.Factory):
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def _create(cls, model_class: type, *args: object, **kwargs: object) -> object:
+        return model_class(*args, created=True, **kwargs)
+
+
+class AuthorFactory(CreateTrackingFactory):
+    class Meta:
+        model = Author
+
+    name = "Charles Dickens"
+
+
+class BookFactory(CreateTrackingFactory):
+    class Meta:
+        model = Book
+
+    title = "Great Expectations"
+    author = factory.SubFactory(AuthorFactory)
+    edition = factory.RelatedFactory("tests.test_strategy.EditionFactory", "book")
+
+    @factory.post_generation
+    def track(obj: Book, create: bool, extracted: object, **kwargs: object) -> None:
+        obj.postgen_create = create
+
+    @classmethod
+    def _after_postgeneration(cls, obj: Book, create: bool, results: Mapping[str, object] | None = None) -> None:
+        obj.after_postgeneration_create = create
+
+
+class EditionFactory(CreateTrackingFactory):
+    class Meta:
+        model = Edition
+
+    book = factory.SubFactory(BookFactory)
+
+
+register(AuthorFactory)
+register(BookFactory)
+register(EditionFactory)
+register(BookFactory, "built_book", _strategy="build")
+
+
+def assert_strategy(book: Book, edition: Edition, created: bool) -> None:
+    assert book.created is created
+    assert book.author.created is created
+    assert edition.created is created
+    assert edition.book.created is created
+    assert book.postgen_create is created
+    assert book.after_postgeneration_create is created
+
+
+def test_create_by_default(book: Book, edition: Edition):
+    """Test that model fixtures use the create strategy by default."""
+    assert_strategy(book, edition, created=True)
+    assert edition.book is book
+
+
+def test_registered_build_strategy(built_book: Book, edition: Edition):
+    """Test that the registered strategy applies to the model fixture and to its sub-factory and related fixtures."""
+    assert_strategy(built_book, edition, created=False)
+
+
+@pytest.mark.factoryboy_strategy("build")
+def test_marker_build_strategy(book: Book, edition: Edition):
+    """Test that the marker switches the strategy of all the model fixtures of the test."""
+    assert_strategy(book, edition, created=False)
+
+
+@pytest.mark.factoryboy_strategy("create")
+def test_marker_overrides_registered_strategy(built_book: Book, edition: Edition):
+    """Test that the marker has the precedence over the strategy given at registration."""
+    assert_strategy(built_book, edition, created=True)
+
+
+def test_invalid_strategy():
+    """Test that only the build and create strategies are accepted."""
+    with pytest.raises(AssertionError, match="Unknown strategy 'stub'"):
+        register(AuthorFactory, "stub_author", _strategy="stub")
@@ -0,0 +1,71 @@
+"""Test creating instances of the same factory concurrently."""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import factory
+
+from pytest_factoryboy.fixture import get_stripped_factory
+
+THREADS = 16
+INSTANCES = 200
+
+
+@dataclass
+class Author:
+    name: str
+
+
+def make_factory(calls: Counter[str]) -> type[factory.Factory]:
+    lock = threading.Lock()
+
+    class AuthorFactory(factory.Factory):
+        class Meta:
+            model = Author
+
+        name = factory.Sequence(lambda n: f"Author {n}")
+
+        @factory.post_generation
+        def books(obj, create, extracted, **kwargs):
+            pass
+
+        @classmethod
+        def _after_postgeneration(cls, instance, create, results=None):
+            with lock:
+                calls[instance.name] += 1
+
+    return AuthorFactory
+
+
+def test_concurrent_instances():
+    """Test that the stripped factory never calls ``_after_postgeneration``, while the factory always does."""
+    calls: Counter[str] = Counter()
+    AuthorFactory = make_factory(calls)
+    barrier = threading.Barrier(THREADS)
+
+    def create(index: int) -> list[Author]:
+        barrier.wait()
+        authors = []
+        for i in range(INSTANCES):
+            # The model fixtures interleaved with plain factory calls.
+            if i % 2:
+                authors.append(get_stripped_factory(AuthorFactory).build())
+            else:
+                authors.append(AuthorFactory.build())
+        return authors
+
+    with ThreadPoolExecutor(THREADS) as executor:
+        authors = [author for result in executor.map(create, range(THREADS)) for author in result]
+
+    assert len(authors) == THREADS * INSTANCES
+    assert sum(calls.values()) == THREADS * INSTANCES // 2
+
+    # Neither the factory nor its stripped subclass are left patched.
+    AuthorFactory.build(name="Charles Dickens")
+    assert calls["Charles Dickens"] == 1
+    get_stripped_factory(AuthorFactory).build(name="Wilkie Collins")
+    assert "Wilkie Collins" not in calls
@@ -0,0 +1,206 @@
+"""Test the evaluation of the deferred post-generation declarations in a thread pool (``--factoryboy-workers``)."""
+
+from __future__ import annotations
+
+import pytest
+
+from tests.compat import assert_outcomes
+
+MODELS = """
+import threading
+from dataclasses import dataclass, field
+
+import factory
+import pytest
+
+from pytest_factoryboy import register
+
+# Only passed when the post-generation declarations of the author are evaluated concurrently.
+barrier = threading.Barrier(3, timeout=5)
+
+
+@dataclass
+class Author:
+    name: str
+    threads: dict = field(default_factory=dict)
+    after_postgeneration: list = field(default_factory=list)
+
+
+@dataclass
+class Book:
+    author: Author
+    thread: str = ""
+
+
+class BookFactory(factory.Factory):
+    class Meta:
+        model = Book
+
+    author = None
+
+    @classmethod
+    def _create(cls, model_class, **kwargs):
+        return model_class(thread=threading.current_thread().name, **kwargs)
+
+
+def record(name):
+    def postgen(obj, create, extracted, **kwargs):
+        barrier.wait()
+        obj.threads[name] = threading.current_thread().name
+        return name
+
+    postgen.__name__ = name
+    return factory.PostGeneration(postgen)
+
+
+@register
+class AuthorFactory(factory.Factory):
+    class Meta:
+        model = Author
+
+    name = "Charles Dickens"
+    first = record("first")
+    book = factory.RelatedFactory(BookFactory, factory_related_name="author")
+    second = record("second")
+    third = record("third")
+
+    @classmethod
+    def _after_postgeneration(cls, instance, create, results=None):
+        instance.after_postgeneration.append(results)
+
+
+register(BookFactory)
+"""
+
+
+def test_workers(pytester: pytest.Pytester):
+    """Test that the post-generation declarations are evaluated concurrently, not the related factories."""
+    pytester.makepyfile(MODELS + """
+
+def test_author(author, book):
+    assert set(author.threads.values()) != {threading.main_thread().name}
+    assert all(thread.startswith("factoryboy") for thread in author.threads.values())
+    assert book.thread == threading.main_thread().name
+    assert author.after_postgeneration == [{"first": "first", "book": book, "second": "second", "third": "third"}]
+    assert list(author.after_postgeneration[0]) == ["first", "book", "second", "third"]
+""")
+    result = pytester.runpytest("--factoryboy-workers=3")
+    assert_outcomes(result, passed=1)
+
+
+def test_batch(pytester: pytest.Pytester):
+    """Test that the related factories of the batch instances are evaluated in the main thread."""
+    pytester.makepyfile(MODELS + """
+
+barrier = threading.Barrier(1)
+register(AuthorFactory, _batch_size=3)
+
+
+def test_author_batch(author_batch):
+    assert len(author_batch) == 3
+    for author in author_batch:
+        assert author.after_postgeneration[0]["book"].thread == threading.main_thread().name
+        assert all(thread.startswith("factoryboy") for thread in author.threads.values())
+""")
+    result = pytester.runpytest("--factoryboy-workers=2")
+    assert_outcomes(result, passed=1)
+
+
+def test_ini(pytester: pytest.Pytester):
+    """Test the number of workers of the ini file."""
+    pytester.makeini("""
+        [pytest]
+        factoryboy_workers = 3
+    """)
+    pytester.makepyfile(MODELS + """
+
+def test_author(author):
+    assert set(author.threads) == {"first", "second", "third"}
+    assert len(author.after_postgeneration) == 1
+""")
+    result = pytester.runpytest()
+    assert_outcomes(result, passed=1)
+
+
+def test_sequential(pytester: pytest.Pytester):
+    """Test that the post-generation declarations are evaluated in the main thread by default."""
+    pytester.makepyfile(MODELS + """
+
+barrier = threading.Barrier(1)
+
+
+def test_author(author):
+    assert set(author.threads.values()) == {threading.main_thread().name}
+""")
+    result = pytester.runpytest()
+    assert_outcomes(result, passed=1)
+
+
+def test_error(pytester: pytest.Pytester):
+    """Test that the errors of the post-generation declarations are raised once all of them have completed."""
+    pytester.makepyfile("""
+        import threading
+        from dataclasses import dataclass
+
+        import factory
+
+        from pytest_factoryboy import register
+
+        completed = []
+
+
+        @dataclass
+        class Author:
+            name: str
+
+
+        @register
+        class AuthorFactory(factory.Factory):
+            class Meta:
+                model = Author
+
+            name = "Charles Dickens"
+
+            @factory.post_generation
+            def fail(obj, create, extracted, **kwargs):
+                raise ValueError("Can't publish")
+
+            @factory.post_generation
+            def slow(obj, create, extracted, **kwargs):
+                threading.Event().wait(0.2)
+                completed.append(obj)
+
+
+        def test_author(author):
+            pass
+
+
+        def test_completed():
+            assert len(completed) == 1
+    """)
+    result = pytester.runpytest("--factoryboy-workers=2")
+    assert_outcomes(result, errors=1, passed=1)
+    result.stdout.fnmatch_lines(["*ValueError: Can't publish*"])
+
+
+@pytest.mark.parametrize(
+    ("args", "ini", "message"),
+    [
+        (["--factoryboy-workers=-1"], "", "*The number of factoryboy workers can't be negative, got -1.*"),
+        ([], "factoryboy_workers = -2", "*The number of factoryboy workers can't be negative, got -2.*"),
+        ([], "factoryboy_workers = many", "*factoryboy_workers must be an integer, got 'many'.*"),
+    ],
+)
+def test_invalid(pytester: pytest.Pytester, args: list[str], ini: str, message: str):
+    """Test that an invalid number of workers is a usage error."""
+    pytester.makeini(f"""
+        [pytest]
+        {ini}
+    """)
+    pytester.makepyfile("""
+def test_nothing():
+    pass
+""")
+    result = pytester.runpytest(*args)
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines([message])